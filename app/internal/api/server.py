@@ -1,13 +1,34 @@
+import asyncio
 import time
+from contextlib import asynccontextmanager
+
 import uvicorn
 
 from app.internal.api.v1 import router
 from app.internal.configuration.settings import Settings, get_settings
-from app.internal.log.logger import get_logger
+from app.internal.database import dispose_async_engine
+from app.internal.log.logger import get_logger, get_sampled_logger
+from app.internal.metrics import HTTP_REQUEST_DURATION, render_metrics
+from app.internal.services.events import close_job_event_hub
+from app.internal.services.inline import shutdown_inline_renderer
+from app.internal.services.warmup import Readiness, warm_up_api
 from typing import Optional
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 
 logger = get_logger()
+sampled_logger = get_sampled_logger()
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    # Serve /health while warming up; /ready reports when it is done
+    warm_up = asyncio.create_task(warm_up_api(application.state.settings, application.state.readiness))
+    yield
+    warm_up.cancel()
+    shutdown_inline_renderer()
+    await close_job_event_hub()
+    await dispose_async_engine()
 
 
 def create_app(settings: Optional[Settings] = None) -> FastAPI:
@@ -17,14 +38,17 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
         settings = get_settings()
 
     # Configure logging first
-    logger.info(f"Creating FastAPI app - Environment: {settings.ENVIRONMENT}")
+    logger.info("Creating FastAPI app - Environment: {}", settings.ENVIRONMENT)
 
     application = FastAPI(
         title="thumbnail-api-server",
         description="Building a long-running job API which accepts image files, creates thumbnails, and allows the thumbnails to be fetched when done processing.",
         version="0.1.0",
         debug=settings.DEBUG,
+        lifespan=lifespan,
     )
+    application.state.settings = settings
+    application.state.readiness = Readiness()
 
     # TODO: Configure middlewares
     @application.middleware("http")
@@ -33,19 +57,41 @@ def create_app(settings: Optional[Settings] = None) -> FastAPI:
         response = await call_next(request)
         process_time = time.time() - start_time
 
-        logger.info(
-            "HTTP Request",
+        # Label by route template so path parameters do not explode cardinality
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
             method=request.method,
-            url=str(request.url),
-            status_code=response.status_code,
-            process_time=f"{process_time:.4f}s",
-            client_ip=request.client.host if request.client else None,
-        )
+            route=route.path if route is not None else "unmatched",
+            status=response.status_code,
+        ).observe(process_time)
+        # Successful requests are the bulk of the log volume; errors are always logged
+        if response.status_code >= 400 or sampled_logger.keep():
+            logger.info(
+                "HTTP Request",
+                method=request.method,
+                url=str(request.url),
+                status_code=response.status_code,
+                process_time=f"{process_time:.4f}s",
+                client_ip=request.client.host if request.client else None,
+            )
         return response
 
     # Create API router
     @application.get("/health")
     def check_status(): return {"status": "healthy"}
+
+    @application.get("/ready")
+    async def check_ready(request: Request):
+        readiness = request.app.state.readiness
+        if not readiness.ready:
+            return JSONResponse({"status": "warming up", "error": readiness.error}, status_code=503)
+        return {"status": "ready"}
+
+    @application.get("/metrics", include_in_schema=False)
+    def metrics():
+        data, content_type = render_metrics()
+        return Response(content=data, media_type=content_type)
+
     application.include_router(router.api_v1)
     logger.info("FastAPI application created successfully")
     return application
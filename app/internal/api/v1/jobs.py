@@ -1,80 +1,519 @@
+import asyncio
+import base64
+import hashlib
+import json
+import mimetypes
+from datetime import datetime, timezone
 from http import HTTPStatus
-from typing import List
+from typing import AsyncIterator, List
 
-from celery.backends.database.models import Task
-from fastapi import APIRouter, Depends, HTTPException
+from botocore.exceptions import ClientError
+from celery import states
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.internal.dependencies import get_db_session, get_storage_service
-from app.internal.services.storage import StorageService
+from app.internal.configuration.settings import Settings, get_settings
+from app.internal.database import get_async_engine
+from app.internal.dependencies import (
+    get_async_db_session,
+    get_async_job_service,
+    get_event_hub,
+    get_storage_service,
+)
+from app.internal.log.logger import get_logger
+from app.internal.models import Batch, Job
+from app.internal.services.events import JobEventHub, JobWaiter
+from app.internal.services.jobs import AsyncJobService, get_job_cache
+from app.internal.services.storage import StorageService, get_presigned_url_cache
 
+logger = get_logger()
 router = APIRouter()
 
 
 class JobResponse(BaseModel):
     job_id: str = Field(description="Job identifier")
     status: str = Field(description="Job status")
+    date_done: datetime | None = Field(default=None, description="Time of the last status change")
     result: dict | None = Field(default=None, description="Job result")
+    error: str | None = Field(default=None, description="Last error, for failed or retried jobs")
+    submitted_at: datetime | None = Field(default=None, description="Time the job was submitted")
+    started_at: datetime | None = Field(default=None, description="Time a worker last started the job")
+    finished_at: datetime | None = Field(default=None, description="Time the job finished")
+
+
+class JobPage(BaseModel):
+    items: List[JobResponse] = Field(description="Jobs, newest first")
+    next_cursor: str | None = Field(default=None, description="Cursor of the next page, if any")
+
+
+class BatchProgressResponse(BaseModel):
+    batch_id: str = Field(description="Batch identifier")
+    total: int = Field(description="Number of jobs in the batch")
+    succeeded: int = Field(description="Jobs finished successfully")
+    failed: int = Field(description="Jobs finished with an error")
+    pending: int = Field(description="Jobs not finished yet")
+    statuses: dict[str, int] = Field(description="Job count per status")
+    done: bool = Field(description="Whether every job has finished")
 
 
 class ThumbnailUrlResponse(BaseModel):
     job_id: str = Field(description="Job identifier")
+    rendition: str | None = Field(default=None, description="Rendition name")
+    format: str | None = Field(default=None, description="Image format of the thumbnail")
     thumbnail_url: str = Field(description="Presigned URL to download thumbnail")
 
 
+def job_response(job: Job, include_result: bool = True) -> JobResponse:
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        date_done=job.updated_at,
+        result=job.result if include_result else None,
+        error=job.error,
+        submitted_at=job.submitted_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.get("/jobs/batches/{batch_id}")
+async def get_batch(
+    batch_id: str, jobs: AsyncJobService = Depends(get_async_job_service)
+) -> BatchProgressResponse:
+    """Get aggregated progress of a batch upload"""
+    batch = await jobs.session.get(Batch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Batch not found")
+
+    statuses = await jobs.status_counts(batch_id)
+    # Batches submitted before the jobs table existed have no job rows
+    unseen = len(batch.job_ids) - sum(statuses.values())
+    if unseen:
+        statuses[states.PENDING] = statuses.get(states.PENDING, 0) + unseen
+
+    succeeded = statuses.get(states.SUCCESS, 0)
+    failed = sum(count for status, count in statuses.items() if status in states.EXCEPTION_STATES)
+    pending = len(batch.job_ids) - succeeded - failed
+    return BatchProgressResponse(
+        batch_id=batch_id,
+        total=len(batch.job_ids),
+        succeeded=succeeded,
+        failed=failed,
+        pending=pending,
+        statuses=statuses,
+        done=pending == 0,
+    )
+
+
 @router.get("/jobs/{job_id}")
-def get_job(job_id: str, session: Session = Depends(get_db_session)) -> JobResponse:
-    statement = select(Task).where(Task.task_id == job_id)
-    task = session.exec(statement).first()
-    if task is None:
+async def get_job(job_id: str, jobs: AsyncJobService = Depends(get_async_job_service)) -> JobResponse:
+    job = await jobs.get(job_id)
+    if job is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Job not found")
+    return job_response(job)
 
-    return JobResponse(
-        job_id=job_id,
-        status=task.status,
-        result=task.result,
+
+async def read_job(settings: Settings, job_id: str) -> JobResponse:
+    """Current state of a job; unknown jobs are reported as PENDING"""
+    async with AsyncSession(get_async_engine(settings), expire_on_commit=False) as session:
+        job = await AsyncJobService(session, get_job_cache(settings)).get(job_id)
+        if job is None:
+            return JobResponse(job_id=job_id, status=states.PENDING)
+        return job_response(job)
+
+
+async def job_updates(
+    job_id: str, settings: Settings, waiter: JobWaiter, interval: float
+) -> AsyncIterator[JobResponse | None]:
+    """
+    Yield the job's current state, then its final state once it is ready.
+
+    None is yielded whenever ``interval`` passes without a change. The database
+    is read once up front and then only while the event hub cannot vouch for
+    having delivered every event, so waiting costs no queries while Redis is up.
+    """
+    loop = asyncio.get_running_loop()
+    job = None
+    idle_since = loop.time()
+    while True:
+        if job is None or not waiter.reliable:
+            waiter.checkpoint()
+            current = await read_job(settings, job_id)
+            if job is None or current.status != job.status:
+                job = current
+                idle_since = loop.time()
+                yield job
+            if job.status in states.READY_STATES:
+                return
+
+        remaining = idle_since + interval - loop.time()
+        timeout = remaining if waiter.reliable else min(remaining, settings.JOB_WAIT_POLL_INTERVAL)
+        event = await waiter.wait(max(timeout, 0))
+        if event is not None:
+            yield JobResponse.model_validate(event)
+            return
+        if loop.time() - idle_since >= interval:
+            idle_since = loop.time()
+            yield None
+
+
+@router.get("/jobs/{job_id}/wait")
+async def wait_job(
+    job_id: str,
+    timeout: float = Query(default=30.0, gt=0, description="Seconds to wait for the job to finish"),
+    settings: Settings = Depends(get_settings),
+    hub: JobEventHub = Depends(get_event_hub),
+) -> JobResponse:
+    """Long-poll a job: respond as soon as it finishes or when the timeout expires"""
+    timeout = min(timeout, settings.JOB_WAIT_MAX_TIMEOUT)
+    job = None
+    async with hub.subscribe(job_id) as waiter:
+        async for update in job_updates(job_id, settings, waiter, timeout):
+            if update is None:
+                break
+            job = update
+    return job
+
+
+@router.get("/jobs/{job_id}/events", response_class=StreamingResponse)
+async def job_events(
+    job_id: str,
+    settings: Settings = Depends(get_settings),
+    hub: JobEventHub = Depends(get_event_hub),
+) -> StreamingResponse:
+    """Stream job state as Server-Sent Events until the job finishes"""
+
+    async def generate():
+        async with hub.subscribe(job_id) as waiter:
+            async for update in job_updates(job_id, settings, waiter, settings.JOB_EVENTS_KEEPALIVE):
+                if update is None:
+                    # Comment lines keep proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: job\ndata: {update.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
-@router.get("/jobs/")
-def list_jobs(session: Session = Depends(get_db_session)) -> List[JobResponse]:
-    """List all submitted jobs"""
-    statement = select(Task)
-    jobs = session.exec(statement).all()
-    res = []
-    for job in jobs:
-        res.append(
-            JobResponse(
-                job_id=job.task_id,
-                status=job.status,
-                result=job.result,
+def as_utc(value: datetime) -> datetime:
+    """Read a datetime without a timezone as UTC, as updated_at is compared with timezone"""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def encode_cursor(row_id: int) -> str:
+    return base64.urlsafe_b64encode(str(row_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Invalid cursor")
+
+
+@router.get("/jobs/", responses={HTTPStatus.OK: {"model": JobPage}})
+async def list_jobs(
+    limit: int = Query(default=100, ge=1, le=1000, description="Maximum jobs per page"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    status: List[str] | None = Query(default=None, description="Only jobs in these statuses"),
+    since: datetime | None = Query(default=None, description="Only jobs updated at or after; UTC unless an offset is given"),
+    until: datetime | None = Query(default=None, description="Only jobs updated before; UTC unless an offset is given"),
+    include_result: bool = Query(default=True, description="Include job results"),
+    session: AsyncSession = Depends(get_async_db_session),
+) -> StreamingResponse:
+    """List submitted jobs, newest first, one page at a time"""
+    columns = [
+        Job.id,
+        Job.job_id,
+        Job.status,
+        Job.updated_at,
+        Job.error,
+        Job.submitted_at,
+        Job.started_at,
+        Job.finished_at,
+    ]
+    if include_result:
+        columns.append(Job.result)
+    statement = select(*columns).order_by(Job.id.desc()).limit(limit + 1)
+    if cursor is not None:
+        statement = statement.where(Job.id < decode_cursor(cursor))
+    if status:
+        statement = statement.where(Job.status.in_([s.upper() for s in status]))
+    if since is not None:
+        statement = statement.where(Job.updated_at >= as_utc(since))
+    if until is not None:
+        statement = statement.where(Job.updated_at < as_utc(until))
+    rows = await session.stream(statement.execution_options(yield_per=100))
+
+    async def generate():
+        # Serialize row by row so a page is never materialized as one list
+        yield '{"items":['
+        next_cursor = None
+        count = 0
+        async for row in rows:
+            if count == limit:
+                next_cursor = encode_cursor(last_id)
+                break
+            job = JobResponse(
+                job_id=row.job_id,
+                status=row.status,
+                date_done=row.updated_at,
+                result=row.result if include_result else None,
+                error=row.error,
+                submitted_at=row.submitted_at,
+                started_at=row.started_at,
+                finished_at=row.finished_at,
             )
+            yield ("," if count else "") + job.model_dump_json()
+            last_id = row.id
+            count += 1
+        yield '],"next_cursor":' + json.dumps(next_cursor) + "}"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+
+def parse_accept(accept: str) -> list[tuple[str, float, int]]:
+    """(media range, quality, specificity) of every entry of an Accept header"""
+    ranges = []
+    for entry in accept.split(","):
+        media_range, *params = [part.strip() for part in entry.split(";")]
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        specificity = 0 if media_range == "*/*" else 1 if media_range.endswith("/*") else 2
+        ranges.append((media_range.lower(), quality, specificity))
+    return ranges
+
+
+def negotiate_output(accept: str | None, outputs: list[dict]) -> dict:
+    """
+    Pick the stored encoding the client prefers.
+
+    The first output is the rendition's own format and is the fallback; variant
+    formats are only served to clients that name them explicitly, since many
+    clients send */* without decoding WebP or AVIF. Among equally preferred
+    formats the smallest file wins.
+    """
+    if not accept:
+        return outputs[0]
+    ranges = parse_accept(accept)
+    best, best_rank = outputs[0], None
+    for position, output in enumerate(outputs):
+        media_type = f"image/{output['format'].lower()}"
+        matches = [
+            (quality, specificity)
+            for media_range, quality, specificity in ranges
+            if media_range in (media_type, "image/*", "*/*")
+        ]
+        if position > 0:
+            matches = [m for m in matches if m[1] == 2]
+        if not matches:
+            continue
+        # The most specific matching range determines the quality
+        quality, specificity = max(matches, key=lambda m: m[1])
+        if quality <= 0:
+            continue
+        rank = (quality, specificity, -output.get("size", 0))
+        if best_rank is None or rank > best_rank:
+            best, best_rank = output, rank
+    return best
+
+
+async def finished_result(jobs: AsyncJobService, job_id: str) -> dict:
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Job not found")
+    if job.status != states.SUCCESS:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f"Job status: {job.status}")
+    return job.result
+
+
+def select_output(result: dict, rendition: str | None, accept: str | None) -> tuple[str | None, dict]:
+    """
+    The rendition name and the stored output to serve for a request.
+
+    Results written before multi-rendition support only carry "key"; they have
+    no rendition name and a single output of unknown format.
+    """
+    renditions = result.get("renditions", [])
+    if not renditions:
+        if rendition is not None:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Rendition not found")
+        return None, {"key": result.get("key"), "format": None}
+    selected = renditions[0] if rendition is None else next(
+        (r for r in renditions if r["name"] == rendition), None
+    )
+    if selected is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Rendition not found")
+    return selected["name"], negotiate_output(accept, [selected, *selected.get("variants", [])])
+
+
+def thumbnail_etag(output: dict) -> str:
+    """Strong ETag of a stored thumbnail, derived from the job result alone"""
+    if output.get("sha256"):
+        return f'"{output["sha256"]}"'
+    # Thumbnail keys are never overwritten, so the key identifies the content
+    return '"' + hashlib.sha256(f"{output['key']}:{output.get('size')}".encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match evaluation, which uses weak comparison"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+def parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    (start, length) of a single byte range request; None to serve the whole object.
+
+    Multiple ranges and malformed headers are answered with the full object,
+    as RFC 9110 allows.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
         )
-    return res
+    return start, end - start + 1
+
+
+def thumbnail_media_type(output: dict) -> str:
+    if output.get("format"):
+        return f"image/{output['format'].lower()}"
+    return mimetypes.guess_type(output["key"])[0] or "application/octet-stream"
 
 
 @router.get("/jobs/{job_id}/thumbnail")
-def get_thumbnail_by_job_id(
+async def get_thumbnail_by_job_id(
     job_id: str,
-    session: Session = Depends(get_db_session),
+    response: Response,
+    rendition: str | None = Query(default=None, description="Rendition name, defaults to the first"),
+    accept: str | None = Header(default=None, description="Preferred image formats, e.g. image/avif,image/webp"),
+    settings: Settings = Depends(get_settings),
+    jobs: AsyncJobService = Depends(get_async_job_service),
     storage_service: StorageService = Depends(get_storage_service)
 ) -> ThumbnailUrlResponse:
     """Get presigned URL to download thumbnail"""
-    statement = select(Task).where(Task.task_id == job_id)
-    task = session.exec(statement).first()
-    
-    if task is None:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Job not found")
-    
-    if task.status != "SUCCESS":
-        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f"Job status: {task.status}")
-    
-    result = task.result
-    thumbnail_key = result.get("key")
-    
+    result = await finished_result(jobs, job_id)
+    rendition_name, output = select_output(result, rendition, accept)
+    if rendition_name is not None:
+        response.headers["Vary"] = "Accept"
+
     try:
-        presigned_url = storage_service.generate_presigned_url(thumbnail_key)
-        return ThumbnailUrlResponse(job_id=job_id, thumbnail_url=presigned_url)
+        presigned_url, _ = get_presigned_url_cache(settings).get(storage_service, output["key"])
+        return ThumbnailUrlResponse(
+            job_id=job_id, rendition=rendition_name, format=output["format"], thumbnail_url=presigned_url
+        )
     except Exception as e:
         raise HTTPException(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail="Failed to generate presigned URL")
+
+
+@router.api_route(
+    "/jobs/{job_id}/thumbnail/content",
+    methods=["GET", "HEAD"],
+    response_class=StreamingResponse,
+    responses={
+        HTTPStatus.OK: {"content": {"image/*": {}}},
+        HTTPStatus.PARTIAL_CONTENT: {"description": "Requested byte range"},
+        HTTPStatus.FOUND: {"description": "Redirect to a presigned URL"},
+        HTTPStatus.NOT_MODIFIED: {"description": "The client's copy is current"},
+    },
+)
+async def get_thumbnail_content(
+    job_id: str,
+    request: Request,
+    rendition: str | None = Query(default=None, description="Rendition name, defaults to the first"),
+    redirect: bool | None = Query(
+        default=None, description="Redirect to a presigned URL instead of streaming; defaults to THUMBNAIL_REDIRECT"
+    ),
+    accept: str | None = Header(default=None, description="Preferred image formats, e.g. image/avif,image/webp"),
+    settings: Settings = Depends(get_settings),
+    jobs: AsyncJobService = Depends(get_async_job_service),
+    storage_service: StorageService = Depends(get_storage_service),
+) -> Response:
+    """
+    Download a thumbnail.
+
+    Thumbnails never change once stored, so responses carry a strong ETag and
+    an immutable Cache-Control, and conditional requests are answered from
+    the job record alone.
+    """
+    result = await finished_result(jobs, job_id)
+    rendition_name, output = select_output(result, rendition, accept)
+    key = output["key"]
+    etag = thumbnail_etag(output)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.THUMBNAIL_CACHE_MAX_AGE}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if rendition_name is not None:
+        headers["Vary"] = "Accept"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    if settings.THUMBNAIL_REDIRECT if redirect is None else redirect:
+        url, valid_for = await run_in_threadpool(get_presigned_url_cache(settings).get, storage_service, key)
+        redirect_headers = {"Cache-Control": f"private, max-age={int(valid_for) // 2}"}
+        if rendition_name is not None:
+            redirect_headers["Vary"] = "Accept"
+        return RedirectResponse(url, status_code=HTTPStatus.FOUND, headers=redirect_headers)
+
+    size = output.get("size")
+    status_code, start, length = HTTPStatus.OK, 0, None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and size is not None and (if_range is None or if_range == etag):
+        byte_range = parse_range(range_header, size)
+        if byte_range is not None:
+            status_code, (start, length) = HTTPStatus.PARTIAL_CONTENT, byte_range
+            headers["Content-Range"] = f"bytes {start}-{start + length - 1}/{size}"
+    if status_code == HTTPStatus.PARTIAL_CONTENT:
+        headers["Content-Length"] = str(length)
+    elif size is not None:
+        headers["Content-Length"] = str(size)
+    media_type = thumbnail_media_type(output)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+    try:
+        chunks = await run_in_threadpool(
+            storage_service.iter_bytes, key, start, length, settings.THUMBNAIL_STREAM_CHUNK_SIZE
+        )
+    except (FileNotFoundError, ClientError) as e:
+        logger.warning("Thumbnail missing from storage", job_id=job_id, key=key, error=str(e))
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Thumbnail not found")
+    return StreamingResponse(chunks, status_code=status_code, headers=headers, media_type=media_type)
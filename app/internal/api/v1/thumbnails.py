@@ -1,70 +1,603 @@
+import asyncio
+import math
 import uuid
+from dataclasses import dataclass
 from http import HTTPStatus
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from pydantic import BaseModel, Field
+from celery import group, states
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from PIL import Image, UnidentifiedImageError
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from app.internal.dependencies import get_storage_service
-from app.internal.log.logger import get_logger
-from app.internal.tasks.thumbnail import generate_thumbnail
-from app.internal.services.storage import StorageService
+from app.internal.configuration.settings import Settings, get_settings
+from app.internal.dependencies import (
+    get_admission,
+    get_async_storage_service,
+    get_content_index,
+    get_inline_render_service,
+    get_job_service,
+    get_upload_rate_limiter,
+)
+from app.internal.log.logger import get_logger, get_sampled_logger
+from app.internal.metrics import UPLOAD_BYTES
+from app.internal.services.admission import AdmissionController, RateLimiter
+from app.internal.services.image import DEFAULT_RENDITIONS, ImageProbe, Rendition, probe_image
+from app.internal.models import Batch, Job, OriginalImage, ThumbnailResult
+from app.internal.services.content_index import ContentIndexService, renditions_hash
+from app.internal.services.inline import InlineRenderer
+from app.internal.services.jobs import JobService, result_job_id, result_size
+from app.internal.tasks.thumbnail import (
+    generate_thumbnail,
+    generate_thumbnail_batch,
+    record_result,
+    route_queue,
+    save_renditions,
+)
+from app.internal.services.storage import AsyncMultipartUpload, AsyncStorageService
 
 logger = get_logger()
+sampled_logger = get_sampled_logger()
 router = APIRouter()
 
+_renditions_adapter = TypeAdapter(list[Rendition])
+
 
 class ThumbnailResp(BaseModel):
     job_id: str = Field(description="job identifier")
     message: Optional[str] = Field(default=None, description="status message")
+    status: Optional[str] = Field(default=None, description="job status, when already finished")
+    thumbnail_url: Optional[str] = Field(
+        default=None, description="presigned URL of the first rendition, when already finished"
+    )
 
 
-@router.post("/thumbnails/")
-async def upload(
-    image: UploadFile = File(...),
-    storage_service: StorageService = Depends(get_storage_service),
-):
-    """Upload image and start thumbnail generation task"""
+class BatchResp(BaseModel):
+    batch_id: str = Field(description="batch identifier")
+    job_ids: List[str] = Field(description="job identifiers, in submission order")
+    message: Optional[str] = Field(default=None, description="status message")
 
-    # TODO: validate the input data
+
+@dataclass
+class IngestedImage:
+    job_id: str
+    key: str
+    content_hash: str | None
+    existing_result: ThumbnailResult | None = None
+    data: bytes | None = None
+    # Source pixels from the header probe, None when unknown
+    pixels: int | None = None
+    size: int | None = None
+
+
+def parse_renditions(renditions: Optional[str], max_renditions: int) -> list[Rendition]:
+    """Parse the JSON-encoded renditions form field"""
+    if not renditions:
+        return DEFAULT_RENDITIONS
     try:
-        content = await image.read()
-        file_extension = (
-            image.filename.split(".")[-1] if "." in image.filename else "jpg"
+        parsed = _renditions_adapter.validate_json(renditions)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False),
+        )
+    if not 0 < len(parsed) <= max_renditions:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"Between 1 and {max_renditions} renditions are allowed",
+        )
+    names = [r.key_name for r in parsed]
+    if len(set(names)) != len(names):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="Rendition names must be unique"
         )
+    return parsed
+
+
+async def admit_upload(
+    request: Request,
+    cost: int,
+    settings: Settings,
+    admission: AdmissionController,
+    rate_limiter: RateLimiter,
+) -> None:
+    """Refuse the upload before reading it if the client or the workers are over their limits"""
+    client = request.client.host if request.client else "unknown"
+    if settings.RATE_LIMIT_CLIENT_HEADER:
+        client = request.headers.get(settings.RATE_LIMIT_CLIENT_HEADER, client).split(",")[0].strip()
+    wait = rate_limiter.acquire(client, cost)
+    if wait > 0:
+        detail = "Rate limit exceeded"
+        if math.isinf(wait):
+            detail = f"At most {rate_limiter.capacity} images are allowed per request"
+            wait = 60
+        logger.info("Upload rate limited", client=client, cost=cost)
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+    if not await admission.admit(cost):
+        logger.warning("Upload refused, job backlog is full", cost=cost, max_backlog=admission.max_backlog)
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail="Too many jobs are waiting, retry later",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+
+
+def probe_upload(header: bytes, complete: bool, settings: Settings) -> ImageProbe | None:
+    """
+    Probe the image header, rejecting unsupported data and decompression bombs.
+
+    Returns None when the header does not fit in ``header``; the worker then
+    checks the image when it decodes it.
+    """
+    too_large = HTTPException(
+        status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Image exceeds {settings.MAX_IMAGE_PIXELS} pixels",
+    )
+    unsupported = HTTPException(
+        status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE, detail="Unsupported image format"
+    )
+    try:
+        probe = probe_image(header)
+    except Image.DecompressionBombError:
+        raise too_large
+    except (UnidentifiedImageError, OSError) as e:
+        # A truncated header looks unidentified too
+        if not complete:
+            logger.info("Image header does not fit the probe", error=str(e))
+            return None
+        raise unsupported
     except Exception as e:
-        logger.error(f"Failed to read file: {e}")
-        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Invalid file")
-    finally:
-        await image.close()
+        # The limits could not be checked, so the image is not accepted
+        logger.warning("Image probe failed", error=str(e))
+        raise unsupported
+    if probe.pixels > settings.MAX_IMAGE_PIXELS:
+        raise too_large
+    return probe
+
 
-    # Upload original image to storage
+async def stream_to_storage(
+    image: UploadFile, upload_stream: AsyncMultipartUpload, settings: Settings, keep_bytes: int = 0
+) -> tuple[bytes | None, ImageProbe | None]:
+    """
+    Copy an uploaded file to storage chunk by chunk, enforcing size limits.
+
+    FastAPI has already spooled the request body (to a temporary file beyond
+    1 MB) when the endpoint runs, so the copy starts once the client has sent
+    everything and does not overlap with receiving it, and MAX_UPLOAD_SIZE is
+    checked only after the body was received. What chunking bounds is memory:
+    at most one chunk and one S3 part of the file are held at a time.
+
+    The image header is probed before anything is written, so unsupported
+    files and decompression bombs never reach storage.
+
+    Returns:
+        tuple[bytes | None, ImageProbe | None]: The file content if it is no
+        larger than ``keep_bytes``, and the header probe
+    """
+    chunk = await image.read(settings.PROBE_BYTES)
+    if not chunk:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Empty file")
+    probe = probe_upload(chunk, len(chunk) < settings.PROBE_BYTES, settings)
+    kept = bytearray()
+    while chunk:
+        if upload_stream.size + len(chunk) > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds {settings.MAX_UPLOAD_SIZE} bytes",
+            )
+        if upload_stream.size + len(chunk) <= keep_bytes:
+            kept += chunk
+        await upload_stream.write(chunk)
+        chunk = await image.read(settings.UPLOAD_CHUNK_SIZE)
+    UPLOAD_BYTES.observe(upload_stream.size)
+    data = bytes(kept) if upload_stream.size <= keep_bytes else None
+    return data, probe
+
+
+async def find_duplicates(
+    content_index: ContentIndexService, content_hash: str, params_hash: str
+) -> tuple[ThumbnailResult | None, OriginalImage | None]:
+    """Look up a finished result, or failing that a stored original, for the content"""
+    try:
+        result = await run_in_threadpool(content_index.find_result, content_hash, params_hash)
+        if result is not None:
+            return result, None
+        return None, await run_in_threadpool(content_index.find_original, content_hash)
+    except Exception as e:
+        # Deduplication is an optimization; fall back to a regular upload
+        logger.warning("Content index lookup failed", content_hash=content_hash, error=str(e))
+        return None, None
+
+
+async def record_original(
+    content_index: ContentIndexService, content_hash: str, key: str, size: int
+) -> None:
+    try:
+        await run_in_threadpool(content_index.record_original, content_hash, key, size)
+    except Exception as e:
+        logger.warning("Failed to index original", content_hash=content_hash, error=str(e))
+
+
+async def ingest_image(
+    image: UploadFile,
+    params_hash: str,
+    settings: Settings,
+    storage_service: AsyncStorageService,
+    content_index: ContentIndexService,
+    index_lock: asyncio.Lock,
+    keep_bytes: int = 0,
+) -> IngestedImage:
+    """
+    Stream an uploaded image to storage, deduplicating against the content index.
+
+    ``index_lock`` serializes use of the request's database session when several
+    images are ingested concurrently. Images up to ``keep_bytes`` are also
+    returned in memory.
+    """
+    file_extension = (
+        image.filename.split(".")[-1] if image.filename and "." in image.filename else "jpg"
+    )
+
+    # Stream original image to storage
     job_id = str(uuid.uuid4())
-    logger.debug(f"Job ID: {job_id}")
+    logger.debug("Job ID: {}", job_id)
+    key = f"images/original/{job_id}.{file_extension}"
+    content_type = f"image/{file_extension}"
+    upload_stream = storage_service.open_upload(key, content_type)
     try:
-        key = f"images/original/{job_id}.{file_extension}"
-        content_type = f"image/{file_extension}"
-        storage_service.save(key, content, content_type)
-        logger.info(f"Image uploaded to: {key}", job_id=job_id)
+        data, probe = await stream_to_storage(image, upload_stream, settings, keep_bytes)
+        existing_result, existing_original = None, None
+        if settings.DEDUP_ENABLED:
+            async with index_lock:
+                existing_result, existing_original = await find_duplicates(
+                    content_index, upload_stream.content_hash, params_hash
+                )
+        if existing_result is not None or existing_original is not None:
+            # Identical content is already stored, keep a single copy
+            await upload_stream.abort()
+        else:
+            await upload_stream.complete()
+            sampled_logger.info(
+                "Image uploaded to: {key}",
+                key=key,
+                job_id=job_id,
+                size=upload_stream.size,
+                probe=probe,
+            )
+    except HTTPException:
+        await upload_stream.abort()
+        raise
     except Exception as e:
-        logger.error(f"Failed to upload image: {e}", job_id=job_id)
+        await upload_stream.abort()
+        logger.error("Failed to upload image: {error}", job_id=job_id, error=str(e))
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             detail="Failed to upload image",
         )
+    finally:
+        await image.close()
+
+    content_hash = upload_stream.content_hash
+    pixels = probe.pixels if probe is not None else None
+    if existing_result is not None:
+        return IngestedImage(job_id, key, content_hash, existing_result, pixels=pixels, size=upload_stream.size)
+    if existing_original is not None:
+        key = existing_original.key
+        logger.info("Reused existing original: {key}", key=key, job_id=job_id)
+    elif settings.DEDUP_ENABLED:
+        async with index_lock:
+            await record_original(content_index, content_hash, key, upload_stream.size)
+    return IngestedImage(job_id, key, content_hash, data=data, pixels=pixels, size=upload_stream.size)
+
+
+def job_queue(ingested: IngestedImage, settings: Settings) -> str | None:
+    # Huge sources get their own workers so they cannot starve small jobs
+    return route_queue(ingested.pixels) if settings.SIZE_CLASS_ROUTING else None
+
+
+def new_job(
+    ingested: IngestedImage, settings: Settings, batch_id: str | None = None, result: dict | None = None
+) -> Job:
+    """Job row of an ingested image; finished already when ``result`` is given"""
+    job = Job(
+        job_id=ingested.job_id,
+        status=states.PENDING,
+        batch_id=batch_id,
+        queue=job_queue(ingested, settings),
+        source_key=ingested.key,
+        source_size=ingested.size,
+        content_hash=ingested.content_hash,
+    )
+    if result is not None:
+        job.status = states.SUCCESS
+        job.result = result
+        job.result_key = result.get("key")
+        job.result_job_id = result_job_id(result)
+        job.result_size = result_size(result)
+        job.finished_at = job.updated_at = job.submitted_at
+    return job
+
+
+def reused_result(ingested: IngestedImage) -> dict:
+    """Result of an identical earlier job, re-addressed to this job"""
+    return ingested.existing_result.result | {"job_id": ingested.job_id}
+
+
+async def mark_unsubmitted(jobs: JobService, job_ids: list[str]) -> None:
+    try:
+        for job_id in job_ids:
+            await run_in_threadpool(jobs.mark_failed, job_id, "Failed to submit task")
+    except Exception as e:
+        logger.warning("Failed to mark unsubmitted jobs", job_ids=job_ids, error=str(e))
+
+
+async def create_jobs(jobs: JobService, rows: list[Job]) -> None:
+    try:
+        await run_in_threadpool(jobs.create, rows)
+    except Exception as e:
+        logger.error("Failed to record jobs", job_ids=[row.job_id for row in rows], error=str(e))
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to submit task"
+        )
+
+
+async def resolve_from_existing(ingested: IngestedImage, settings: Settings, jobs: JobService) -> None:
+    """Resolve a job immediately with the thumbnails of an identical earlier job"""
+    await create_jobs(jobs, [new_job(ingested, settings, result=reused_result(ingested))])
+    logger.info(
+        "Reused existing thumbnail",
+        job_id=ingested.job_id,
+        source_job_id=ingested.existing_result.job_id,
+    )
+
+
+async def render_inline(
+    ingested: IngestedImage,
+    requested: list[Rendition],
+    settings: Settings,
+    storage_service: AsyncStorageService,
+    inline_renderer: InlineRenderer,
+    jobs: JobService,
+) -> dict | None:
+    """
+    Render a small image in the API server and record the finished job.
+
+    Returns:
+        dict | None: The job result, or None if the image must go through Celery
+    """
+    if ingested.data is None or not inline_renderer.accepts(len(ingested.data), ingested.pixels):
+        return None
+    try:
+        rendered = await inline_renderer.render(ingested.data, requested)
+        if rendered is None:
+            return None
+        result = await storage_service.run(save_renditions, ingested.job_id, rendered)
+        await run_in_threadpool(jobs.create, [new_job(ingested, settings, result=result)])
+    except Exception as e:
+        logger.warning("Inline render failed, submitting task", job_id=ingested.job_id, error=str(e))
+        return None
+    if settings.DEDUP_ENABLED and ingested.content_hash:
+        await run_in_threadpool(
+            record_result, ingested.content_hash, requested, ingested.job_id, result
+        )
+    sampled_logger.info("Thumbnail rendered inline", job_id=ingested.job_id)
+    return result
+
+
+async def presigned_url_or_none(storage_service: AsyncStorageService, key: str) -> str | None:
+    try:
+        return await storage_service.generate_presigned_url(key)
+    except Exception as e:
+        logger.warning("Failed to generate presigned URL", key=key, error=str(e))
+        return None
+
+
+def thumbnail_signature(ingested: IngestedImage, requested: list[Rendition], settings: Settings):
+    signature = generate_thumbnail.signature(
+        args=[ingested.key, [r.model_dump() for r in requested]],
+        kwargs={"content_hash": ingested.content_hash},
+        task_id=ingested.job_id,
+    )
+    queue = job_queue(ingested, settings)
+    if queue is not None:
+        signature.set(queue=queue)
+    return signature
+
+
+def pipelined_signatures(ingested: list[IngestedImage], requested: list[Rendition], settings: Settings):
+    """Batch tasks of up to PIPELINE_BATCH_SIZE jobs each, one set per size-class queue"""
+    by_queue: dict[str | None, list[IngestedImage]] = {}
+    for item in ingested:
+        queue = job_queue(item, settings)
+        by_queue.setdefault(queue, []).append(item)
+    renditions = [r.model_dump() for r in requested]
+    signatures = []
+    for queue, items in by_queue.items():
+        for start in range(0, len(items), settings.PIPELINE_BATCH_SIZE):
+            jobs = [
+                {"job_id": item.job_id, "key": item.key, "renditions": renditions, "content_hash": item.content_hash}
+                for item in items[start:start + settings.PIPELINE_BATCH_SIZE]
+            ]
+            signature = generate_thumbnail_batch.signature(args=[jobs], kwargs={"queue": queue})
+            if queue is not None:
+                signature.set(queue=queue)
+            signatures.append(signature)
+    return signatures
+
+
+@router.post("/thumbnails/")
+async def upload(
+    request: Request,
+    image: UploadFile = File(...),
+    renditions: Optional[str] = Form(
+        default=None,
+        description='JSON list of renditions, e.g. [{"width": 200, "height": 200, "format": "webp"}]',
+    ),
+    settings: Settings = Depends(get_settings),
+    storage_service: AsyncStorageService = Depends(get_async_storage_service),
+    content_index: ContentIndexService = Depends(get_content_index),
+    inline_renderer: InlineRenderer = Depends(get_inline_render_service),
+    jobs: JobService = Depends(get_job_service),
+    admission: AdmissionController = Depends(get_admission),
+    rate_limiter: RateLimiter = Depends(get_upload_rate_limiter),
+):
+    """Upload image and start thumbnail generation task"""
+    requested = parse_renditions(renditions, settings.MAX_RENDITIONS)
+    await admit_upload(request, 1, settings, admission, rate_limiter)
+    ingested = await ingest_image(
+        image,
+        renditions_hash(requested, settings),
+        settings,
+        storage_service,
+        content_index,
+        asyncio.Lock(),
+        keep_bytes=inline_renderer.max_bytes if inline_renderer.enabled else 0,
+    )
+    if ingested.existing_result is not None:
+        await resolve_from_existing(ingested, settings, jobs)
+        return ThumbnailResp(job_id=ingested.job_id, message="Thumbnail already generated")
+
+    # Small images skip the broker and worker round-trip
+    result = await render_inline(ingested, requested, settings, storage_service, inline_renderer, jobs)
+    if result is not None:
+        return ThumbnailResp(
+            job_id=ingested.job_id,
+            message="Thumbnail generated",
+            status=states.SUCCESS,
+            thumbnail_url=await presigned_url_or_none(storage_service, result["key"]),
+        )
 
-    # Submit task to Celery
+    # Submit task to Celery; the job row must exist before a worker can update it
+    await create_jobs(jobs, [new_job(ingested, settings)])
     try:
-        task = generate_thumbnail.apply_async(args=[key], task_id=job_id)
+        task = await run_in_threadpool(thumbnail_signature(ingested, requested, settings).apply_async)
     except Exception as e:
-        logger.error("Failed to submit task", job_id=job_id, error=str(e))
+        logger.error("Failed to submit task", job_id=ingested.job_id, error=str(e))
+        await mark_unsubmitted(jobs, [ingested.job_id])
         raise HTTPException(
             status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to submit task"
         )
 
-    logger.info("Task submitted", job_id=job_id)
+    sampled_logger.info("Task submitted", job_id=ingested.job_id)
 
     return ThumbnailResp(
         job_id=task.id,
         message="Started to generate thumbnail",
     )
+
+
+@router.post("/thumbnails/batch")
+async def upload_batch(
+    request: Request,
+    images: List[UploadFile] = File(default=[]),
+    keys: List[str] = Form(default=[], description="Keys of originals already in storage"),
+    renditions: Optional[str] = Form(
+        default=None, description="JSON list of renditions applied to every image"
+    ),
+    settings: Settings = Depends(get_settings),
+    storage_service: AsyncStorageService = Depends(get_async_storage_service),
+    content_index: ContentIndexService = Depends(get_content_index),
+    jobs: JobService = Depends(get_job_service),
+    admission: AdmissionController = Depends(get_admission),
+    rate_limiter: RateLimiter = Depends(get_upload_rate_limiter),
+) -> BatchResp:
+    """Upload many images (or reference stored originals) and process them as one batch"""
+    requested = parse_renditions(renditions, settings.MAX_RENDITIONS)
+    total = len(images) + len(keys)
+    if not 0 < total <= settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"Between 1 and {settings.MAX_BATCH_SIZE} images are allowed per batch",
+        )
+    invalid_keys = [k for k in keys if not k.startswith("images/original/")]
+    if invalid_keys:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"Keys must be under images/original/: {invalid_keys}",
+        )
+    await admit_upload(request, total, settings, admission, rate_limiter)
+
+    params_hash = renditions_hash(requested, settings)
+    index_lock = asyncio.Lock()
+    semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
+
+    async def ingest(image: UploadFile) -> IngestedImage:
+        async with semaphore:
+            return await ingest_image(
+                image, params_hash, settings, storage_service, content_index, index_lock
+            )
+
+    async def check(key: str) -> bool:
+        async with semaphore:
+            return await storage_service.exists(key)
+
+    # Store files and check referenced keys concurrently; the first failure cancels the rest
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            uploads = [task_group.create_task(ingest(image)) for image in images]
+            checks = [task_group.create_task(check(key)) for key in keys]
+    except* Exception as eg:
+        # A single branch, as exceptions raised by several would be grouped again
+        rejected, failed = eg.split(HTTPException)
+        if failed is not None:
+            logger.error("Failed to store batch", errors=[str(e) for e in failed.exceptions])
+        if rejected is not None:
+            raise rejected.exceptions[0]
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to store batch"
+        )
+    missing_keys = [key for key, check_task in zip(keys, checks) if not check_task.result()]
+    if missing_keys:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail=f"Keys not found: {missing_keys}"
+        )
+
+    ingested = [u.result() for u in uploads] + [
+        IngestedImage(str(uuid.uuid4()), key, None) for key in keys
+    ]
+    batch_id = str(uuid.uuid4())
+    job_ids = [item.job_id for item in ingested]
+    rows = [
+        new_job(item, settings, batch_id, reused_result(item) if item.existing_result is not None else None)
+        for item in ingested
+    ]
+    pending = [item for item in ingested if item.existing_result is None]
+    try:
+        await run_in_threadpool(_save_batch, jobs, batch_id, job_ids, rows)
+    except Exception as e:
+        logger.error("Failed to record batch", batch_id=batch_id, error=str(e))
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to submit batch"
+        )
+    try:
+        if settings.PIPELINE_BATCH_SIZE > 0:
+            signatures = pipelined_signatures(pending, requested, settings)
+        else:
+            signatures = [thumbnail_signature(item, requested, settings) for item in pending]
+        if signatures:
+            # Published through a single producer connection
+            await run_in_threadpool(group(signatures).apply_async, task_id=batch_id)
+    except Exception as e:
+        logger.error("Failed to submit batch", batch_id=batch_id, error=str(e))
+        await mark_unsubmitted(jobs, [item.job_id for item in pending])
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to submit batch"
+        )
+
+    logger.info("Batch submitted", batch_id=batch_id, size=len(job_ids))
+    return BatchResp(
+        batch_id=batch_id,
+        job_ids=job_ids,
+        message=f"Started to generate thumbnails for {len(job_ids)} images",
+    )
+
+
+def _save_batch(jobs: JobService, batch_id: str, job_ids: list[str], rows: list[Job]) -> None:
+    # Committed together with the jobs
+    jobs.session.add(Batch(batch_id=batch_id, job_ids=job_ids))
+    jobs.create(rows)
@@ -1,3 +1,6 @@
+import threading
+from typing import Optional
+
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -25,6 +28,12 @@ class Settings(BaseSettings):
     PORT: int = Field(default=8080, description="Server port")
     ACCESS_LOG: bool = Field(default=False, description="Enable access logging")
     EVENT_LOOP: str = Field(default="asyncio", description="Event loop type")
+    WARM_UP: bool = Field(
+        default=True, description="Preload image codecs and open pooled connections before reporting ready"
+    )
+    WARM_UP_RETRY_INTERVAL: float = Field(
+        default=5.0, description="Seconds between warm-up attempts while a dependency is unreachable"
+    )
 
     # Application settings
     ENVIRONMENT: str = Field(
@@ -32,11 +41,36 @@ class Settings(BaseSettings):
     )
     DEBUG: bool = Field(default=True, description="Debug mode")
     LOG_LEVEL: str = Field(default="DEBUG", description="Application logging level")
+    LOG_LEVEL_OVERRIDES: str = Field(
+        default="botocore=WARNING,boto3=WARNING,s3transfer=WARNING,urllib3=WARNING",
+        description="Comma-separated logger=LEVEL pairs overriding LOG_LEVEL for noisy modules",
+    )
+    LOG_SAMPLE_RATE: float = Field(
+        default=1.0, description="Fraction of high-frequency success records logged, e.g. storage reads and writes"
+    )
+    LOG_QUEUE_SIZE: int = Field(
+        default=10_000, description="Records buffered for the production log writer; further records are dropped"
+    )
     CELERY_BROKER_URL: str = Field(default="", description="Celery broker URL")
     CELERY_BACKEND_URL: str = Field(default="", description="Celery backend URL")
     CELERY_RESULT_DB_TABLENAMES: str = Field(
         default="", description="Celery result database table names"
     )
+    CELERY_SERIALIZER: str = Field(
+        default="json", description="Serializer of task messages and results (json, msgpack, msgpack-zlib)"
+    )
+    CELERY_COMPRESSION_THRESHOLD: int = Field(
+        default=1024, description="Payloads of at least this many bytes are compressed by msgpack-zlib, 0 never"
+    )
+    CELERY_RESULT_EXPIRES: int = Field(
+        default=86400, description="Seconds task results are kept in the result backend, 0 keeps them forever"
+    )
+    STORAGE_BACKEND: str = Field(
+        default="s3", description="Object storage backend (s3, local, memory)"
+    )
+    STORAGE_LOCAL_ROOT: str = Field(
+        default="data", description="Root directory of the local storage backend"
+    )
     S3_ENDPOINT_URL: str = Field(
         default="http://localhost:9000", description="S3 endpoint URL"
     )
@@ -45,7 +79,219 @@ class Settings(BaseSettings):
     S3_KEY_PREFIX: str = Field(default="", description="S3 key prefix")
     AWS_ACCESS_KEY_ID: str = Field(default="", description="AWS access key ID")
     AWS_SECRET_ACCESS_KEY: str = Field(default="", description="AWS secret access key")
+    S3_MAX_POOL_CONNECTIONS: int = Field(
+        default=50, description="Maximum pooled HTTP connections per S3 client"
+    )
+    S3_CONNECT_TIMEOUT: float = Field(default=5.0, description="S3 connect timeout in seconds")
+    S3_READ_TIMEOUT: float = Field(default=60.0, description="S3 read timeout in seconds")
+    S3_RETRY_MODE: str = Field(
+        default="standard", description="botocore retry mode (legacy, standard, adaptive)"
+    )
+    S3_MAX_ATTEMPTS: int = Field(default=3, description="Maximum attempts per S3 request")
     DATABASE_URL: str = Field(default="", description="Database URL")
+    DATABASE_ASYNC_URL: str = Field(
+        default="", description="Database URL for async routes, defaults to DATABASE_URL with an async driver"
+    )
+    DATABASE_POOL_SIZE: int = Field(default=5, description="Connections kept open per engine")
+    DATABASE_MAX_OVERFLOW: int = Field(default=10, description="Extra connections opened under load")
+    DATABASE_POOL_TIMEOUT: float = Field(default=30.0, description="Seconds to wait for a free connection")
+    DATABASE_POOL_RECYCLE: int = Field(
+        default=1800, description="Seconds after which a connection is replaced, -1 disables"
+    )
+    DATABASE_POOL_PRE_PING: bool = Field(default=True, description="Test connections before using them")
+    DATABASE_ECHO: bool = Field(default=False, description="Log every SQL statement")
+
+    # Worker Pipeline
+    PIPELINE_BATCH_SIZE: int = Field(
+        default=0,
+        description="Jobs of a batch upload processed per pipelined worker task, 0 submits one task per job",
+    )
+    PIPELINE_IO_THREADS: int = Field(
+        default=4, description="Threads downloading sources and uploading thumbnails in pipelined tasks"
+    )
+    PIPELINE_PREFETCH: int = Field(
+        default=2, description="Sources downloaded ahead of the one being rendered in pipelined tasks"
+    )
+
+    # Retries and Source Cache
+    TASK_MAX_RETRIES: int = Field(default=3, description="Retries of a job failing with a storage or I/O error")
+    RETRY_BACKOFF_BASE: float = Field(
+        default=2.0, description="Seconds before the first retry; doubles with every further retry, with jitter"
+    )
+    RETRY_BACKOFF_MAX: float = Field(default=300.0, description="Upper bound of the retry delay in seconds")
+    SOURCE_CACHE_DIR: str = Field(
+        default="", description="Directory of the worker's source cache, defaults to one under the temp directory"
+    )
+    SOURCE_CACHE_MAX_BYTES: int = Field(
+        default=1024 * 1024 * 1024, description="Disk space of the worker's source cache in bytes, 0 disables"
+    )
+
+    # Admission Control
+    ADMISSION_MAX_BACKLOG: int = Field(
+        default=10_000, description="Refuse uploads while more jobs are queued or running, 0 disables"
+    )
+    ADMISSION_CACHE_SECONDS: float = Field(
+        default=2.0, description="Seconds a backlog measurement is reused"
+    )
+    ADMISSION_IN_FLIGHT_MAX_AGE: int = Field(
+        default=3600, description="Started jobs older than this are not counted as running"
+    )
+    ADMISSION_RETRY_AFTER: int = Field(
+        default=30, description="Retry-After seconds sent when the backlog is full"
+    )
+    RATE_LIMIT_PER_MINUTE: float = Field(
+        default=0, description="Images each client may upload per minute, 0 disables"
+    )
+    RATE_LIMIT_BURST: int = Field(
+        default=60, description="Images a client may upload at once before being rate limited"
+    )
+    RATE_LIMIT_CLIENT_HEADER: str = Field(
+        default="", description="Header identifying the client, e.g. X-Forwarded-For; defaults to the peer address"
+    )
+
+    # Metrics
+    WORKER_METRICS_PORT: int = Field(
+        default=9808, description="Port of the Celery worker metrics exporter, 0 to disable"
+    )
+
+    # Thumbnail Delivery
+    THUMBNAIL_CACHE_MAX_AGE: int = Field(
+        default=31_536_000, description="max-age of streamed thumbnails, which never change once stored"
+    )
+    THUMBNAIL_STREAM_CHUNK_SIZE: int = Field(default=64 * 1024, description="Bytes per chunk when streaming thumbnails")
+    THUMBNAIL_REDIRECT: bool = Field(
+        default=False, description="Redirect thumbnail downloads to a presigned URL instead of streaming them"
+    )
+    PRESIGNED_URL_EXPIRES: int = Field(default=3600, description="Lifetime of presigned URLs in seconds")
+    PRESIGNED_URL_CACHE_SIZE: int = Field(
+        default=10_000, description="Presigned URLs reused per process until half their lifetime, 0 disables"
+    )
+
+    # Job Store
+    JOB_CACHE_SIZE: int = Field(default=10_000, description="Finished jobs cached per API process, 0 disables")
+    JOB_CACHE_TTL: float = Field(default=300.0, description="Seconds a finished job is served from the cache")
+
+    # Retention
+    RETENTION_ORIGINALS_DAYS: float = Field(
+        default=0, description="Days uploaded originals are kept after their last job, 0 keeps them forever"
+    )
+    RETENTION_THUMBNAILS_DAYS: float = Field(
+        default=0, description="Days thumbnails are kept after their last job, 0 keeps them forever"
+    )
+    RETENTION_JOBS_DAYS: float = Field(
+        default=0, description="Days finished job records and batches are kept, 0 keeps them forever"
+    )
+    RETENTION_TASK_RESULTS_DAYS: float = Field(
+        default=0, description="Days rows of a database Celery result backend are kept, 0 keeps them forever"
+    )
+    SWEEP_INTERVAL: float = Field(
+        default=3600.0, description="Seconds between retention sweeps scheduled by Celery beat, 0 disables"
+    )
+    SWEEP_BATCH_SIZE: int = Field(default=1000, description="Objects or rows deleted per request")
+    SWEEP_MAX_DELETES_PER_SECOND: float = Field(
+        default=500.0, description="Deletes per second the sweeper may issue, 0 for no limit"
+    )
+
+    # Job events
+    JOB_EVENTS_URL: str = Field(
+        default="", description="Redis URL for job events, defaults to a Redis broker URL"
+    )
+    JOB_EVENTS_CHANNEL_PREFIX: str = Field(
+        default="thumbnail:jobs:", description="Pub/sub channel prefix for job events"
+    )
+    JOB_WAIT_MAX_TIMEOUT: float = Field(
+        default=60.0, description="Maximum seconds a client may wait for a job"
+    )
+    JOB_WAIT_POLL_INTERVAL: float = Field(
+        default=2.0, description="Database re-check interval while job events are unavailable"
+    )
+    JOB_EVENTS_KEEPALIVE: float = Field(
+        default=15.0, description="Seconds between keep-alive comments on event streams"
+    )
+
+    # Upload Configuration
+    UPLOAD_CHUNK_SIZE: int = Field(
+        default=1024 * 1024, description="Bytes read from an uploaded file per chunk"
+    )
+    MAX_UPLOAD_SIZE: int = Field(
+        default=50 * 1024 * 1024, description="Maximum accepted upload size in bytes"
+    )
+    DEDUP_ENABLED: bool = Field(
+        default=True, description="Reuse stored originals and results for identical uploads"
+    )
+    MAX_RENDITIONS: int = Field(default=8, description="Maximum renditions per job")
+    IMAGE_DECODE_MODE: str = Field(
+        default="fast",
+        description=(
+            "fast decodes at reduced resolution when possible and derives smaller renditions from larger ones, "
+            "exact always decodes at full resolution and resamples every rendition from it"
+        ),
+    )
+    S3_MULTIPART_PART_SIZE: int = Field(
+        default=8 * 1024 * 1024, description="S3 multipart upload part size in bytes"
+    )
+    INLINE_MAX_BYTES: int = Field(
+        default=256 * 1024,
+        description="Uploads up to this size are rendered in the API server, 0 disables",
+    )
+    INLINE_MAX_PIXELS: int = Field(
+        default=1_000_000, description="Maximum source pixels rendered in the API server"
+    )
+    INLINE_WORKERS: int = Field(default=2, description="Processes rendering inline thumbnails")
+    INLINE_MAX_PENDING: int = Field(
+        default=8, description="Inline renders allowed to wait for a process before falling back to Celery"
+    )
+    MAX_BATCH_SIZE: int = Field(default=100, description="Maximum images per batch upload")
+    BATCH_UPLOAD_CONCURRENCY: int = Field(
+        default=8, description="Images of a batch stored to S3 concurrently"
+    )
+    PROBE_BYTES: int = Field(
+        default=256 * 1024, description="Leading bytes of an upload parsed to read the image header"
+    )
+    MAX_IMAGE_PIXELS: int = Field(
+        default=100_000_000, description="Images with more pixels are rejected as decompression bombs"
+    )
+
+    # Encoder Configuration
+    OUTPUT_FORMAT: str = Field(
+        default="", description="Format of renditions that do not set one, empty keeps the source format"
+    )
+    JPEG_PROGRESSIVE: bool = Field(default=True, description="Write progressive JPEGs")
+    JPEG_OPTIMIZE: bool = Field(default=True, description="Optimize JPEG Huffman tables")
+    JPEG_SUBSAMPLING: str = Field(
+        default="4:2:0", description="JPEG chroma subsampling (4:4:4, 4:2:2, 4:2:0)"
+    )
+    WEBP_METHOD: int = Field(
+        default=4, description="WebP encoder effort, 0 (fastest) to 6 (smallest)"
+    )
+    AVIF_SPEED: int = Field(
+        default=6, description="AVIF encoder speed, 0 (smallest) to 10 (fastest)"
+    )
+    AVIF_SUBSAMPLING: str = Field(
+        default="4:2:0", description="AVIF chroma subsampling (4:4:4, 4:2:2, 4:2:0)"
+    )
+    PNG_COMPRESS_LEVEL: int = Field(
+        default=6, description="PNG zlib compression level, 0 to 9"
+    )
+    PNG_OPTIMIZE: bool = Field(
+        default=False, description="Search for the smallest PNG encoding, slower"
+    )
+
+    # Queue Routing
+    SIZE_CLASS_ROUTING: bool = Field(
+        default=True, description="Route jobs to a queue by source image size"
+    )
+    SMALL_MAX_PIXELS: int = Field(
+        default=2_000_000, description="Sources up to this many pixels go to QUEUE_SMALL"
+    )
+    MEDIUM_MAX_PIXELS: int = Field(
+        default=25_000_000, description="Sources up to this many pixels go to QUEUE_MEDIUM, larger to QUEUE_HUGE"
+    )
+    QUEUE_SMALL: str = Field(default="thumbnail.small", description="Queue of small sources")
+    QUEUE_MEDIUM: str = Field(
+        default="thumbnail.medium", description="Queue of medium sources and sources of unknown size"
+    )
+    QUEUE_HUGE: str = Field(default="thumbnail.huge", description="Queue of huge sources")
 
     # validation
     @field_validator("LOG_LEVEL")
@@ -56,6 +302,108 @@ class Settings(BaseSettings):
             raise ValueError(f"Invalid LOG_LEVEL: {v}")
         return v.upper()
 
+    @field_validator("LOG_LEVEL_OVERRIDES")
+    @classmethod
+    def validate_log_level_overrides(cls, v: str) -> str:
+        allowed_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
+        overrides = []
+        for entry in filter(None, (entry.strip() for entry in v.split(","))):
+            name, _, level = entry.partition("=")
+            if not name.strip() or level.strip().upper() not in allowed_levels:
+                raise ValueError(f"Invalid LOG_LEVEL_OVERRIDES: {v}")
+            overrides.append(f"{name.strip()}={level.strip().upper()}")
+        return ",".join(overrides)
+
+    @field_validator("LOG_SAMPLE_RATE")
+    @classmethod
+    def validate_log_sample_rate(cls, v: float) -> float:
+        if not 0 <= v <= 1:
+            raise ValueError(f"Invalid LOG_SAMPLE_RATE: {v}")
+        return v
+
+    @field_validator("SWEEP_BATCH_SIZE")
+    @classmethod
+    def validate_sweep_batch_size(cls, v: int) -> int:
+        # S3 DeleteObjects accepts at most 1000 keys
+        if not 1 <= v <= 1000:
+            raise ValueError(f"Invalid SWEEP_BATCH_SIZE: {v}")
+        return v
+
+    @field_validator("CELERY_SERIALIZER")
+    @classmethod
+    def validate_celery_serializer(cls, v: str) -> str:
+        allowed_serializers = {"json", "msgpack", "msgpack-zlib"}
+        if v.lower() not in allowed_serializers:
+            raise ValueError(f"Invalid CELERY_SERIALIZER: {v}")
+        return v.lower()
+
+    @field_validator("IMAGE_DECODE_MODE")
+    @classmethod
+    def validate_image_decode_mode(cls, v: str) -> str:
+        allowed_modes = {"fast", "exact"}
+        if v.lower() not in allowed_modes:
+            raise ValueError(f"Invalid IMAGE_DECODE_MODE: {v}")
+        return v.lower()
+
+    @field_validator("STORAGE_BACKEND")
+    @classmethod
+    def validate_storage_backend(cls, v: str) -> str:
+        allowed_backends = {"s3", "local", "memory"}
+        if v.lower() not in allowed_backends:
+            raise ValueError(f"Invalid STORAGE_BACKEND: {v}")
+        return v.lower()
+
+    @field_validator("OUTPUT_FORMAT")
+    @classmethod
+    def validate_output_format(cls, v: str) -> str:
+        # Whether Pillow can write it is checked by ImageService.from_settings, so loading
+        # settings does not load every Pillow plugin
+        return "JPEG" if v.upper() == "JPG" else v.upper()
+
+    @field_validator("JPEG_SUBSAMPLING", "AVIF_SUBSAMPLING")
+    @classmethod
+    def validate_subsampling(cls, v: str) -> str:
+        if v not in {"4:4:4", "4:2:2", "4:2:0"}:
+            raise ValueError(f"Invalid subsampling: {v}")
+        return v
+
+    @field_validator("WEBP_METHOD")
+    @classmethod
+    def validate_webp_method(cls, v: int) -> int:
+        if not 0 <= v <= 6:
+            raise ValueError(f"Invalid WEBP_METHOD: {v}")
+        return v
+
+    @field_validator("AVIF_SPEED")
+    @classmethod
+    def validate_avif_speed(cls, v: int) -> int:
+        if not 0 <= v <= 10:
+            raise ValueError(f"Invalid AVIF_SPEED: {v}")
+        return v
+
+    @field_validator("PNG_COMPRESS_LEVEL")
+    @classmethod
+    def validate_png_compress_level(cls, v: int) -> int:
+        if not 0 <= v <= 9:
+            raise ValueError(f"Invalid PNG_COMPRESS_LEVEL: {v}")
+        return v
+
+    @field_validator("S3_RETRY_MODE")
+    @classmethod
+    def validate_s3_retry_mode(cls, v: str) -> str:
+        allowed_modes = {"legacy", "standard", "adaptive"}
+        if v.lower() not in allowed_modes:
+            raise ValueError(f"Invalid S3_RETRY_MODE: {v}")
+        return v.lower()
+
+    @field_validator("S3_MULTIPART_PART_SIZE")
+    @classmethod
+    def validate_multipart_part_size(cls, v: int) -> int:
+        # S3 rejects multipart uploads whose non-final parts are below 5 MiB
+        if v < 5 * 1024 * 1024:
+            raise ValueError(f"Invalid S3_MULTIPART_PART_SIZE: {v}")
+        return v
+
     @field_validator("ENVIRONMENT")
     @classmethod
     def validate_environment(cls, v: str) -> str:
@@ -65,14 +413,40 @@ class Settings(BaseSettings):
         return v.lower()
 
 
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
 def get_settings() -> Settings:
     """
     Get application settings.
 
-    This function creates a new Settings instance each time it's called,
-    allowing for dynamic environment variable
+    Settings are parsed from the environment and `.env` files on the first call;
+    later calls return the same snapshot, so dependencies do not re-read them on
+    every request. Call `reload_settings` to pick up changes.
+
+    Returns:
+        Settings: Application configuration
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """
+    Parse the settings again and return them from `get_settings` from now on.
+
+    Services already built from the previous snapshot, such as the database
+    engines and S3 clients, keep using it.
 
     Returns:
         Settings: Application configuration
     """
-    return Settings()
+    global _settings
+    with _settings_lock:
+        _settings = Settings()
+    return _settings
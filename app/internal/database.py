@@ -1,18 +1,101 @@
+import os
+import threading
+import time
+
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.internal import models  # noqa: F401 - registers tables on SQLModel.metadata
 from app.internal.configuration.settings import Settings
+from app.internal.metrics import DB_STATEMENT_DURATION
 
 _engine = None
+_engine_lock = threading.Lock()
+_async_engine = None
+
+# Async drivers used when DATABASE_ASYNC_URL is not set
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def async_database_url(settings: Settings) -> str:
+    """DATABASE_ASYNC_URL, or DATABASE_URL with its driver swapped for an async one"""
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    url = make_url(settings.DATABASE_URL)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {url.get_backend_name()}, set DATABASE_ASYNC_URL")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(settings: Settings, url: str) -> dict:
+    options = {"echo": settings.DATABASE_ECHO, "pool_pre_ping": settings.DATABASE_POOL_PRE_PING}
+    # SQLite files need no connection pool tuning and in-memory databases reject it
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+    return options
+
+
+def instrument(engine: Engine) -> None:
+    """Observe the duration of every statement run on the engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context.statement_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def observe(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        DB_STATEMENT_DURATION.labels(
+            operation=operation if operation in OPERATIONS else "OTHER"
+        ).observe(time.perf_counter() - context.statement_started)
 
 
 def get_engine(settings: Settings):
     """Create database engine"""
     global _engine
     if _engine is None:
-        _engine = create_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+        # Worker warm-up creates it in a background thread, possibly while a task does
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(settings.DATABASE_URL, **engine_options(settings, settings.DATABASE_URL))
+                instrument(engine)
+                _engine = engine
     return _engine
 
 
+def get_async_engine(settings: Settings) -> AsyncEngine:
+    """Create the async database engine used by async routes"""
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url(settings)
+        _async_engine = create_async_engine(url, **engine_options(settings, url))
+        instrument(_async_engine.sync_engine)
+    return _async_engine
+
+
+def _reset_engines_after_fork() -> None:
+    # Pooled connections must not be shared with the parent process
+    global _engine, _engine_lock, _async_engine
+    for engine in (_engine, _async_engine and _async_engine.sync_engine):
+        if engine is not None:
+            engine.dispose(close=False)
+    _engine = None
+    _engine_lock = threading.Lock()
+    _async_engine = None
+
+
+os.register_at_fork(after_in_child=_reset_engines_after_fork)
+
+
 def create_db_and_tables(settings: Settings):
     """Initialize database and create tables"""
     engine = get_engine(settings)
@@ -24,3 +107,16 @@ def get_session(settings: Settings):
     engine = get_engine(settings)
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session(settings: Settings):
+    """Dependency to get async database session"""
+    async with AsyncSession(get_async_engine(settings), expire_on_commit=False) as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
@@ -1,8 +1,24 @@
 from fastapi import Depends
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.internal.configuration.settings import Settings, get_settings
-from app.internal.database import get_session
-from app.internal.services.storage import StorageService
+from app.internal.database import get_async_session, get_session
+from app.internal.services.admission import (
+    AdmissionController,
+    RateLimiter,
+    get_admission_controller,
+    get_rate_limiter,
+)
+from app.internal.services.content_index import ContentIndexService
+from app.internal.services.events import JobEventHub, get_job_event_hub
+from app.internal.services.inline import InlineRenderer, get_inline_renderer
+from app.internal.services.jobs import AsyncJobService, JobService, get_job_cache
+from app.internal.services.storage import (
+    AsyncStorageService,
+    StorageService,
+    create_storage_service,
+)
 
 
 def get_db_session(settings: Settings = Depends(get_settings)):
@@ -10,6 +26,58 @@ def get_db_session(settings: Settings = Depends(get_settings)):
     yield from get_session(settings)
 
 
+async def get_async_db_session(settings: Settings = Depends(get_settings)):
+    """Get async database session dependency"""
+    async for session in get_async_session(settings):
+        yield session
+
+
 def get_storage_service(settings: Settings = Depends(get_settings)) -> StorageService:
     """Get Storage service dependency"""
-    return StorageService(settings)
+    return create_storage_service(settings)
+
+
+def get_async_storage_service(
+    storage_service: StorageService = Depends(get_storage_service),
+) -> AsyncStorageService:
+    """Get non-blocking Storage service dependency"""
+    return AsyncStorageService(storage_service)
+
+
+def get_content_index(session: Session = Depends(get_db_session)) -> ContentIndexService:
+    """Get content index service dependency"""
+    return ContentIndexService(session)
+
+
+def get_job_service(
+    session: Session = Depends(get_db_session), settings: Settings = Depends(get_settings)
+) -> JobService:
+    """Get job store dependency"""
+    return JobService(session, get_job_cache(settings))
+
+
+def get_async_job_service(
+    session: AsyncSession = Depends(get_async_db_session), settings: Settings = Depends(get_settings)
+) -> AsyncJobService:
+    """Get non-blocking job store dependency"""
+    return AsyncJobService(session, get_job_cache(settings))
+
+
+def get_inline_render_service(settings: Settings = Depends(get_settings)) -> InlineRenderer:
+    """Get inline renderer dependency"""
+    return get_inline_renderer(settings)
+
+
+def get_event_hub(settings: Settings = Depends(get_settings)) -> JobEventHub:
+    """Get job event hub dependency"""
+    return get_job_event_hub(settings)
+
+
+def get_admission(settings: Settings = Depends(get_settings)) -> AdmissionController:
+    """Get admission controller dependency"""
+    return get_admission_controller(settings)
+
+
+def get_upload_rate_limiter(settings: Settings = Depends(get_settings)) -> RateLimiter:
+    """Get upload rate limiter dependency"""
+    return get_rate_limiter(settings)
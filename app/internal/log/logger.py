@@ -1,23 +1,39 @@
 import logging
+import os
+import queue
+import random
 import sys
-from typing import Optional
+import threading
+from typing import Optional, TextIO
 
 from loguru import logger
 
 from app.internal.configuration.settings import Settings
+from app.internal.metrics import LOG_RECORDS_DROPPED
 
 _app_logger = None
+_sampled_logger = None
 
 
 class InterceptHandler(logging.Handler):
     """Intercept standard logging and redirect to loguru"""
 
+    def __init__(self, find_caller: bool = True):
+        super().__init__()
+        self.find_caller = find_caller
+
     def emit(self, record):
         try:
             level = logger.level(record.levelname).name
         except ValueError:
             level = record.levelno
 
+        if not self.find_caller:
+            # Walking the stack costs more than the rest of the record; name the logger instead
+            # Bound rather than passed to log(), which would format the message with it
+            logger.bind(logger_name=record.name).opt(exception=record.exc_info).log(level, record.getMessage())
+            return
+
         # Find caller from where originated the logged message
         frame, depth = logging.currentframe(), 2
         while frame and frame.f_code.co_filename == logging.__file__:
@@ -31,6 +47,102 @@ class InterceptHandler(logging.Handler):
         )
 
 
+class QueueSink:
+    """
+    Writes formatted records to a stream from a background thread.
+
+    Unlike loguru's ``enqueue=True``, the queue is bounded and never blocks
+    the logging thread: when the writer falls behind, records are dropped and
+    counted instead of stalling requests on a slow stdout.
+    """
+
+    def __init__(self, stream: TextIO, max_size: int):
+        self.stream = stream
+        self.max_size = max_size
+        self.dropped = 0
+        self._pid = None
+        self._start()
+
+    def _start(self) -> None:
+        self._queue: queue.Queue[str | None] = queue.Queue(self.max_size)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            try:
+                self.stream.write(message)
+                # Write out whatever else is waiting before flushing
+                while not self._queue.empty():
+                    message = self._queue.get_nowait()
+                    if message is None:
+                        return
+                    self.stream.write(message)
+                self.stream.flush()
+            except Exception:
+                pass
+
+    def write(self, message: str) -> None:
+        if self._pid != os.getpid():
+            # The writer thread does not survive a fork; prefork children start their own
+            self._start()
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def stop(self) -> None:
+        """Write out the queued records; called by loguru when the sink is removed"""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self.stream.flush()
+
+
+class SampledLogger:
+    """
+    Logs a LOG_SAMPLE_RATE fraction of the records given to it.
+
+    For high-frequency records of successful operations, where a sample is as
+    useful as the full stream; warnings and errors go to the plain logger.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        self.rate = rate
+
+    def keep(self) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        if self.keep():
+            logger.opt(depth=1).debug(message, *args, **self._extra(kwargs))
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        if self.keep():
+            logger.opt(depth=1).info(message, *args, **self._extra(kwargs))
+
+    def _extra(self, kwargs: dict) -> dict:
+        # Lets log queries scale counts back up
+        if self.rate < 1:
+            kwargs["sample_rate"] = self.rate
+        return kwargs
+
+
+def level_overrides(settings: Settings) -> dict[str, str]:
+    """LOG_LEVEL_OVERRIDES as logger name -> level"""
+    overrides = {}
+    for entry in filter(None, settings.LOG_LEVEL_OVERRIDES.split(",")):
+        name, _, level = entry.partition("=")
+        overrides[name] = level
+    return overrides
+
+
 class AppLogger:
     """Application logger using loguru"""
 
@@ -46,30 +158,41 @@ class AppLogger:
         if not self._configured and settings:
             self.configure(settings)
 
-    def configure(self, settings: Settings) -> None:
-        """Configure logger with application settings."""
-        if self._configured:
+    def configure(self, settings: Settings, force: bool = False) -> None:
+        """Configure logger with application settings; ``force`` replaces an earlier configuration."""
+        if self._configured and not force:
             return
 
+        production = settings.ENVIRONMENT == "production"
+        overrides = level_overrides(settings)
+        levels = [logger.level(level).no for level in [settings.LOG_LEVEL, *overrides.values()]]
+
         # Remove all existing handlers
         logger.remove()
 
-        # Intercept standard logging
-        logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
+        # Intercept standard logging; records below LOG_LEVEL are discarded before reaching loguru
+        logging.basicConfig(
+            handlers=[InterceptHandler(find_caller=not production)], level=settings.LOG_LEVEL, force=True
+        )
 
         # Configure all existing loggers to use our handler
         for name in logging.root.manager.loggerDict.keys():
             logging.getLogger(name).handlers = []
             logging.getLogger(name).propagate = True
 
+        # Noisy modules log at their own level, whether they use loguru or standard logging
+        for name, level in overrides.items():
+            logging.getLogger(name).setLevel(level)
+        log_filter = {"": settings.LOG_LEVEL, **overrides} if overrides else None
+
         # Configure log output
-        if settings.ENVIRONMENT == "production":
+        if production:
             logger.add(
-                sys.stdout,
-                level=settings.LOG_LEVEL,
+                QueueSink(sys.stdout, settings.LOG_QUEUE_SIZE),
+                level=min(levels),
+                filter=log_filter,
                 serialize=True,
                 colorize=False,
-                enqueue=True,
                 catch=True,
                 backtrace=False,
                 diagnose=False,
@@ -84,7 +207,8 @@ class AppLogger:
                     "<cyan>{line}</cyan> - "
                     "<level>{message}</level>"
                 ),
-                level=settings.LOG_LEVEL,
+                level=min(levels),
+                filter=log_filter,
                 colorize=True,
                 enqueue=True,
                 catch=True,
@@ -92,6 +216,7 @@ class AppLogger:
                 diagnose=settings.DEBUG,
             )
 
+        get_sampled_logger().rate = settings.LOG_SAMPLE_RATE
         self._configured = True
         logger.info(
             "Logger configured",
@@ -110,3 +235,11 @@ def get_logger():
     if _app_logger is None:
         _app_logger = AppLogger()
     return _app_logger.get_logger()
+
+
+def get_sampled_logger() -> SampledLogger:
+    """Get the logger for high-frequency success records"""
+    global _sampled_logger
+    if _sampled_logger is None:
+        _sampled_logger = SampledLogger()
+    return _sampled_logger
@@ -0,0 +1,123 @@
+"""Prometheus metrics shared by the API server and Celery workers.
+
+Processes that fork (prefork Celery workers, multiple uvicorn workers) must set
+``PROMETHEUS_MULTIPROC_DIR`` so every child's samples are aggregated on export.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+JOB_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+BYTES_BUCKETS = tuple(1024 * 4**i for i in range(10))  # 1 KiB .. 256 MiB
+PIXEL_BUCKETS = tuple(10**5 * 2**i for i in range(10))  # 0.1 MP .. 51 MP
+
+HTTP_REQUEST_DURATION = Histogram(
+    "thumbnail_http_request_duration_seconds",
+    "Time to produce an HTTP response, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+UPLOAD_BYTES = Histogram(
+    "thumbnail_upload_bytes",
+    "Size of uploaded source images",
+    buckets=BYTES_BUCKETS,
+)
+S3_REQUEST_DURATION = Histogram(
+    "thumbnail_s3_request_duration_seconds",
+    "S3 API call latency, by operation",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENT_DURATION = Histogram(
+    "thumbnail_db_statement_duration_seconds",
+    "SQL statement execution time, by statement type",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+IMAGE_STAGE_DURATION = Histogram(
+    "thumbnail_image_stage_duration_seconds",
+    "Time spent decoding, resizing and encoding images",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+IMAGE_DECODED_PIXELS = Histogram(
+    "thumbnail_image_decoded_pixels",
+    "Pixels held in memory after decoding a source image",
+    buckets=PIXEL_BUCKETS,
+)
+JOB_QUEUE_WAIT = Histogram(
+    "thumbnail_job_queue_wait_seconds",
+    "Time between publishing a job and a worker starting it",
+    buckets=JOB_BUCKETS,
+)
+JOB_DURATION = Histogram(
+    "thumbnail_job_duration_seconds",
+    "Time between submitting a job and it finishing, by final state",
+    ["state"],
+    buckets=JOB_BUCKETS,
+)
+SOURCE_CACHE_REQUESTS = Counter(
+    "thumbnail_source_cache_requests",
+    "Source reads by workers, by whether the local source cache served them",
+    ["result"],
+)
+SWEEP_DELETED = Counter(
+    "thumbnail_sweep_deleted",
+    "Objects and rows deleted by the retention sweeper, by artifact class",
+    ["artifact"],
+)
+SWEEP_RECLAIMED_BYTES = Counter(
+    "thumbnail_sweep_reclaimed_bytes",
+    "Storage freed by the retention sweeper, by artifact class",
+    ["artifact"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "thumbnail_log_records_dropped",
+    "Log records discarded because the log writer fell behind",
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the duration of the block, including when it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target = histogram.labels(**labels) if labels else histogram
+        target.observe(time.perf_counter() - start)
+
+
+def get_registry() -> CollectorRegistry:
+    """Registry to export; aggregates every process in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Metrics in the Prometheus text format and their content type"""
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def start_exporter(port: int) -> None:
+    """Serve /metrics on a background thread, for processes without an HTTP server"""
+    start_http_server(port, registry=get_registry())
+
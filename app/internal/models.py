@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import Field, SQLModel
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OriginalImage(SQLModel, table=True):
+    """Stored original image, addressed by the SHA-256 of its content"""
+
+    __tablename__ = "original_images"
+
+    content_hash: str = Field(primary_key=True, max_length=64)
+    key: str = Field(index=True, description="Storage key of the original")
+    size: int = Field(description="Size in bytes")
+    created_at: datetime = Field(default_factory=utcnow)
+    last_used_at: datetime = Field(default_factory=utcnow, description="Last time an upload reused it")
+
+
+class ThumbnailResult(SQLModel, table=True):
+    """Finished job result for a given original and set of rendition parameters"""
+
+    __tablename__ = "thumbnail_results"
+
+    content_hash: str = Field(primary_key=True, max_length=64)
+    params_hash: str = Field(primary_key=True, max_length=64)
+    job_id: str = Field(index=True, description="Job that produced the result")
+    result: dict = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=utcnow)
+    last_used_at: datetime = Field(default_factory=utcnow, description="Last time a job reused it")
+
+
+class Batch(SQLModel, table=True):
+    """Jobs submitted together through the batch upload endpoint"""
+
+    __tablename__ = "batches"
+
+    batch_id: str = Field(primary_key=True, max_length=36)
+    job_ids: list[str] = Field(sa_column=Column(JSON, nullable=False))
+    created_at: datetime = Field(default_factory=utcnow)
+
+
+class Job(SQLModel, table=True):
+    """
+    State of a thumbnail job, written at submission and updated by workers.
+
+    ``id`` only orders jobs for paging; clients address jobs by ``job_id``.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Listing filters on status and pages by id; the admission check counts running jobs
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_id: str = Field(max_length=36, unique=True, index=True)
+    status: str = Field(max_length=50, description="Celery state name")
+    batch_id: Optional[str] = Field(default=None, max_length=36, index=True)
+    queue: Optional[str] = Field(default=None, description="Queue the job was routed to")
+    source_key: str = Field(index=True, description="Storage key of the original")
+    source_size: Optional[int] = Field(default=None, description="Size of the original in bytes")
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    result_key: Optional[str] = Field(default=None, description="Storage key of the first rendition")
+    result_job_id: Optional[str] = Field(
+        default=None,
+        max_length=36,
+        index=True,
+        description="Job whose thumbnails the result points at, an earlier one when the result was reused",
+    )
+    result_size: Optional[int] = Field(default=None, description="Total size of every stored thumbnail in bytes")
+    result: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = Field(default=None)
+    attempts: int = Field(default=0, description="Times a worker started the job")
+    submitted_at: datetime = Field(default_factory=utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    updated_at: datetime = Field(default_factory=utcnow, index=True)
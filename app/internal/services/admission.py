@@ -0,0 +1,169 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional
+
+from celery import states
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.internal.configuration.settings import Settings
+from app.internal.database import get_engine
+from app.internal.log.logger import get_logger
+from app.internal.models import utcnow
+from app.internal.services.jobs import JobService
+from app.internal.tasks.celery import celery_app
+
+logger = get_logger()
+
+# States of jobs a worker has picked up but not finished
+IN_FLIGHT_STATES = [states.STARTED, states.RETRY]
+# Rate limit buckets kept per process; the least recently seen clients are dropped first
+MAX_TRACKED_CLIENTS = 10_000
+
+_admission: Optional["AdmissionController"] = None
+_rate_limiter: Optional["RateLimiter"] = None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """Take ``cost`` tokens; returns 0 on success, else seconds until they are available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if cost > self.capacity:
+            return math.inf
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Per-client token buckets refilled at RATE_LIMIT_PER_MINUTE images per minute.
+
+    Buckets live in the API process, so with several replicas each one enforces
+    the limit separately.
+    """
+
+    def __init__(self, settings: Settings):
+        self.rate = settings.RATE_LIMIT_PER_MINUTE / 60
+        self.capacity = settings.RATE_LIMIT_BURST
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, client: str, cost: int = 1) -> float:
+        """Charge ``cost`` images to the client; returns 0 if allowed, else seconds to wait"""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity, now)
+                self._buckets[client] = bucket
+                if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.take(cost, now)
+
+
+class AdmissionController:
+    """
+    Refuses new jobs while the backlog is above ADMISSION_MAX_BACKLOG.
+
+    The backlog is the number of messages waiting in the thumbnail queues plus
+    the jobs workers are processing. Measuring it costs a broker round-trip and
+    a database query, so the value is cached for ADMISSION_CACHE_SECONDS and
+    shared by every request of the process.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.max_backlog = settings.ADMISSION_MAX_BACKLOG
+        self.queues = list(
+            dict.fromkeys(["celery", settings.QUEUE_SMALL, settings.QUEUE_MEDIUM, settings.QUEUE_HUGE])
+        )
+        self._backlog: int | None = None
+        self._measured_at = -math.inf
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_backlog > 0
+
+    def queued(self) -> int:
+        """Messages waiting in the thumbnail queues"""
+        total = 0
+        with celery_app.connection_for_read() as connection:
+            for queue in self.queues:
+                # A failed passive declare closes the channel on AMQP, so use one per queue
+                channel = connection.channel()
+                try:
+                    total += channel.queue_declare(queue=queue, passive=True).message_count
+                except connection.channel_errors:
+                    pass  # Queue not declared yet
+                finally:
+                    channel.close()
+        return total
+
+    def in_flight(self) -> int:
+        """Jobs started by a worker within ADMISSION_IN_FLIGHT_MAX_AGE that have not finished"""
+        cutoff = utcnow() - timedelta(seconds=self.settings.ADMISSION_IN_FLIGHT_MAX_AGE)
+        with Session(get_engine(self.settings)) as session:
+            return JobService(session).count(IN_FLIGHT_STATES, cutoff)
+
+    def measure(self) -> int:
+        return self.queued() + self.in_flight()
+
+    async def backlog(self) -> int | None:
+        """Cached backlog; None if it could not be measured"""
+        if time.monotonic() - self._measured_at < self.settings.ADMISSION_CACHE_SECONDS:
+            return self._backlog
+        async with self._lock:
+            # Another request may have refreshed it while this one waited
+            if time.monotonic() - self._measured_at >= self.settings.ADMISSION_CACHE_SECONDS:
+                try:
+                    self._backlog = await run_in_threadpool(self.measure)
+                except Exception as e:
+                    logger.warning("Failed to measure job backlog", error=str(e))
+                    self._backlog = None
+                self._measured_at = time.monotonic()
+        return self._backlog
+
+    async def admit(self, cost: int = 1) -> bool:
+        """Whether ``cost`` more jobs may be accepted; admits when the backlog is unknown"""
+        if not self.enabled:
+            return True
+        backlog = await self.backlog()
+        return backlog is None or backlog + cost <= self.max_backlog
+
+
+def get_admission_controller(settings: Settings) -> AdmissionController:
+    """Get the admission controller of the running API process"""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController(settings)
+    return _admission
+
+
+def get_rate_limiter(settings: Settings) -> RateLimiter:
+    """Get the rate limiter of the running API process"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(settings)
+    return _rate_limiter
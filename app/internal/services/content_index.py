@@ -0,0 +1,99 @@
+import hashlib
+import json
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger
+from app.internal.models import OriginalImage, ThumbnailResult, utcnow
+from app.internal.services.image import Rendition, encoder_options, normalize_format
+
+logger = get_logger()
+
+
+def renditions_hash(renditions: list[Rendition], settings: Settings) -> str:
+    """
+    Stable hash of the rendition parameters of a job, as resolved with the settings.
+
+    Renditions without a format take OUTPUT_FORMAT, and the encoder options of
+    every format written are part of the hash, so a configuration change does
+    not reuse thumbnails encoded under the previous one.
+    """
+    output_format = normalize_format(settings.OUTPUT_FORMAT) if settings.OUTPUT_FORMAT else None
+    options = encoder_options(settings)
+    canonical = []
+    for r in renditions:
+        # None keeps the source format, which the content hash already determines
+        img_format = r.format or output_format
+        formats = [img_format, *r.variants] if img_format else list(options)
+        canonical.append(
+            r.model_dump()
+            | {
+                "name": r.key_name,
+                "format": img_format,
+                "encoder_options": {f: options.get(f, {}) for f in formats},
+            }
+        )
+    params = {"renditions": canonical, "decode_mode": settings.IMAGE_DECODE_MODE}
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+class ContentIndexService:
+    """Database index of uploaded content used to deduplicate originals and results"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find_original(self, content_hash: str) -> OriginalImage | None:
+        """Stored original with this content, claimed for reuse"""
+        original = self.session.get(OriginalImage, content_hash)
+        if original is None or not self._claim(original, OriginalImage.content_hash == content_hash):
+            return None
+        return original
+
+    def find_result(self, content_hash: str, params_hash: str) -> ThumbnailResult | None:
+        """Finished result for this content and these parameters, claimed for reuse"""
+        result = self.session.get(ThumbnailResult, (content_hash, params_hash))
+        if result is None or not self._claim(
+            result, ThumbnailResult.content_hash == content_hash, ThumbnailResult.params_hash == params_hash
+        ):
+            return None
+        return result
+
+    def _claim(self, entry: OriginalImage | ThumbnailResult, *conditions) -> bool:
+        """
+        Mark an entry used now; False if it has been removed since it was read.
+
+        The retention sweep only removes entries unused within the retention
+        and keeps the objects of the others, so a claimed entry stays valid.
+        One the sweep removed first is treated as a miss and the upload stores
+        its own copy.
+        """
+        claimed = self.session.execute(update(type(entry)).where(*conditions).values(last_used_at=utcnow()))
+        self.session.commit()
+        if claimed.rowcount == 0:
+            return False
+        # Load it again here rather than lazily wherever it is next read
+        self.session.refresh(entry)
+        return True
+
+    def record_original(self, content_hash: str, key: str, size: int) -> None:
+        self._insert(OriginalImage(content_hash=content_hash, key=key, size=size))
+
+    def record_result(self, content_hash: str, params_hash: str, job_id: str, result: dict) -> None:
+        self._insert(
+            ThumbnailResult(
+                content_hash=content_hash, params_hash=params_hash, job_id=job_id, result=result
+            )
+        )
+
+    def _insert(self, row) -> None:
+        # Concurrent identical uploads race to insert the same key; first one wins
+        try:
+            self.session.add(row)
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            logger.debug("Content index entry already exists: {}", type(row).__name__)
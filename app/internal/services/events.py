@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger
+from app.internal.models import utcnow
+
+logger = get_logger()
+
+_publisher: Optional["JobEventPublisher"] = None
+_publisher_lock = threading.Lock()
+_hub: Optional["JobEventHub"] = None
+
+
+def get_events_url(settings: Settings) -> str:
+    """Redis URL used for job events; defaults to the broker when it is Redis"""
+    if settings.JOB_EVENTS_URL:
+        return settings.JOB_EVENTS_URL
+    if settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+        return settings.CELERY_BROKER_URL
+    return ""
+
+
+def job_event(job_id: str, status: str, result: dict | None = None) -> dict:
+    return {
+        "job_id": job_id,
+        "status": status,
+        "date_done": utcnow().isoformat(),
+        "result": result,
+    }
+
+
+class JobEventPublisher:
+    """Publishes job state changes to a Redis pub/sub channel per job"""
+
+    def __init__(self, settings: Settings):
+        self.url = get_events_url(settings)
+        self.prefix = settings.JOB_EVENTS_CHANNEL_PREFIX
+        self._client = None
+        if self.url:
+            # Imported on use, as redis is not needed without an events URL
+            import redis
+
+            self._client = redis.Redis.from_url(self.url)
+
+    def publish(self, job_id: str, status: str, result: dict | None = None) -> None:
+        if self._client is None:
+            return
+        try:
+            self._client.publish(f"{self.prefix}{job_id}", json.dumps(job_event(job_id, status, result)))
+        except Exception as e:
+            # Subscribers fall back to the database, so a lost event only adds latency
+            logger.warning("Failed to publish job event", job_id=job_id, error=str(e))
+
+
+def get_job_event_publisher(settings: Settings) -> JobEventPublisher:
+    """Get the process-wide job event publisher"""
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = JobEventPublisher(settings)
+    return _publisher
+
+
+def _reset_publisher_after_fork() -> None:
+    global _publisher, _publisher_lock
+    _publisher = None
+    _publisher_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_publisher_after_fork)
+
+
+class JobWaiter:
+    """Handle returned by JobEventHub.subscribe"""
+
+    def __init__(self, hub: "JobEventHub", job_id: str):
+        self.hub = hub
+        self.job_id = job_id
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.generation: int | None = None
+
+    def checkpoint(self) -> None:
+        """Mark the point after which events are known to be delivered; call before reading the database"""
+        self.generation = self.hub.generation if self.hub.connected else None
+
+    @property
+    def reliable(self) -> bool:
+        """
+        Whether every event since the last checkpoint has been delivered.
+
+        Events published while the hub was not listening are lost, so callers
+        must keep checking the database until the hub has stayed connected
+        since their last check.
+        """
+        return (
+            self.generation is not None
+            and self.hub.connected
+            and self.hub.generation == self.generation
+        )
+
+    async def wait(self, timeout: float) -> dict | None:
+        """Wait for the job's next event; None on timeout"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def __aenter__(self) -> "JobWaiter":
+        self.hub._waiters[self.job_id].add(self.future)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        waiters = self.hub._waiters.get(self.job_id)
+        if waiters is not None:
+            waiters.discard(self.future)
+            if not waiters:
+                del self.hub._waiters[self.job_id]
+        self.future.cancel()
+
+
+class JobEventHub:
+    """
+    Fans job events out to waiting requests.
+
+    A single pattern subscription per API process receives every job event and
+    resolves the futures of requests waiting on that job, so waiters cost no
+    database queries and no extra Redis connections.
+    """
+
+    def __init__(self, settings: Settings):
+        self.url = get_events_url(settings)
+        self.prefix = settings.JOB_EVENTS_CHANNEL_PREFIX
+        self.connected = False
+        # Incremented on every (re)connect so waiters can detect missed events
+        self.generation = 0
+        self._waiters: dict[str, set[asyncio.Future]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def start(self) -> None:
+        """Start listening for job events, if not already; must be called on the event loop"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._listen())
+
+    def subscribe(self, job_id: str) -> JobWaiter:
+        self.start()
+        return JobWaiter(self, job_id)
+
+    async def _listen(self) -> None:
+        import redis.asyncio
+
+        backoff = 1.0
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.prefix}*")
+                self.generation += 1
+                self.connected = True
+                backoff = 1.0
+                logger.info("Listening for job events", channel=f"{self.prefix}*")
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job event subscription lost", error=str(e))
+            finally:
+                self.connected = False
+                await pubsub.aclose()
+                await client.aclose()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _dispatch(self, channel: bytes, data: bytes) -> None:
+        job_id = channel.decode()[len(self.prefix):]
+        futures = self._waiters.get(job_id)
+        if not futures:
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.warning("Malformed job event", job_id=job_id)
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(event)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def get_job_event_hub(settings: Settings) -> JobEventHub:
+    """Get the job event hub of the running API process"""
+    global _hub
+    if _hub is None:
+        _hub = JobEventHub(settings)
+    return _hub
+
+
+async def close_job_event_hub() -> None:
+    global _hub
+    if _hub is not None:
+        await _hub.close()
+        _hub = None
@@ -1,22 +1,283 @@
 import io
+import math
+from dataclasses import dataclass, field
+from typing import BinaryIO, Literal, Optional
 
 from PIL import Image, ImageOps
+from pydantic import BaseModel, Field, field_validator
 
-from app.internal.log.logger import get_logger
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger, get_sampled_logger
+from app.internal.metrics import IMAGE_DECODED_PIXELS, IMAGE_STAGE_DURATION, timed
 
 logger = get_logger()
+sampled_logger = get_sampled_logger()
+
+# Formats Pillow reports on open that should be written as something else
+_OUTPUT_FORMAT_ALIASES = {"JPG": "JPEG", "MPO": "JPEG"}
+# Formats whose encoder takes a quality setting; the others are lossless
+QUALITY_FORMATS = {"JPEG", "WEBP", "AVIF"}
+
+
+def normalize_format(img_format: str) -> str:
+    img_format = img_format.upper()
+    return _OUTPUT_FORMAT_ALIASES.get(img_format, img_format)
+
+
+def validate_output_format(v: str) -> str:
+    Image.init()
+    img_format = normalize_format(v)
+    if img_format not in Image.SAVE:
+        raise ValueError(f"Unsupported output format: {v}")
+    return img_format
+
+
+def encoder_options(settings: Settings) -> dict[str, dict]:
+    """Pillow save() options per output format"""
+    return {
+        "JPEG": {
+            "progressive": settings.JPEG_PROGRESSIVE,
+            "optimize": settings.JPEG_OPTIMIZE,
+            "subsampling": settings.JPEG_SUBSAMPLING,
+        },
+        "WEBP": {"method": settings.WEBP_METHOD},
+        "AVIF": {"speed": settings.AVIF_SPEED, "subsampling": settings.AVIF_SUBSAMPLING},
+        "PNG": {"compress_level": settings.PNG_COMPRESS_LEVEL, "optimize": settings.PNG_OPTIMIZE},
+    }
+
+
+class Rendition(BaseModel):
+    """A single requested output of a thumbnail job"""
+
+    name: Optional[str] = Field(
+        default=None,
+        pattern=r"^[A-Za-z0-9_-]{1,64}$",
+        description="Rendition name, defaults to '<width>x<height>'",
+    )
+    width: int = Field(gt=0, le=4096, description="Output width in pixels")
+    height: int = Field(gt=0, le=4096, description="Output height in pixels")
+    fit: Literal["cover", "contain", "pad"] = Field(
+        default="cover",
+        description="cover crops to the exact size, contain keeps the aspect ratio "
+        "within the size, pad letterboxes to the exact size",
+    )
+    format: Optional[str] = Field(
+        default=None, description="Output format, defaults to the source format"
+    )
+    quality: int = Field(
+        default=80, ge=1, le=100, description="Encoder quality, used by JPEG, WebP and AVIF"
+    )
+    variants: list[str] = Field(
+        default=[],
+        max_length=4,
+        description="Additional output formats, served to clients whose Accept header prefers them",
+    )
+
+    @field_validator("format")
+    @classmethod
+    def validate_format(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        return validate_output_format(v)
+
+    @field_validator("variants")
+    @classmethod
+    def validate_variants(cls, v: list[str]) -> list[str]:
+        return list(dict.fromkeys(validate_output_format(f) for f in v))
+
+    @property
+    def key_name(self) -> str:
+        return self.name or f"{self.width}x{self.height}"
+
+
+DEFAULT_RENDITIONS = [Rendition(width=100, height=100)]
+
+
+@dataclass
+class ImageProbe:
+    format: str
+    width: int
+    height: int
+    frames: int
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+
+def probe_image(header: bytes) -> ImageProbe:
+    """
+    Read format, dimensions and frame count from the start of an image.
+
+    Only the header is parsed, no pixels are decoded. Raises
+    UnidentifiedImageError for data that is not a supported image.
+    """
+    with Image.open(io.BytesIO(header)) as img:
+        try:
+            frames = getattr(img, "n_frames", 1)
+        except Exception:
+            # Counting frames may need data past the header
+            frames = 1
+        return ImageProbe(normalize_format(img.format), img.width, img.height, frames)
+
+
+@dataclass
+class RenderedImage:
+    rendition: Rendition
+    data: bytes
+    format: str
+    width: int
+    height: int
+    # Encodings of the same output in the rendition's variant formats
+    variants: dict[str, bytes] = field(default_factory=dict)
 
 
 class ImageService:
-    def __init__(self):
+    def __init__(
+        self,
+        decode_mode: str = "fast",
+        output_format: str = "",
+        encoder_options: Optional[dict[str, dict]] = None,
+        max_pixels: int = 0,
+    ):
+        """
+        Args:
+            decode_mode: "fast" lets the decoder skip resolution the outputs do
+                not need (JPEG DCT scaling, reduce() before resampling); "exact"
+                always decodes and resamples from full resolution.
+            output_format: Format of renditions that do not set one; empty keeps
+                the source format.
+            encoder_options: Extra Pillow save() options per format.
+            max_pixels: Sources with more pixels are refused before decoding;
+                0 leaves only Pillow's own limit.
+        """
         self.quality = 80
+        self.decode_mode = decode_mode
+        self.output_format = output_format
+        self.encoder_options = encoder_options or {}
+        self.max_pixels = max_pixels
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ImageService":
+        """Raises ValueError when Pillow cannot write OUTPUT_FORMAT"""
+        return cls(
+            settings.IMAGE_DECODE_MODE,
+            validate_output_format(settings.OUTPUT_FORMAT) if settings.OUTPUT_FORMAT else "",
+            encoder_options(settings),
+            settings.MAX_IMAGE_PIXELS,
+        )
 
     def resize(self, image_bytes: bytes, size: tuple[int, int] = (100, 100)) -> tuple[bytes, str]:
-        with io.BytesIO(image_bytes) as input_buffer:
-            with Image.open(input_buffer) as img:
-                img_format = img.format
-                img = ImageOps.fit(img, size, method=Image.Resampling.LANCZOS)
-                output_buffer = io.BytesIO()
-                img.save(output_buffer, format=img_format, quality=self.quality)
-                logger.info(f"Image resized to: {size}")
-                return output_buffer.getvalue(), img_format
\ No newline at end of file
+        rendition = Rendition(width=size[0], height=size[1], quality=self.quality)
+        rendered = self.render(image_bytes, [rendition])[0]
+        return rendered.data, rendered.format
+
+    def render(self, image_bytes: bytes | BinaryIO, renditions: list[Rendition]) -> list[RenderedImage]:
+        """
+        Produce every rendition from a single decode of the source image.
+
+        ``image_bytes`` may also be a seekable binary file, such as a
+        memory-mapped object from local storage, which is decoded in place.
+
+        Renditions are generated from the largest to the smallest. In "fast"
+        mode each one is derived from a progressively downscaled intermediate
+        so that later outputs never resample the full-resolution source again;
+        in "exact" mode each one is resampled from the decoded source.
+
+        Returns:
+            list[RenderedImage]: Outputs in the same order as ``renditions``
+        """
+        source = io.BytesIO(image_bytes) if isinstance(image_bytes, bytes) else image_bytes
+        with Image.open(source) as img:
+            if self.max_pixels and img.width * img.height > self.max_pixels:
+                raise ValueError(f"Image has {img.width * img.height} pixels, limit is {self.max_pixels}")
+            source_format = normalize_format(img.format)
+            if self.decode_mode == "fast":
+                self._draft(img, renditions)
+            with timed(IMAGE_STAGE_DURATION, stage="decode"):
+                img.load()
+            IMAGE_DECODED_PIXELS.observe(img.width * img.height)
+            working = img
+            rendered = {}
+            for index in sorted(
+                range(len(renditions)),
+                key=lambda i: self._scale(img.size, renditions[i]),
+                reverse=True,
+            ):
+                rendition = renditions[index]
+                with timed(IMAGE_STAGE_DURATION, stage="resize"):
+                    working = self._reduce(working if self.decode_mode == "fast" else img, rendition)
+                    output = self._fit(working, rendition)
+                img_format = rendition.format or self.output_format or source_format
+                with timed(IMAGE_STAGE_DURATION, stage="encode"):
+                    data = self._encode(output, img_format, rendition.quality)
+                    variants = {
+                        variant: self._encode(output, variant, rendition.quality)
+                        for variant in rendition.variants
+                        if variant != img_format
+                    }
+                rendered[index] = RenderedImage(
+                    rendition=rendition,
+                    data=data,
+                    format=img_format,
+                    width=output.width,
+                    height=output.height,
+                    variants=variants,
+                )
+            sampled_logger.info(
+                "Image rendered", renditions=[r.key_name for r in renditions], source_size=img.size
+            )
+            return [rendered[i] for i in range(len(renditions))]
+
+    @staticmethod
+    def _scale(size: tuple[int, int], rendition: Rendition) -> float:
+        """Scale factor of the source needed to produce the rendition"""
+        width_scale = rendition.width / size[0]
+        height_scale = rendition.height / size[1]
+        if rendition.fit == "cover":
+            return max(width_scale, height_scale)
+        return min(width_scale, height_scale)
+
+    def _draft(self, img: Image.Image, renditions: list[Rendition]) -> None:
+        """Ask the decoder for the smallest scale that still covers every rendition"""
+        scale = max(self._scale(img.size, r) for r in renditions)
+        if scale >= 1:
+            return
+        size = (math.ceil(img.width * scale), math.ceil(img.height * scale))
+        source_size = img.size
+        # Only JPEG implements draft; other formats ignore it
+        if img.draft(img.mode, size) is not None:
+            logger.debug("Decoding at {} instead of {}", img.size, source_size)
+
+    def _reduce(self, img: Image.Image, rendition: Rendition) -> Image.Image:
+        """Downscale the intermediate to the smallest size the rendition needs"""
+        scale = self._scale(img.size, rendition)
+        if scale >= 1:
+            return img
+        size = (
+            max(1, math.ceil(img.width * scale)),
+            max(1, math.ceil(img.height * scale)),
+        )
+        # reducing_gap box-reduces by an integer factor first, then resamples
+        # the remaining <2x with LANCZOS
+        reducing_gap = 2.0 if self.decode_mode == "fast" else None
+        return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+
+    @staticmethod
+    def _fit(img: Image.Image, rendition: Rendition) -> Image.Image:
+        size = (rendition.width, rendition.height)
+        if rendition.fit == "contain":
+            return ImageOps.contain(img, size, method=Image.Resampling.LANCZOS)
+        if rendition.fit == "pad":
+            return ImageOps.pad(img, size, method=Image.Resampling.LANCZOS)
+        return ImageOps.fit(img, size, method=Image.Resampling.LANCZOS)
+
+    def _encode(self, img: Image.Image, img_format: str, quality: int) -> bytes:
+        if img_format == "JPEG" and img.mode not in ("RGB", "L", "CMYK"):
+            img = img.convert("RGB")
+        options = dict(self.encoder_options.get(img_format, {}))
+        if img_format in QUALITY_FORMATS:
+            options["quality"] = quality
+        output_buffer = io.BytesIO()
+        img.save(output_buffer, format=img_format, **options)
+        return output_buffer.getvalue()
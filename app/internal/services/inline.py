@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import AppLogger, get_logger
+from app.internal.services.image import ImageService, RenderedImage, Rendition
+
+logger = get_logger()
+
+_renderer: Optional["InlineRenderer"] = None
+_renderer_lock = threading.Lock()
+
+
+def _render(image_bytes: bytes, renditions: list[Rendition], settings: Settings) -> list[RenderedImage]:
+    return ImageService.from_settings(settings).render(image_bytes, renditions)
+
+
+class InlineRenderer:
+    """
+    Renders small images inside the API server on a bounded process pool.
+
+    At most ``INLINE_WORKERS`` renders run at once and at most
+    ``INLINE_MAX_PENDING`` wait for a worker; callers that cannot get a slot
+    fall back to the Celery path instead of queueing behind other requests.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.max_bytes = settings.INLINE_MAX_BYTES
+        self.max_pixels = settings.INLINE_MAX_PIXELS
+        self.workers = settings.INLINE_WORKERS
+        self._slots = threading.BoundedSemaphore(settings.INLINE_WORKERS + settings.INLINE_MAX_PENDING)
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.workers > 0
+
+    def accepts(self, size: int, pixels: int | None) -> bool:
+        """Whether an image of ``size`` bytes and ``pixels`` from the upload's header probe can render inline"""
+        # Images the probe could not read are left to the worker, which records the failure
+        return pixels is not None and size <= self.max_bytes and pixels <= self.max_pixels
+
+    async def render(self, image_bytes: bytes, renditions: list[Rendition]) -> list[RenderedImage] | None:
+        """Render on the pool, or return None when the pool is saturated"""
+        if not self._slots.acquire(blocking=False):
+            logger.debug("Inline render pool saturated")
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), _render, image_bytes, renditions, self.settings
+            )
+        finally:
+            self._slots.release()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=get_context("spawn"),
+                initializer=AppLogger,
+                initargs=(self.settings,),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def get_inline_renderer(settings: Settings) -> InlineRenderer:
+    """Get the process-wide inline renderer"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = InlineRenderer(settings)
+    return _renderer
+
+
+def shutdown_inline_renderer() -> None:
+    global _renderer
+    if _renderer is not None:
+        _renderer.shutdown()
+        _renderer = None
@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from celery import states
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger
+from app.internal.models import Job, utcnow
+
+logger = get_logger()
+
+_cache: Optional["JobCache"] = None
+_cache_lock = threading.Lock()
+
+
+def result_size(result: dict) -> int:
+    """Total size of every thumbnail and variant listed in a job result"""
+    return sum(
+        rendition.get("size", 0) + sum(variant.get("size", 0) for variant in rendition.get("variants", []))
+        for rendition in result.get("renditions", [])
+    )
+
+
+def result_job_id(result: dict) -> Optional[str]:
+    """Job whose thumbnails a result points at, from the images/thumbnail/<job id>/ key of its first rendition"""
+    parts = (result.get("key") or "").split("/")
+    return parts[2] if len(parts) > 3 else None
+
+
+class JobCache:
+    """
+    Finished jobs by id, for clients that poll or fetch the same job repeatedly.
+
+    Only jobs in a ready state are cached: they no longer change, so entries
+    need no invalidation beyond ``ttl``, which bounds how long a deleted job
+    stays visible.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Job]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[job_id]
+                return None
+            self._entries.move_to_end(job_id)
+            return entry[1]
+
+    def put(self, job: Job) -> None:
+        if not self.enabled or job.status not in states.READY_STATES:
+            return
+        with self._lock:
+            self._entries[job.job_id] = (time.monotonic() + self.ttl, job)
+            self._entries.move_to_end(job.job_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, job_ids: Iterable[str]) -> None:
+        with self._lock:
+            for job_id in job_ids:
+                self._entries.pop(job_id, None)
+
+
+def get_job_cache(settings: Settings) -> JobCache:
+    """Get the process-wide job cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = JobCache(settings.JOB_CACHE_SIZE, settings.JOB_CACHE_TTL)
+    return _cache
+
+
+class JobService:
+    """Job state store, written by the API at submission and by workers as jobs run"""
+
+    def __init__(self, session: Session, cache: JobCache | None = None):
+        self.session = session
+        self.cache = cache
+
+    def get(self, job_id: str) -> Job | None:
+        if self.cache is not None:
+            job = self.cache.get(job_id)
+            if job is not None:
+                return job
+        job = self.session.exec(select(Job).where(Job.job_id == job_id)).first()
+        if job is not None and self.cache is not None and job.status in states.READY_STATES:
+            # Detach so a later commit on this session cannot expire the cached copy
+            self.session.expunge(job)
+            self.cache.put(job)
+        return job
+
+    def create(self, jobs: list[Job]) -> None:
+        """Record submitted jobs; must commit before their tasks are published"""
+        try:
+            self.session.add_all(jobs)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def mark_started(self, job_ids: list[str]) -> None:
+        now = utcnow()
+        self._update(
+            job_ids,
+            status=states.STARTED,
+            started_at=now,
+            updated_at=now,
+            attempts=Job.attempts + 1,
+        )
+
+    def mark_retry(self, job_id: str, error: str) -> None:
+        self._update([job_id], status=states.RETRY, error=error, updated_at=utcnow())
+
+    def mark_succeeded(self, job_id: str, result: dict) -> None:
+        now = utcnow()
+        self._update(
+            [job_id],
+            status=states.SUCCESS,
+            result=result,
+            result_key=result.get("key"),
+            result_job_id=result_job_id(result),
+            result_size=result_size(result),
+            error=None,
+            finished_at=now,
+            updated_at=now,
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        now = utcnow()
+        self._update([job_id], status=states.FAILURE, error=error, finished_at=now, updated_at=now)
+
+    def _update(self, job_ids: list[str], **values) -> None:
+        # Finished jobs are final; a late or duplicate delivery must not reopen them
+        statement = (
+            update(Job)
+            .where(Job.job_id.in_(job_ids), Job.status.not_in(states.READY_STATES))
+            .values(**values)
+        )
+        updated = self.session.execute(statement).rowcount
+        self.session.commit()
+        if updated != len(job_ids):
+            logger.debug("Job state not updated", job_ids=job_ids, status=values.get("status"))
+
+    def status_counts(self, batch_id: str) -> dict[str, int]:
+        statement = select(Job.status, func.count()).where(Job.batch_id == batch_id).group_by(Job.status)
+        return {status: count for status, count in self.session.exec(statement).all()}
+
+    def count(self, statuses: list[str], updated_since: datetime) -> int:
+        statement = select(func.count()).where(Job.status.in_(statuses), Job.updated_at >= updated_since)
+        return self.session.exec(statement).one()
+
+
+class AsyncJobService:
+    """Non-blocking reads of the job state store, for async routes"""
+
+    def __init__(self, session: AsyncSession, cache: JobCache | None = None):
+        self.session = session
+        self.cache = cache
+
+    async def get(self, job_id: str) -> Job | None:
+        if self.cache is not None:
+            job = self.cache.get(job_id)
+            if job is not None:
+                return job
+        job = (await self.session.exec(select(Job).where(Job.job_id == job_id))).first()
+        if job is not None and self.cache is not None and job.status in states.READY_STATES:
+            self.session.expunge(job)
+            self.cache.put(job)
+        return job
+
+    async def status_counts(self, batch_id: str) -> dict[str, int]:
+        statement = select(Job.status, func.count()).where(Job.batch_id == batch_id).group_by(Job.status)
+        return {status: count for status, count in (await self.session.exec(statement)).all()}
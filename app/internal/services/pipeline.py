@@ -0,0 +1,89 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from app.internal.log.logger import get_logger
+from app.internal.services.image import ImageService, RenderedImage, Rendition
+from app.internal.services.storage import StorageService
+
+logger = get_logger()
+
+
+@dataclass
+class PipelineJob:
+    job_id: str
+    key: str
+    renditions: list[Rendition]
+    content_hash: Optional[str] = None
+    # Set by the pipeline: "download", "render" or "upload", the stage a failed job failed in
+    stage: str = "download"
+
+
+# Called once per job, in submission order, with its result or the error that failed it
+JobCallback = Callable[[PipelineJob, Optional[dict], Optional[Exception]], None]
+SaveFunction = Callable[[StorageService, str, list[RenderedImage]], dict]
+
+
+class ThumbnailPipeline:
+    """
+    Overlaps storage I/O with rendering for a sequence of jobs.
+
+    Sources are downloaded up to ``prefetch`` jobs ahead and results are
+    uploaded on ``io_threads`` threads, while the calling thread only decodes,
+    resizes and encodes. A worker process therefore keeps its core busy instead
+    of waiting on the network between images.
+    """
+
+    def __init__(
+        self,
+        storage_service: StorageService,
+        image_service: ImageService,
+        save: SaveFunction,
+        io_threads: int = 4,
+        prefetch: int = 2,
+        load: Optional[Callable[[str], bytes]] = None,
+    ):
+        self.storage_service = storage_service
+        self.load = load or storage_service.load
+        self.image_service = image_service
+        self.save = save
+        self.io_threads = max(io_threads, 1)
+        self.prefetch = max(prefetch, 1)
+
+    def run(self, jobs: Iterable[PipelineJob], on_done: JobCallback) -> None:
+        jobs = iter(jobs)
+        downloads: deque[tuple[PipelineJob, Future]] = deque()
+        uploads: deque[tuple[PipelineJob, Future]] = deque()
+        with ThreadPoolExecutor(self.io_threads, thread_name_prefix="pipeline-io") as executor:
+
+            def fill_downloads() -> None:
+                while len(downloads) < self.prefetch:
+                    job = next(jobs, None)
+                    if job is None:
+                        return
+                    downloads.append((job, executor.submit(self.load, job.key)))
+
+            def drain_uploads(limit: int) -> None:
+                # Report finished jobs in order; block only while too many results are held in memory
+                while uploads and (len(uploads) > limit or uploads[0][1].done()):
+                    job, future = uploads.popleft()
+                    error = future.exception()
+                    on_done(job, future.result() if error is None else None, error)
+
+            fill_downloads()
+            while downloads:
+                job, download = downloads.popleft()
+                fill_downloads()
+                try:
+                    source = download.result()
+                    job.stage = "render"
+                    rendered = self.image_service.render(source, job.renditions)
+                except Exception as e:
+                    drain_uploads(0)
+                    on_done(job, None, e)
+                    continue
+                job.stage = "upload"
+                uploads.append((job, executor.submit(self.save, self.storage_service, job.job_id, rendered)))
+                drain_uploads(self.io_threads)
+            drain_uploads(0)
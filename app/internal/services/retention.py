@@ -0,0 +1,191 @@
+import time
+from datetime import datetime, timedelta
+from itertools import batched
+from typing import Callable
+
+from celery import states
+from celery.backends.database import DatabaseBackend, session_cleanup
+from sqlalchemy import delete, or_
+from sqlmodel import Session, select
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger
+from app.internal.metrics import SWEEP_DELETED, SWEEP_RECLAIMED_BYTES
+from app.internal.models import Batch, Job, OriginalImage, ThumbnailResult, utcnow
+from app.internal.services.storage import StorageService, StoredObject
+
+logger = get_logger()
+
+ORIGINALS_PREFIX = "images/original/"
+THUMBNAILS_PREFIX = "images/thumbnail/"
+# Thumbnails of a job are stored under THUMBNAILS_PREFIX + job id, and job ids are UUIDs
+JOB_ID_LENGTH = 36
+
+
+def thumbnail_job_id(key: str) -> str:
+    return key[len(THUMBNAILS_PREFIX):len(THUMBNAILS_PREFIX) + JOB_ID_LENGTH]
+
+
+class Throttle:
+    """Spaces out deletes to at most ``rate`` per second, 0 for no limit"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._started = time.monotonic()
+        self._count = 0
+
+    def wait(self, count: int) -> None:
+        """Account for ``count`` deletes, sleeping until they fit the rate"""
+        self._count += count
+        if self.rate > 0:
+            delay = self._started + self._count / self.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+
+class RetentionSweeper:
+    """
+    Deletes originals, thumbnails and records past their retention period.
+
+    An object expires once it is older than its retention and no job updated
+    within that period, or still running, refers to it; deduplicated uploads
+    share originals and thumbnails between jobs. Content index entries claimed
+    by an upload within the period keep their objects too, as the upload's job
+    may not exist yet. Objects are deleted up to
+    SWEEP_BATCH_SIZE per request and rows in batches of the same size, at most
+    SWEEP_MAX_DELETES_PER_SECOND, so a sweep does not compete with live traffic.
+    """
+
+    def __init__(self, settings: Settings, storage_service: StorageService, session: Session):
+        self.settings = settings
+        self.storage_service = storage_service
+        self.session = session
+        self.batch_size = settings.SWEEP_BATCH_SIZE
+        self.throttle = Throttle(settings.SWEEP_MAX_DELETES_PER_SECOND)
+
+    def sweep(self) -> dict[str, dict[str, int]]:
+        """Sweep every artifact class with a retention; returns what was deleted and reclaimed per class"""
+        now = utcnow()
+        sweeps: list[tuple[str, float, Callable[[datetime], tuple[int, int]]]] = [
+            ("originals", self.settings.RETENTION_ORIGINALS_DAYS, self.sweep_originals),
+            ("thumbnails", self.settings.RETENTION_THUMBNAILS_DAYS, self.sweep_thumbnails),
+            ("jobs", self.settings.RETENTION_JOBS_DAYS, self.sweep_jobs),
+            ("task_results", self.settings.RETENTION_TASK_RESULTS_DAYS, self.sweep_task_results),
+        ]
+        report = {}
+        for artifact, days, sweep in sweeps:
+            if days <= 0:
+                continue
+            started = time.monotonic()
+            try:
+                deleted, reclaimed = sweep(now - timedelta(days=days))
+            except Exception as e:
+                # Other classes are still worth sweeping; this one resumes on the next run
+                logger.error("Retention sweep failed", artifact=artifact, error=str(e))
+                self.session.rollback()
+                continue
+            SWEEP_DELETED.labels(artifact=artifact).inc(deleted)
+            SWEEP_RECLAIMED_BYTES.labels(artifact=artifact).inc(reclaimed)
+            report[artifact] = {"deleted": deleted, "reclaimed_bytes": reclaimed}
+            logger.info(
+                "Retention sweep finished",
+                artifact=artifact,
+                deleted=deleted,
+                reclaimed_bytes=reclaimed,
+                seconds=round(time.monotonic() - started, 1),
+            )
+        return report
+
+    @staticmethod
+    def _live(cutoff: datetime):
+        """Jobs that keep their originals and thumbnails: unfinished or updated within the retention"""
+        return or_(Job.status.not_in(states.READY_STATES), Job.updated_at >= cutoff)
+
+    def sweep_originals(self, cutoff: datetime) -> tuple[int, int]:
+        def in_use(batch: list[StoredObject]) -> set[str]:
+            keys = [stored.key for stored in batch]
+            # New uploads must not be deduplicated against originals about to be deleted. Entries an
+            # upload claimed within the retention stay, and so do their originals: that upload may
+            # not have created its job yet
+            self.session.execute(
+                delete(OriginalImage).where(OriginalImage.key.in_(keys), OriginalImage.last_used_at < cutoff)
+            )
+            self.session.commit()
+            claimed = select(OriginalImage.key).where(OriginalImage.key.in_(keys))
+            statement = select(Job.source_key).where(Job.source_key.in_(keys), self._live(cutoff))
+            return set(self.session.exec(claimed).all()) | set(self.session.exec(statement).all())
+
+        return self._sweep_objects(ORIGINALS_PREFIX, cutoff, in_use)
+
+    def sweep_thumbnails(self, cutoff: datetime) -> tuple[int, int]:
+        def in_use(batch: list[StoredObject]) -> set[str]:
+            job_ids = list({thumbnail_job_id(stored.key) for stored in batch})
+            self.session.execute(
+                delete(ThumbnailResult).where(
+                    ThumbnailResult.job_id.in_(job_ids), ThumbnailResult.last_used_at < cutoff
+                )
+            )
+            self.session.commit()
+            claimed = select(ThumbnailResult.job_id).where(ThumbnailResult.job_id.in_(job_ids))
+            # Jobs that reused an earlier result point at that job's thumbnails
+            statement = select(Job.result_job_id).where(Job.result_job_id.in_(job_ids), self._live(cutoff))
+            live_owners = set(self.session.exec(claimed).all()) | set(self.session.exec(statement).all())
+            return {stored.key for stored in batch if thumbnail_job_id(stored.key) in live_owners}
+
+        return self._sweep_objects(THUMBNAILS_PREFIX, cutoff, in_use)
+
+    def _sweep_objects(
+        self, prefix: str, cutoff: datetime, in_use: Callable[[list[StoredObject]], set[str]]
+    ) -> tuple[int, int]:
+        deleted, reclaimed = 0, 0
+        expired = (stored for stored in self.storage_service.list_objects(prefix) if stored.modified < cutoff)
+        for batch in batched(expired, self.batch_size):
+            batch = list(batch)
+            kept = in_use(batch)
+            sizes = {stored.key: stored.size for stored in batch if stored.key not in kept}
+            if not sizes:
+                continue
+            removed = self.storage_service.delete_many(list(sizes))
+            deleted += len(removed)
+            reclaimed += sum(sizes[key] for key in removed)
+            self.throttle.wait(len(sizes))
+        return deleted, reclaimed
+
+    def sweep_jobs(self, cutoff: datetime) -> tuple[int, int]:
+        jobs = self._delete_rows(Job.id, Job.status.in_(states.READY_STATES), Job.updated_at < cutoff)
+        batches = self._delete_rows(Batch.batch_id, Batch.created_at < cutoff)
+        return jobs + batches, 0
+
+    def _delete_rows(self, key_column, *conditions) -> int:
+        """Delete matching rows SWEEP_BATCH_SIZE at a time, committing each batch"""
+        deleted = 0
+        while True:
+            keys = self.session.exec(select(key_column).where(*conditions).limit(self.batch_size)).all()
+            if not keys:
+                return deleted
+            self.session.execute(delete(key_column.class_).where(key_column.in_(keys)))
+            self.session.commit()
+            deleted += len(keys)
+            self.throttle.wait(len(keys))
+
+    def sweep_task_results(self, cutoff: datetime) -> tuple[int, int]:
+        """Rows of the Celery result backend, when it is a database"""
+        # Imported here: importing the tasks package imports the sweep task, which imports this module
+        from app.internal.tasks.celery import celery_app
+
+        backend = celery_app.backend
+        if not isinstance(backend, DatabaseBackend):
+            return 0, 0
+        task_cls = backend.task_cls
+        deleted = 0
+        session = backend.ResultSession()
+        with session_cleanup(session):
+            while True:
+                expired = session.query(task_cls.id).filter(task_cls.date_done < cutoff).limit(self.batch_size)
+                ids = [row.id for row in expired]
+                if not ids:
+                    return deleted, 0
+                session.query(task_cls).filter(task_cls.id.in_(ids)).delete(synchronize_session=False)
+                session.commit()
+                deleted += len(ids)
+                self.throttle.wait(len(ids))
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import threading
+import time
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger
+from app.internal.metrics import S3_REQUEST_DURATION
+
+logger = get_logger()
+
+_clients: dict[tuple, object] = {}
+_lock = threading.Lock()
+
+
+def _client_key(settings: Settings) -> tuple:
+    secret_digest = hashlib.sha256(settings.AWS_SECRET_ACCESS_KEY.encode()).hexdigest()
+    return (
+        settings.S3_ENDPOINT_URL,
+        settings.S3_REGION,
+        settings.AWS_ACCESS_KEY_ID,
+        secret_digest,
+        settings.S3_MAX_POOL_CONNECTIONS,
+        settings.S3_CONNECT_TIMEOUT,
+        settings.S3_READ_TIMEOUT,
+        settings.S3_RETRY_MODE,
+        settings.S3_MAX_ATTEMPTS,
+    )
+
+
+def _start_timer(context, model, **kwargs) -> None:
+    context["request_timer"] = (model.name, time.perf_counter())
+
+
+def _observe_latency(context, **kwargs) -> None:
+    timer = context.pop("request_timer", None)
+    if timer is not None:
+        operation, start = timer
+        S3_REQUEST_DURATION.labels(operation=operation).observe(time.perf_counter() - start)
+
+
+def _create_client(settings: Settings):
+    # boto3 takes longer to import than the rest of the API; processes on other backends never load it
+    import boto3
+    from botocore.config import Config
+
+    config = Config(
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.S3_CONNECT_TIMEOUT,
+        read_timeout=settings.S3_READ_TIMEOUT,
+        retries={"mode": settings.S3_RETRY_MODE, "total_max_attempts": settings.S3_MAX_ATTEMPTS},
+        tcp_keepalive=True,
+    )
+    # boto3's default session is not thread-safe, so each client gets its own
+    session = boto3.session.Session()
+    client = session.client(
+        "s3",
+        endpoint_url=settings.S3_ENDPOINT_URL or None,
+        region_name=settings.S3_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+        config=config,
+    )
+    # Time every API call, retries included, from request to parsed response
+    client.meta.events.register("before-call.s3", _start_timer)
+    client.meta.events.register("after-call.s3", _observe_latency)
+    client.meta.events.register("after-call-error.s3", _observe_latency)
+    return client
+
+
+def get_s3_client(settings: Settings):
+    """
+    Get a process-wide S3 client for the given settings.
+
+    Clients are thread-safe and keep their HTTP connection pool alive, so one
+    client is shared by every request and task using the same endpoint, region,
+    credentials and connection settings.
+    """
+    key = _client_key(settings)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(settings)
+            _clients[key] = client
+            logger.info(
+                "S3 client created",
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                region=settings.S3_REGION,
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            )
+    return client
+
+
+def _reset_after_fork() -> None:
+    # Connection pools must not be shared with prefork worker children
+    global _lock
+    _clients.clear()
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,286 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import get_logger
+from app.internal.metrics import SOURCE_CACHE_REQUESTS
+from app.internal.services.image import RenderedImage, Rendition
+from app.internal.services.storage import StorageService
+
+logger = get_logger()
+
+# ETags become part of file names; objects with any other ETag are not cached
+ETAG_PATTERN = re.compile(r'"?([A-Za-z0-9_-]+)"?')
+# Job ids become part of file names too
+JOB_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+_cache: Optional["SourceCache"] = None
+_cache_lock = threading.Lock()
+
+
+class SourceCache:
+    """
+    Source objects recently fetched by a worker, on local disk.
+
+    Entries are named by storage key and ETag. A cached copy is used when a
+    conditional GET confirms the object is unchanged, which transfers nothing,
+    or without asking storage at all when the caller already knows the ETag,
+    as a retry does. The least recently used entries are evicted beyond
+    ``max_bytes``. Prefork children share the directory; each keeps its own
+    estimate of its size and rescans it before evicting.
+
+    Entries are trusted as they are read, so the directory must be private:
+    it is created with mode 0700, and the cache stays off when it belongs to
+    another user or others can write to it.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+        self._lock = threading.Lock()
+        self._private: bool | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self._private_root()
+
+    def usable(self, storage_service: StorageService) -> bool:
+        return self.enabled and storage_service.has_etags
+
+    @contextmanager
+    def open(
+        self, storage_service: StorageService, key: str, etag: str | None = None
+    ) -> Iterator[tuple[BinaryIO, str | None]]:
+        """Open a source object as a seekable file; yields it with the object's ETag"""
+        if not self.usable(storage_service):
+            with storage_service.open(key) as source:
+                yield source, None
+            return
+        cached, data, etag = self._get(storage_service, key, etag)
+        if cached is None:
+            yield io.BytesIO(data), etag
+            return
+        with cached:
+            if os.fstat(cached.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                yield io.BytesIO(), etag
+                return
+            with mmap.mmap(cached.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped, etag
+
+    def load(self, storage_service: StorageService, key: str, etag: str | None = None) -> tuple[bytes, str | None]:
+        """Read a whole source object; returns it with the object's ETag"""
+        if not self.usable(storage_service):
+            return storage_service.load(key), None
+        cached, data, etag = self._get(storage_service, key, etag)
+        if cached is not None:
+            with cached:
+                data = cached.read()
+        return data, etag
+
+    def put_rendered(self, job_id: str, rendered: list[RenderedImage]) -> None:
+        """
+        Keep a job's rendered thumbnails so a retry after a failed upload can skip rendering.
+
+        Each encoding is stored as a file of its own, described by a JSON
+        sidecar written last, so a sidecar is only found once they all are.
+        """
+        if not self.enabled or not JOB_ID_PATTERN.fullmatch(job_id):
+            return
+        outputs = []
+        for i, output in enumerate(rendered):
+            encodings = [(output.format, output.data), *output.variants.items()]
+            for img_format, data in encodings:
+                if not self._store(f"rendered-{job_id}.{i}.{img_format.lower()}", data):
+                    return
+            outputs.append(
+                {
+                    "rendition": output.rendition.model_dump(),
+                    "format": output.format,
+                    "width": output.width,
+                    "height": output.height,
+                    "size": len(output.data),
+                    "sha256": hashlib.sha256(output.data).hexdigest(),
+                    "variants": [
+                        {"format": img_format, "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+                        for img_format, data in output.variants.items()
+                    ],
+                }
+            )
+        self._store(f"rendered-{job_id}.json", json.dumps(outputs).encode())
+
+    def take_rendered(self, job_id: str) -> list[RenderedImage] | None:
+        """Rendered thumbnails kept by put_rendered on this worker, if any"""
+        if not self.enabled or not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        sidecar = self.root / f"rendered-{job_id}.json"
+        try:
+            outputs = json.loads(sidecar.read_bytes())
+            return [
+                RenderedImage(
+                    Rendition.model_validate(output["rendition"]),
+                    self._read_rendered(job_id, i, output),
+                    output["format"],
+                    output["width"],
+                    output["height"],
+                    {
+                        variant["format"]: self._read_rendered(job_id, i, variant)
+                        for variant in output["variants"]
+                    },
+                )
+                for i, output in enumerate(outputs)
+            ]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Failed to read rendered thumbnails", job_id=job_id, error=str(e))
+            return None
+        finally:
+            for path in self.root.glob(f"rendered-{job_id}.*"):
+                path.unlink(missing_ok=True)
+
+    def _read_rendered(self, job_id: str, index: int, encoding: dict) -> bytes:
+        """An encoding stored by put_rendered, checked against its sidecar entry"""
+        data = (self.root / f"rendered-{job_id}.{index}.{encoding['format'].lower()}").read_bytes()
+        if len(data) != encoding["size"] or hashlib.sha256(data).hexdigest() != encoding["sha256"]:
+            raise ValueError(f"Rendered {encoding['format']} output {index} does not match its sidecar")
+        return data
+
+    def _get(
+        self, storage_service: StorageService, key: str, etag: str | None
+    ) -> tuple[BinaryIO | None, bytes | None, str | None]:
+        """An open cached copy, or the downloaded data; with the object's ETag"""
+        prefix = hashlib.sha256(f"{storage_service.bucket_name}/{key}".encode()).hexdigest()
+        cached = self._find(prefix, etag)
+        data = None
+        if cached is not None:
+            path, cached_etag = cached
+            if etag is None:
+                data, etag = storage_service.load_versioned(key, cached_etag)
+            if data is None:
+                f = self._open_cached(path)
+                if f is not None:
+                    SOURCE_CACHE_REQUESTS.labels(result="hit").inc()
+                    return f, None, cached_etag
+        if data is None:
+            data, etag = storage_service.load_versioned(key)
+        SOURCE_CACHE_REQUESTS.labels(result="miss").inc()
+        match = ETAG_PATTERN.fullmatch(etag or "")
+        if match is not None:
+            name = f"{prefix}.{match.group(1)}"
+            if self._store(name, data):
+                # Earlier versions of the object are of no further use
+                for stale in self.root.glob(f"{prefix}.*"):
+                    if stale.name != name:
+                        stale.unlink(missing_ok=True)
+        return None, data, etag
+
+    def _private_root(self) -> bool:
+        """Create the directory if needed; whether only this user can write to it"""
+        if self._private is None:
+            try:
+                self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+                info = os.lstat(self.root)
+            except OSError as e:
+                logger.warning("Source cache disabled", root=str(self.root), error=str(e))
+                return False
+            self._private = (
+                stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o022
+            )
+            if not self._private:
+                logger.warning(
+                    "Source cache disabled, its directory is not private to this user", root=str(self.root)
+                )
+        return self._private
+
+    def _find(self, prefix: str, etag: str | None) -> tuple[Path, str] | None:
+        if etag is not None:
+            match = ETAG_PATTERN.fullmatch(etag)
+            path = self.root / f"{prefix}.{match.group(1)}" if match is not None else None
+            return (path, etag) if path is not None and path.is_file() else None
+        path = next(self.root.glob(f"{prefix}.*"), None)
+        return (path, f'"{path.suffix[1:]}"') if path is not None else None
+
+    @staticmethod
+    def _open_cached(path: Path) -> BinaryIO | None:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            # Evicted by another process since it was found
+            return None
+        try:
+            os.utime(f.fileno())
+        except OSError:
+            pass
+        return f
+
+    def _store(self, name: str, data: bytes) -> bool:
+        """Write an entry atomically; failures are logged, as the cache is only an optimization"""
+        if len(data) > self.max_bytes:
+            return False
+        try:
+            self._reserve(len(data))
+            with tempfile.NamedTemporaryFile(dir=self.root, prefix=".", suffix=".tmp", delete=False) as f:
+                f.write(data)
+            os.replace(f.name, self.root / name)
+            return True
+        except OSError as e:
+            logger.warning("Failed to write source cache entry", name=name, error=str(e))
+            return False
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                # Hidden files are writes in progress
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _reserve(self, size: int) -> None:
+        """Evict the least recently used entries until ``size`` more bytes fit"""
+        with self._lock:
+            if self._size is not None and self._size + size <= self.max_bytes:
+                self._size += size
+                return
+            entries = sorted(self._entries())
+            total = sum(entry[1] for entry in entries)
+            for _, entry_size, path in entries:
+                if total + size <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= entry_size
+            self._size = total + size
+
+
+def get_source_cache(settings: Settings) -> SourceCache:
+    """Get the source cache of the running worker"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                # Named per user, as another user may have created the shared one
+                root = settings.SOURCE_CACHE_DIR or os.path.join(
+                    tempfile.gettempdir(), f"thumbnail-source-cache-{os.getuid()}"
+                )
+                _cache = SourceCache(Path(root), settings.SOURCE_CACHE_MAX_BYTES)
+    return _cache
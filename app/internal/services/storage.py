@@ -1,46 +1,336 @@
-import boto3
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional, TypeVar
+
 from botocore.exceptions import ClientError
-from app.internal.log.logger import get_logger
+from starlette.concurrency import run_in_threadpool
+
+from app.internal.log.logger import get_logger, get_sampled_logger
 from app.internal.configuration.settings import Settings
+from app.internal.services.s3 import get_s3_client
+
+T = TypeVar("T")
 
 logger = get_logger()
+sampled_logger = get_sampled_logger()
+
+# Objects of the memory backend, shared by every MemoryStorageService in the process
+_memory_objects: dict[tuple[str, str], bytes] = {}
+_memory_modified: dict[tuple[str, str], datetime] = {}
+_memory_lock = threading.Lock()
+
+_presigned_urls: Optional["PresignedUrlCache"] = None
+_presigned_urls_lock = threading.Lock()
+
+
+# Keys per S3 DeleteObjects request, the most it accepts
+DELETE_BATCH_SIZE = 1000
+# Object probed by warm-up; it does not need to exist
+WARM_UP_KEY = ".warm-up"
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    modified: datetime
+
+
+class Upload(ABC):
+    """A streaming write of one object; call complete() or abort() when done"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.size = 0
+        self._hasher = hashlib.sha256()
+
+    @property
+    def content_hash(self) -> str:
+        """Hex SHA-256 of everything written so far"""
+        return self._hasher.hexdigest()
+
+    def write(self, data: bytes) -> None:
+        self._hasher.update(data)
+        self.size += len(data)
+        self._write(data)
+
+    @abstractmethod
+    def _write(self, data: bytes) -> None: ...
+
+    @abstractmethod
+    def complete(self) -> None: ...
+
+    @abstractmethod
+    def abort(self) -> None: ...
+
+
+class StorageService(ABC):
+    """Object storage used for originals and thumbnails"""
+
+    endpoint_url: str
+    bucket_name: str
+    # Whether load_versioned returns ETags, so objects can be cached by version
+    has_etags = False
+
+    @abstractmethod
+    def save(self, key: str, data: bytes, content_type: str = "") -> None:
+        """Store an object, replacing any existing one"""
+
+    @abstractmethod
+    def open_upload(self, key: str, content_type: str = "") -> Upload:
+        """Start a streaming upload; call complete() or abort() on the result"""
+
+    @abstractmethod
+    def load(self, key: str) -> bytes:
+        """Read a whole object"""
+
+    def load_versioned(self, key: str, etag: str | None = None) -> tuple[bytes | None, str | None]:
+        """
+        Read an object and its ETag, or (None, etag) if the object still has ``etag``.
+
+        Backends without ETags always return the data and None.
+        """
+        return self.load(key), None
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[BinaryIO]:
+        """Open an object as a seekable binary file"""
+        yield io.BytesIO(self.load(key))
+
+    def iter_bytes(
+        self, key: str, start: int = 0, length: int | None = None, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """
+        Read ``length`` bytes of an object from ``start`` (to the end if None) in chunks.
+
+        The object is opened before returning, so a missing object raises here
+        rather than once iteration has started.
+        """
+        data = memoryview(self.load(key))
+        end = len(data) if length is None else min(start + length, len(data))
+        return (bytes(data[offset:min(offset + chunk_size, end)]) for offset in range(start, end, chunk_size))
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete an object; False on failure"""
+
+    def delete_many(self, keys: list[str]) -> list[str]:
+        """Delete objects; returns the keys that were deleted"""
+        return [key for key in keys if self.delete(key)]
+
+    @abstractmethod
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        """Objects whose key starts with ``prefix``"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Check if an object exists"""
+
+    @abstractmethod
+    def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        """URL clients can download the object from"""
+
+    def warm_up(self) -> None:
+        """Open a connection to the backend ahead of the first request; raises if it is unreachable"""
+
+
+def _iter_and_close(stream, chunks) -> Iterator[bytes]:
+    """Iterate ``chunks(stream)``, closing the stream when done or abandoned"""
+    try:
+        yield from chunks(stream)
+    finally:
+        stream.close()
+
+
+def create_storage_service(settings: Settings) -> StorageService:
+    """Storage service of the backend selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageService(settings)
+    if settings.STORAGE_BACKEND == "memory":
+        return MemoryStorageService(settings)
+    return S3StorageService(settings)
+
 
+class MultipartUpload(Upload):
+    """Incrementally upload an object to S3 in fixed-size parts.
+
+    Data is buffered until a full part is available, so memory stays bounded by
+    ``part_size`` regardless of the object size. Objects smaller than a single
+    part never start a multipart upload and are sent with one ``put_object``.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, key: str, content_type: str, part_size: int):
+        super().__init__(key)
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.content_type = content_type
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._parts: list[dict] = []
+        self._upload_id: str | None = None
+
+    def _write(self, data: bytes) -> None:
+        """Buffer data and upload every complete part"""
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self._upload_part(part)
+
+    def complete(self) -> None:
+        """Upload the remaining data and finalize the object"""
+        try:
+            if self._upload_id is None:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=self.key,
+                    Body=bytes(self._buffer),
+                    ContentType=self.content_type,
+                )
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
+            self._buffer.clear()
+            sampled_logger.info(
+                "File saved to S3",
+                bucket=self.bucket_name,
+                key=self.key,
+                size=self.size,
+                parts=len(self._parts),
+            )
+        except ClientError as e:
+            logger.error("Failed to save to S3", bucket=self.bucket_name, key=self.key, error=str(e))
+            raise
+
+    def abort(self) -> None:
+        """Discard buffered data and any parts already uploaded"""
+        self._buffer.clear()
+        if self._upload_id is None:
+            return
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.key, UploadId=self._upload_id
+            )
+            logger.info("Multipart upload aborted", bucket=self.bucket_name, key=self.key)
+        except ClientError as e:
+            logger.error(
+                "Failed to abort multipart upload",
+                bucket=self.bucket_name,
+                key=self.key,
+                error=str(e),
+            )
+        finally:
+            self._upload_id = None
+
+    def _upload_part(self, data: bytes) -> None:
+        try:
+            if self._upload_id is None:
+                response = self.s3_client.create_multipart_upload(
+                    Bucket=self.bucket_name, Key=self.key, ContentType=self.content_type
+                )
+                self._upload_id = response["UploadId"]
+            part_number = len(self._parts) + 1
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=self.key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=data,
+            )
+            self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        except ClientError as e:
+            logger.error(
+                "Failed to upload part to S3",
+                bucket=self.bucket_name,
+                key=self.key,
+                part_number=len(self._parts) + 1,
+                error=str(e),
+            )
+            raise
+
+
+class S3StorageService(StorageService):
+    has_etags = True
 
-class StorageService:
     def __init__(self, settings: Settings):
         """Initialize storage service"""
-        self.s3_client = boto3.client(
-            "s3",
-            endpoint_url=settings.S3_ENDPOINT_URL,
-            region_name=settings.S3_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        self.s3_client = get_s3_client(settings)
         self.endpoint_url = settings.S3_ENDPOINT_URL
         self.bucket_name = settings.S3_BUCKET_NAME
         self.prefix = settings.S3_KEY_PREFIX.rstrip("/") if settings.S3_KEY_PREFIX else ""
+        self.part_size = settings.S3_MULTIPART_PART_SIZE
 
 
     def save(self, key: str, data: bytes, content_type: str = "") -> None:
         """Save file to S3"""
         try:
             self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=data, ContentType=content_type)
-            logger.info("File saved to S3", bucket=self.bucket_name, key=key, size=len(data))
+            sampled_logger.info("File saved to S3", bucket=self.bucket_name, key=key, size=len(data))
         except ClientError as e:
             logger.error("Failed to save to S3", bucket=self.bucket_name, key=key, error=str(e))
             raise
 
+    def open_upload(self, key: str, content_type: str = "") -> MultipartUpload:
+        return MultipartUpload(self.s3_client, self.bucket_name, key, content_type, self.part_size)
+
     def load(self, key: str) -> bytes:
         """Load file from S3"""
         try:
             response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
             data = response["Body"].read()
-            logger.info("File loaded from S3", bucket=self.bucket_name, key=key, size=len(data))
+            sampled_logger.info("File loaded from S3", bucket=self.bucket_name, key=key, size=len(data))
             return data
         except ClientError as e:
             logger.error("Failed to load from S3", bucket=self.bucket_name, key=key, error=str(e))
             raise
 
+    def load_versioned(self, key: str, etag: str | None = None) -> tuple[bytes | None, str | None]:
+        """Conditional GET: the object is only transferred if its ETag is no longer ``etag``"""
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if etag:
+            params["IfNoneMatch"] = etag
+        try:
+            response = self.s3_client.get_object(**params)
+        except ClientError as e:
+            if e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 304:
+                return None, etag
+            logger.error("Failed to load from S3", bucket=self.bucket_name, key=key, error=str(e))
+            raise
+        data = response["Body"].read()
+        sampled_logger.info("File loaded from S3", bucket=self.bucket_name, key=key, size=len(data))
+        return data, response.get("ETag")
+
+    def iter_bytes(
+        self, key: str, start: int = 0, length: int | None = None, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """Stream an object, or a byte range of it, without holding it in memory"""
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if start or length is not None:
+            params["Range"] = f"bytes={start}-{'' if length is None else start + length - 1}"
+        try:
+            response = self.s3_client.get_object(**params)
+        except ClientError as e:
+            logger.error("Failed to load from S3", bucket=self.bucket_name, key=key, error=str(e))
+            raise
+        return _iter_and_close(response["Body"], lambda body: body.iter_chunks(chunk_size))
+
     def delete(self, key: str) -> bool:
         """Delete file from S3"""
         try:
@@ -56,6 +346,43 @@ class StorageService:
             )
             return False
 
+    def delete_many(self, keys: list[str]) -> list[str]:
+        """Delete objects with one DeleteObjects request per 1000 keys"""
+        deleted = []
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+            except ClientError as e:
+                logger.error("Failed to delete from S3", bucket=self.bucket_name, keys=len(batch), error=str(e))
+                continue
+            # Quiet mode only reports failures
+            errors = response.get("Errors", [])
+            if errors:
+                logger.error(
+                    "Failed to delete from S3",
+                    bucket=self.bucket_name,
+                    keys=len(errors),
+                    error=errors[0].get("Message"),
+                )
+            failed = {error["Key"] for error in errors}
+            deleted.extend(key for key in batch if key not in failed)
+        return deleted
+
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield StoredObject(item["Key"], item["Size"], item["LastModified"])
+
+    def warm_up(self) -> None:
+        # Any response, including 403 and 404, leaves a connection in the client's pool;
+        # connection errors are not ClientErrors and propagate
+        self.exists(WARM_UP_KEY)
+
     def exists(self, key: str) -> bool:
         """Check if file exists in S3"""
         try:
@@ -72,8 +399,311 @@ class StorageService:
                 Params={"Bucket": self.bucket_name, "Key": key},
                 ExpiresIn=expires_in
             )
-            logger.info("Generated presigned URL", bucket=self.bucket_name, key=key)
+            sampled_logger.debug("Generated presigned URL", bucket=self.bucket_name, key=key)
             return url
         except ClientError as e:
             logger.error("Failed to generate presigned URL", bucket=self.bucket_name, key=key, error=str(e))
             raise
+
+
+class LocalUpload(Upload):
+    """Stream an object into a temporary file that replaces the target on complete()"""
+
+    def __init__(self, path: Path, key: str):
+        super().__init__(key)
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False)
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def complete(self) -> None:
+        self._file.close()
+        # Readers see either the old object or the whole new one, never a partial file
+        os.replace(self._file.name, self.path)
+        sampled_logger.info("File saved to disk", path=str(self.path), size=self.size)
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self._file.name)
+        except FileNotFoundError:
+            pass
+
+
+class LocalStorageService(StorageService):
+    """
+    Objects stored as files under STORAGE_LOCAL_ROOT.
+
+    Meant for single-node deployments where the API server and workers share a
+    volume. Writes are atomic and reads are memory-mapped, so decoding reads
+    straight from the page cache without copying the file into the heap.
+    """
+
+    def __init__(self, settings: Settings):
+        self.root = Path(settings.STORAGE_LOCAL_ROOT).resolve()
+        self.endpoint_url = self.root.as_uri()
+        self.bucket_name = ""
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Invalid key: {key}")
+        return path
+
+    def save(self, key: str, data: bytes, content_type: str = "") -> None:
+        upload = self.open_upload(key, content_type)
+        try:
+            upload.write(data)
+            upload.complete()
+        except BaseException:
+            upload.abort()
+            raise
+
+    def open_upload(self, key: str, content_type: str = "") -> LocalUpload:
+        return LocalUpload(self._path(key), key)
+
+    def load(self, key: str) -> bytes:
+        data = self._path(key).read_bytes()
+        sampled_logger.info("File loaded from disk", key=key, size=len(data))
+        return data
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[BinaryIO]:
+        with open(self._path(key), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                yield io.BytesIO()
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def iter_bytes(
+        self, key: str, start: int = 0, length: int | None = None, chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        f = open(self._path(key), "rb")
+        f.seek(start)
+
+        def read(f: BinaryIO) -> Iterator[bytes]:
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+        return _iter_and_close(f, read)
+
+    def delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink(missing_ok=True)
+            logger.info("File deleted from disk", key=key)
+            return True
+        except OSError as e:
+            logger.error("Failed to delete from disk", key=key, error=str(e))
+            return False
+
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        # Only walk the directory the prefix is in
+        for path in self._path(prefix.rpartition("/")[0]).rglob("*"):
+            key = path.relative_to(self.root).as_posix()
+            if not key.startswith(prefix) or path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                yield StoredObject(key, stat.st_size, datetime.fromtimestamp(stat.st_mtime, timezone.utc))
+
+    def exists(self, key: str) -> bool:
+        try:
+            return self._path(key).is_file()
+        except ValueError:
+            return False
+
+    def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        return self._path(key).as_uri()
+
+
+class MemoryUpload(Upload):
+    def __init__(self, bucket_name: str, key: str):
+        super().__init__(key)
+        self.bucket_name = bucket_name
+        self._buffer = bytearray()
+
+    def _write(self, data: bytes) -> None:
+        self._buffer += data
+
+    def complete(self) -> None:
+        with _memory_lock:
+            _memory_objects[(self.bucket_name, self.key)] = bytes(self._buffer)
+            _memory_modified[(self.bucket_name, self.key)] = datetime.now(timezone.utc)
+        self._buffer.clear()
+
+    def abort(self) -> None:
+        self._buffer.clear()
+
+
+class MemoryStorageService(StorageService):
+    """
+    Objects kept in a process-wide dict.
+
+    Only visible within one process, so it suits tests, benchmarks and running
+    Celery eagerly; a separate worker process would not see the API's uploads.
+    """
+
+    def __init__(self, settings: Settings):
+        self.endpoint_url = "memory://"
+        self.bucket_name = settings.S3_BUCKET_NAME
+
+    def save(self, key: str, data: bytes, content_type: str = "") -> None:
+        with _memory_lock:
+            _memory_objects[(self.bucket_name, key)] = bytes(data)
+            _memory_modified[(self.bucket_name, key)] = datetime.now(timezone.utc)
+
+    def open_upload(self, key: str, content_type: str = "") -> MemoryUpload:
+        return MemoryUpload(self.bucket_name, key)
+
+    def load(self, key: str) -> bytes:
+        try:
+            return _memory_objects[(self.bucket_name, key)]
+        except KeyError:
+            raise FileNotFoundError(key) from None
+
+    def delete(self, key: str) -> bool:
+        with _memory_lock:
+            _memory_objects.pop((self.bucket_name, key), None)
+            _memory_modified.pop((self.bucket_name, key), None)
+        return True
+
+    def list_objects(self, prefix: str) -> Iterator[StoredObject]:
+        with _memory_lock:
+            objects = [
+                StoredObject(key, len(data), _memory_modified[(bucket_name, key)])
+                for (bucket_name, key), data in _memory_objects.items()
+                if bucket_name == self.bucket_name and key.startswith(prefix)
+            ]
+        yield from sorted(objects, key=lambda stored: stored.key)
+
+    def exists(self, key: str) -> bool:
+        return (self.bucket_name, key) in _memory_objects
+
+    def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        return f"memory://{self.bucket_name}/{key}"
+
+
+class AsyncMultipartUpload:
+    """Non-blocking wrapper around MultipartUpload"""
+
+    def __init__(self, upload: Upload):
+        self.upload = upload
+
+    @property
+    def key(self) -> str:
+        return self.upload.key
+
+    @property
+    def size(self) -> int:
+        return self.upload.size
+
+    @property
+    def content_hash(self) -> str:
+        return self.upload.content_hash
+
+    async def write(self, data: bytes) -> None:
+        await run_in_threadpool(self.upload.write, data)
+
+    async def complete(self) -> None:
+        await run_in_threadpool(self.upload.complete)
+
+    async def abort(self) -> None:
+        await run_in_threadpool(self.upload.abort)
+
+
+class AsyncStorageService:
+    """Non-blocking facade over StorageService for async endpoints.
+
+    Every backend is synchronous (boto3, file I/O), so every call is dispatched
+    to the threadpool instead of running on the event loop.
+    """
+
+    def __init__(self, storage_service: StorageService):
+        self.storage_service = storage_service
+
+    @property
+    def endpoint_url(self) -> str:
+        return self.storage_service.endpoint_url
+
+    @property
+    def bucket_name(self) -> str:
+        return self.storage_service.bucket_name
+
+    async def save(self, key: str, data: bytes, content_type: str = "") -> None:
+        await run_in_threadpool(self.storage_service.save, key, data, content_type)
+
+    def open_upload(self, key: str, content_type: str = "") -> AsyncMultipartUpload:
+        return AsyncMultipartUpload(self.storage_service.open_upload(key, content_type))
+
+    async def load(self, key: str) -> bytes:
+        return await run_in_threadpool(self.storage_service.load, key)
+
+    async def delete(self, key: str) -> bool:
+        return await run_in_threadpool(self.storage_service.delete, key)
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self.storage_service.exists, key)
+
+    async def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        return await run_in_threadpool(self.storage_service.generate_presigned_url, key, expires_in)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Call ``func(storage_service, *args)`` in the threadpool, for work spanning several calls"""
+        return await run_in_threadpool(func, self.storage_service, *args)
+
+
+class PresignedUrlCache:
+    """
+    Reuses presigned URLs until half their lifetime has passed.
+
+    Signing is cheap, but every new signature is a new URL; handing out the
+    same URL for a while lets browsers and CDNs cache the object behind it.
+    """
+
+    def __init__(self, max_size: int, expires_in: int):
+        self.max_size = max_size
+        self.expires_in = expires_in
+        self._entries: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, storage_service: StorageService, key: str) -> tuple[str, float]:
+        """A presigned URL of the object and the seconds it stays valid"""
+        cache_key = (storage_service.bucket_name, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[1] - now > self.expires_in / 2:
+                self._entries.move_to_end(cache_key)
+                return entry[0], entry[1] - now
+        url = storage_service.generate_presigned_url(key, self.expires_in)
+        expires_at = now + self.expires_in
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[cache_key] = (url, expires_at)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return url, float(self.expires_in)
+
+
+def get_presigned_url_cache(settings: Settings) -> PresignedUrlCache:
+    """Get the process-wide presigned URL cache"""
+    global _presigned_urls
+    if _presigned_urls is None:
+        with _presigned_urls_lock:
+            if _presigned_urls is None:
+                _presigned_urls = PresignedUrlCache(settings.PRESIGNED_URL_CACHE_SIZE, settings.PRESIGNED_URL_EXPIRES)
+    return _presigned_urls
@@ -0,0 +1,119 @@
+import asyncio
+import io
+import time
+from contextlib import AsyncExitStack, ExitStack
+
+from PIL import Image
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app.internal.configuration.settings import Settings
+from app.internal.database import get_async_engine, get_engine
+from app.internal.log.logger import get_logger
+from app.internal.services.events import get_job_event_hub
+from app.internal.services.storage import create_storage_service
+from app.internal.tasks.celery import celery_app
+
+logger = get_logger()
+
+# Formats round-tripped by preload_codecs, where Pillow supports them
+CODEC_FORMATS = ["JPEG", "PNG", "WEBP", "AVIF", "GIF"]
+
+
+class Readiness:
+    """Warm-up state of an API process, reported by /ready"""
+
+    def __init__(self):
+        self.ready = False
+        # Why the last warm-up attempt failed
+        self.error: str | None = None
+
+
+def preload_codecs() -> None:
+    """Load Pillow's format plugins and codec libraries, which it otherwise does on the first image"""
+    Image.init()
+    image = Image.new("RGB", (8, 8))
+    for img_format in CODEC_FORMATS:
+        if img_format not in Image.SAVE:
+            continue
+        buffer = io.BytesIO()
+        image.save(buffer, img_format)
+        buffer.seek(0)
+        with Image.open(buffer) as decoded:
+            decoded.load()
+
+
+def pool_size(engine: Engine) -> int:
+    """Connections the engine's pool keeps open"""
+    return engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+
+
+def warm_up_database(engine: Engine) -> None:
+    """Fill the engine's pool, so the first requests do not wait on connecting"""
+    with ExitStack() as stack:
+        for _ in range(pool_size(engine)):
+            stack.enter_context(engine.connect()).exec_driver_sql("SELECT 1")
+
+
+async def warm_up_async_database(engine: AsyncEngine) -> None:
+    """Fill the async engine's pool"""
+    async with AsyncExitStack() as stack:
+        for _ in range(pool_size(engine.sync_engine)):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.exec_driver_sql("SELECT 1")
+
+
+def warm_up_celery() -> None:
+    """Connect a producer of the pool Celery publishes tasks with, and load the result backend"""
+    with celery_app.producer_or_acquire() as producer:
+        producer.connection.ensure_connection(max_retries=1)
+    # Publishing builds the backend for the task's AsyncResult even when results are ignored
+    celery_app.backend
+
+
+def warm_up_process(settings: Settings) -> None:
+    """
+    Preload codecs and open the database, storage and broker connections.
+
+    Shared by API and worker processes; raises on the first dependency that is
+    unreachable.
+    """
+    preload_codecs()
+    warm_up_database(get_engine(settings))
+    create_storage_service(settings).warm_up()
+    warm_up_celery()
+
+
+def warm_up_worker(settings: Settings) -> None:
+    """Warm up a worker pool process; failures are logged, as tasks connect on their own"""
+    started = time.perf_counter()
+    try:
+        warm_up_process(settings)
+    except Exception as e:
+        logger.warning("Worker warm-up failed", error=str(e))
+        return
+    logger.info("Worker warmed up", seconds=round(time.perf_counter() - started, 3))
+
+
+async def warm_up_api(settings: Settings, readiness: Readiness) -> None:
+    """Warm up an API process, retrying until every dependency is reachable, then mark it ready"""
+    if not settings.WARM_UP:
+        readiness.ready = True
+        return
+    started = time.perf_counter()
+    while True:
+        try:
+            await run_in_threadpool(warm_up_process, settings)
+            await warm_up_async_database(get_async_engine(settings))
+            break
+        except Exception as e:
+            readiness.error = str(e)
+            logger.warning("Warm-up failed", error=str(e), retry_in=settings.WARM_UP_RETRY_INTERVAL)
+            await asyncio.sleep(settings.WARM_UP_RETRY_INTERVAL)
+    # Subscribe to job events now rather than on the first wait; the hub reconnects on its own
+    get_job_event_hub(settings).start()
+    readiness.ready = True
+    readiness.error = None
+    logger.info("Warmed up", seconds=round(time.perf_counter() - started, 3))
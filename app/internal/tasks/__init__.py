@@ -1,2 +1,2 @@
 """Tasks package for Celery workers."""
-from . import thumbnail
+from . import retention, signals, thumbnail
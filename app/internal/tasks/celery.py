@@ -1,20 +1,45 @@
 from celery import Celery
+from kombu import Queue
 from app.internal.configuration.settings import get_settings
+from app.internal.tasks.serialization import MSGPACK_ZLIB, register_msgpack_zlib
 
 
-settings = get_settings()
+def celery_config() -> dict:
+    """Celery configuration from the settings; loaded when the app is first used rather than on import"""
+    settings = get_settings()
+    register_msgpack_zlib(settings.CELERY_COMPRESSION_THRESHOLD)
+    config = dict(
+        broker_url=settings.CELERY_BROKER_URL,
+        result_backend=settings.CELERY_BACKEND_URL,
+        task_serializer=settings.CELERY_SERIALIZER,
+        result_serializer=settings.CELERY_SERIALIZER,
+        # Accept every supported format, so processes can switch CELERY_SERIALIZER one at a time
+        accept_content=["json", "msgpack", MSGPACK_ZLIB],
+        result_accept_content=["json", "msgpack", MSGPACK_ZLIB],
+        result_expires=settings.CELERY_RESULT_EXPIRES or None,
+        enable_utc=False,
+        task_track_started=True,
+        # Workers started without -Q consume every queue, so a single worker pool
+        # keeps working when jobs are routed by size class
+        task_queues=[
+            Queue("celery"),
+            Queue(settings.QUEUE_SMALL),
+            Queue(settings.QUEUE_MEDIUM),
+            Queue(settings.QUEUE_HUGE),
+        ],
+    )
+    if settings.SWEEP_INTERVAL > 0:
+        # Run by `celery beat`; a sweep still queued when the next one is due is dropped
+        config["beat_schedule"] = {
+            "retention-sweep": {
+                "task": "thumbnail.sweep",
+                "schedule": settings.SWEEP_INTERVAL,
+                "options": {"expires": settings.SWEEP_INTERVAL},
+            },
+        }
+    return config
 
-# Instantiate global app
-celery_app = Celery(
-    __name__,
-    broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_BACKEND_URL,
-)
 
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    enable_utc=False,
-    task_track_started=True,
-)
+# Instantiate global app
+celery_app = Celery(__name__)
+celery_app.add_defaults(celery_config)
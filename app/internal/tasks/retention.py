@@ -0,0 +1,17 @@
+"""Celery tasks for deleting expired artifacts"""
+from sqlmodel import Session
+
+from app.internal.configuration.settings import get_settings
+from app.internal.database import get_engine
+from app.internal.services.retention import RetentionSweeper
+from app.internal.services.storage import create_storage_service
+from app.internal.tasks.celery import celery_app
+
+settings = get_settings()
+
+
+@celery_app.task(name="thumbnail.sweep", ignore_result=True)
+def sweep_expired() -> dict:
+    """Delete originals, thumbnails and records past their retention; scheduled every SWEEP_INTERVAL"""
+    with Session(get_engine(settings)) as session:
+        return RetentionSweeper(settings, create_storage_service(settings), session).sweep()
@@ -0,0 +1,40 @@
+"""Compact Celery serializers for task messages and results"""
+import zlib
+
+import msgpack
+from kombu.serialization import register
+
+# Every payload starts with one of these, so small payloads skip compression
+RAW = b"\x00"
+ZLIB = b"\x01"
+
+MSGPACK_ZLIB = "msgpack-zlib"
+
+
+def register_msgpack_zlib(threshold: int) -> None:
+    """
+    Register msgpack with zlib compression of payloads of ``threshold`` bytes or more.
+
+    Batch tasks and multi-rendition results compress well, since their keys
+    repeat; a single job's message is smaller than the zlib overhead.
+    """
+
+    def dumps(obj) -> bytes:
+        data = msgpack.packb(obj, use_bin_type=True)
+        if threshold > 0 and len(data) >= threshold:
+            return ZLIB + zlib.compress(data)
+        return RAW + data
+
+    def loads(data: bytes):
+        data = bytes(data)
+        if data[:1] == ZLIB:
+            return msgpack.unpackb(zlib.decompress(data[1:]), raw=False)
+        return msgpack.unpackb(data[1:], raw=False)
+
+    register(
+        MSGPACK_ZLIB,
+        dumps,
+        loads,
+        content_type="application/x-msgpack-zlib",
+        content_encoding="binary",
+    )
@@ -0,0 +1,113 @@
+"""Celery signal handlers"""
+import os
+import threading
+import time
+
+from celery import states
+from celery.signals import (
+    before_task_publish,
+    setup_logging,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+)
+
+from app.internal.configuration.settings import get_settings
+from app.internal.log.logger import AppLogger, get_logger
+from app.internal.metrics import JOB_DURATION, JOB_QUEUE_WAIT, start_exporter
+from app.internal.services.events import get_job_event_publisher
+from app.internal.services.warmup import preload_codecs, warm_up_worker
+from app.internal.tasks.thumbnail import generate_thumbnail, update_jobs
+
+logger = get_logger()
+settings = get_settings()
+
+# Names rather than the tasks' .name, which would finalize the Celery app on import
+THUMBNAIL_TASKS = {"thumbnail.generate", "thumbnail.generate_batch"}
+
+
+@setup_logging.connect
+def configure_logging(**kwargs):
+    """
+    Log through AppLogger, as the API does, in workers and beat.
+
+    Connecting this stops Celery from configuring logging itself, so LOG_LEVEL
+    applies rather than --loglevel. Prefork children inherit the configuration.
+    """
+    AppLogger(settings)
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Expose worker metrics; runs once in the main worker process"""
+    if not settings.WORKER_METRICS_PORT:
+        return
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        logger.warning("PROMETHEUS_MULTIPROC_DIR is not set, metrics of prefork children will be missing")
+    start_exporter(settings.WORKER_METRICS_PORT)
+    logger.info("Worker metrics exporter started", port=settings.WORKER_METRICS_PORT)
+
+
+@worker_init.connect
+def preload_image_codecs(**kwargs):
+    """Load image codecs once in the main worker process; prefork children inherit them"""
+    if settings.WARM_UP:
+        preload_codecs()
+
+
+@worker_process_init.connect
+def warm_up_pool_process(**kwargs):
+    """Open a prefork child's database, storage and broker connections before its first task"""
+    if not settings.WARM_UP:
+        return
+    # Children still initializing after worker_proc_alive_timeout are killed, so connect in the background
+    threading.Thread(target=warm_up_worker, args=(settings,), name="warm-up", daemon=True).start()
+
+
+@before_task_publish.connect
+def stamp_publish_time(sender=None, headers=None, **kwargs):
+    """Record when a job was submitted and when this attempt was queued"""
+    if sender not in THUMBNAIL_TASKS or headers is None:
+        return
+    now = time.time()
+    headers["enqueued_at"] = now
+    # Retries republish the message; keep the time of the original submission
+    headers.setdefault("submitted_at", now)
+
+
+@task_prerun.connect
+def observe_queue_wait(sender=None, task=None, **kwargs):
+    if sender is None or sender.name not in THUMBNAIL_TASKS:
+        return
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    if enqueued_at is not None:
+        JOB_QUEUE_WAIT.observe(max(time.time() - enqueued_at, 0))
+
+
+@task_prerun.connect
+def mark_job_started(sender=None, task_id=None, **kwargs):
+    # The batch task marks its own jobs
+    if sender is None or sender.name != generate_thumbnail.name:
+        return
+    update_jobs([task_id], lambda store: store.mark_started([task_id]))
+
+
+@task_postrun.connect
+def record_job_state(sender=None, task_id=None, task=None, retval=None, state=None, **kwargs):
+    """Record the job's new state and notify API processes waiting on it once it is final"""
+    if sender is None or sender.name != generate_thumbnail.name:
+        return
+    if state == states.SUCCESS and isinstance(retval, dict):
+        update_jobs([task_id], lambda store: store.mark_succeeded(task_id, retval))
+    elif state == states.RETRY:
+        update_jobs([task_id], lambda store: store.mark_retry(task_id, str(retval)))
+    elif state in states.READY_STATES:
+        update_jobs([task_id], lambda store: store.mark_failed(task_id, str(retval)))
+    if state not in states.READY_STATES:
+        return
+    submitted_at = getattr(task.request, "submitted_at", None)
+    if submitted_at is not None:
+        JOB_DURATION.labels(state=state).observe(max(time.time() - submitted_at, 0))
+    result = retval if state == states.SUCCESS and isinstance(retval, dict) else None
+    get_job_event_publisher(settings).publish(task_id, state, result)
@@ -1,47 +1,255 @@
 """Celery tasks for thumbnail generation"""
+import hashlib
+import random
+import time
+from typing import Callable, Optional
+
 from botocore.exceptions import ClientError
+from celery import states
+from sqlmodel import Session
+
+from app.internal.database import get_engine
 from app.internal.tasks.celery import celery_app
-from app.internal.log.logger import get_logger
+from app.internal.log.logger import get_logger, get_sampled_logger
 from app.internal.configuration.settings import get_settings
-from app.internal.services.image import ImageService
-from app.internal.services.storage import StorageService
+from app.internal.metrics import JOB_DURATION
+from app.internal.services.content_index import ContentIndexService, renditions_hash
+from app.internal.services.events import get_job_event_publisher
+from app.internal.services.jobs import JobService
+from app.internal.services.image import (
+    DEFAULT_RENDITIONS,
+    ImageService,
+    RenderedImage,
+    Rendition,
+)
+from app.internal.services.pipeline import PipelineJob, ThumbnailPipeline
+from app.internal.services.source_cache import get_source_cache
+from app.internal.services.storage import StorageService, create_storage_service
 
 logger = get_logger()
+sampled_logger = get_sampled_logger()
 settings = get_settings()
 
+# Error codes of S3 for an object or bucket that does not exist
+NOT_FOUND_CODES = {"NoSuchKey", "NoSuchBucket", "NotFound", "404"}
+
+
+def thumbnail_key(job_id: str, rendition: Rendition, img_format: str) -> str:
+    return f"images/thumbnail/{job_id}/{rendition.key_name}.{img_format.lower()}"
+
+
+def route_queue(pixels: Optional[int]) -> str:
+    """Queue of a job by the size class of its source"""
+    if pixels is None:
+        return settings.QUEUE_MEDIUM
+    if pixels <= settings.SMALL_MAX_PIXELS:
+        return settings.QUEUE_SMALL
+    if pixels <= settings.MEDIUM_MAX_PIXELS:
+        return settings.QUEUE_MEDIUM
+    return settings.QUEUE_HUGE
+
+
+def save_renditions(storage_service: StorageService, job_id: str, rendered: list[RenderedImage]) -> dict:
+    """Store rendered thumbnails and build the job result"""
+    outputs = []
+    for output in rendered:
+        output_key = thumbnail_key(job_id, output.rendition, output.format)
+        storage_service.save(output_key, output.data, f"image/{output.format.lower()}")
+        variants = []
+        for variant_format, data in output.variants.items():
+            variant_key = thumbnail_key(job_id, output.rendition, variant_format)
+            storage_service.save(variant_key, data, f"image/{variant_format.lower()}")
+            variants.append(
+                {
+                    "format": variant_format,
+                    "key": variant_key,
+                    "size": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                }
+            )
+        outputs.append(
+            {
+                "name": output.rendition.key_name,
+                "key": output_key,
+                "format": output.format,
+                "width": output.width,
+                "height": output.height,
+                "size": len(output.data),
+                # Serves as the thumbnail's ETag without reading it back from storage
+                "sha256": hashlib.sha256(output.data).hexdigest(),
+                "variants": variants,
+            }
+        )
+    # Only per-job data: the endpoint and bucket are the same for every job and come from settings
+    return {
+        "job_id": job_id,
+        "key": outputs[0]["key"],
+        "renditions": outputs,
+    }
+
+
+def record_result(content_hash: str, renditions: list[Rendition], job_id: str, result: dict) -> None:
+    """Index a finished result so identical uploads can reuse it"""
+    try:
+        with Session(get_engine(settings)) as session:
+            ContentIndexService(session).record_result(
+                content_hash, renditions_hash(renditions, settings), job_id, result
+            )
+    except Exception as e:
+        logger.warning("Failed to index result", task_id=job_id, error=str(e))
 
-@celery_app.task(bind=True, name="thumbnail.generate")
-def generate_thumbnail(self, key: str):
-    """Generate thumbnail from image"""
-    logger.info("Generating thumbnail", task_id=self.request.id, image_path=key)
 
-    desired_size = (100, 100)
+def update_jobs(job_ids: list[str], update: Callable[[JobService], None]) -> None:
+    """Apply a job state change in its own session; failures are logged, not raised"""
     try:
-        self.update_state(state="PROGRESS")
-        # Load image from storage
-        storage_service = StorageService(settings)
-        image_bytes = storage_service.load(key)
-
-        # Resize image
-        image_service = ImageService()
-        thumbnail_bytes, thumbnail_format = image_service.resize(image_bytes, desired_size)
-
-        # Save thumbnail to storage
-        thumbnail_key = f"images/thumbnail/{self.request.id}.{thumbnail_format.lower()}"
-        storage_service.save(thumbnail_key, thumbnail_bytes)
-
-        return {
-            "job_id": self.request.id,
-            "endpoint_url": storage_service.endpoint_url,
-            "bucket": storage_service.bucket_name,
-            "key": thumbnail_key,
-        }
-
-    except (ClientError, IOError) as e:
-        logger.error(f"Retryable error: {e}", task_id=self.request.id, error=str(e))
-        self.retry(countdown=60, max_retries=3, exc=e)
+        with Session(get_engine(settings)) as session:
+            update(JobService(session))
     except Exception as e:
-        logger.error(
-            f"Thumbnail generation failed: {e}", task_id=self.request.id, error=str(e)
+        logger.warning("Failed to update job state", job_ids=job_ids, error=str(e))
+
+
+def is_retryable(stage: str, error: Exception) -> bool:
+    """
+    Whether a job failing with ``error`` in ``stage`` may succeed when retried.
+
+    Only storage errors while downloading or uploading are transient. Render
+    errors come from the image itself, and a missing source stays missing.
+    """
+    if stage == "render" or isinstance(error, FileNotFoundError):
+        return False
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") not in NOT_FOUND_CODES
+    return isinstance(error, OSError)
+
+
+def retry_countdown(retries: int) -> float:
+    """Exponential backoff with jitter, so jobs failing together do not all retry together"""
+    delay = min(settings.RETRY_BACKOFF_BASE * 2**retries, settings.RETRY_BACKOFF_MAX)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# Job state lives in the jobs table, so Celery's own result rows are not needed
+@celery_app.task(bind=True, name="thumbnail.generate", ignore_result=True)
+def generate_thumbnail(
+    self,
+    key: str,
+    renditions: Optional[list[dict]] = None,
+    content_hash: Optional[str] = None,
+    source_etag: Optional[str] = None,
+    resume: Optional[str] = None,
+):
+    """
+    Generate every requested rendition from a single download and decode.
+
+    Retries resume where the previous attempt failed: a failed upload retries
+    with the thumbnails this worker already rendered, and the source is read
+    from the worker's source cache whenever it still holds that version.
+    """
+    sampled_logger.info("Generating thumbnail", task_id=self.request.id, image_path=key, resume=resume)
+
+    requested = (
+        [Rendition.model_validate(r) for r in renditions] if renditions else DEFAULT_RENDITIONS
+    )
+    storage_service = create_storage_service(settings)
+    source_cache = get_source_cache(settings)
+    stage = "download"
+    rendered = source_cache.take_rendered(self.request.id) if resume == "upload" else None
+    try:
+        if rendered is None:
+            # Load image from storage and resize it
+            image_service = ImageService.from_settings(settings)
+            with source_cache.open(storage_service, key, source_etag) as (source, source_etag):
+                stage = "render"
+                rendered = image_service.render(source, requested)
+
+        # Save thumbnails to storage
+        stage = "upload"
+        result = save_renditions(storage_service, self.request.id, rendered)
+        if content_hash and settings.DEDUP_ENABLED:
+            record_result(content_hash, requested, self.request.id, result)
+        return result
+
+    except Exception as e:
+        if not is_retryable(stage, e):
+            logger.error("Thumbnail generation failed: {error}", task_id=self.request.id, error=str(e), stage=stage)
+            raise e
+        logger.error("Retryable error: {error}", task_id=self.request.id, error=str(e), stage=stage)
+        if stage == "upload" and self.request.retries < settings.TASK_MAX_RETRIES:
+            source_cache.put_rendered(self.request.id, rendered)
+        self.retry(
+            kwargs={**self.request.kwargs, "source_etag": source_etag, "resume": stage},
+            countdown=retry_countdown(self.request.retries),
+            max_retries=settings.TASK_MAX_RETRIES,
+            exc=e,
         )
-        raise e
+
+
+@celery_app.task(bind=True, name="thumbnail.generate_batch", ignore_result=True)
+def generate_thumbnail_batch(self, jobs: list[dict], queue: Optional[str] = None):
+    """
+    Generate thumbnails for many jobs in one task, overlapping storage I/O with rendering.
+
+    Each job's state is recorded under its own job id, as if it had run as
+    ``thumbnail.generate``. Jobs failing with a transient storage error are
+    resubmitted as individual tasks on ``queue`` so they get the usual retries.
+    """
+    logger.info("Generating thumbnail batch", task_id=self.request.id, size=len(jobs))
+    storage_service = create_storage_service(settings)
+    source_cache = get_source_cache(settings)
+    pipeline = ThumbnailPipeline(
+        storage_service,
+        ImageService.from_settings(settings),
+        save_renditions,
+        io_threads=settings.PIPELINE_IO_THREADS,
+        prefetch=settings.PIPELINE_PREFETCH,
+        # Resubmitted jobs then find their source in the cache
+        load=lambda key: source_cache.load(storage_service, key)[0],
+    )
+    publisher = get_job_event_publisher(settings)
+    submitted_at = getattr(self.request, "submitted_at", None)
+    counts = {states.SUCCESS: 0, states.RETRY: 0, states.FAILURE: 0}
+    job_ids = [job["job_id"] for job in jobs]
+    update_jobs(job_ids, lambda store: store.mark_started(job_ids))
+
+    def finish(job: PipelineJob, result: Optional[dict], error: Optional[Exception]) -> None:
+        if error is not None and is_retryable(job.stage, error):
+            logger.error("Retryable error: {error}", task_id=job.job_id, error=str(error), stage=job.stage)
+            update_jobs([job.job_id], lambda store: store.mark_retry(job.job_id, str(error)))
+            generate_thumbnail.apply_async(
+                args=[job.key, [r.model_dump() for r in job.renditions]],
+                kwargs={"content_hash": job.content_hash},
+                task_id=job.job_id,
+                queue=queue,
+                countdown=retry_countdown(0),
+            )
+            counts[states.RETRY] += 1
+            return
+        if error is not None:
+            logger.error("Thumbnail generation failed: {error}", task_id=job.job_id, error=str(error), stage=job.stage)
+            update_jobs([job.job_id], lambda store: store.mark_failed(job.job_id, str(error)))
+            state = states.FAILURE
+        else:
+            update_jobs([job.job_id], lambda store: store.mark_succeeded(job.job_id, result))
+            if job.content_hash and settings.DEDUP_ENABLED:
+                record_result(job.content_hash, job.renditions, job.job_id, result)
+            state = states.SUCCESS
+        counts[state] += 1
+        if submitted_at is not None:
+            JOB_DURATION.labels(state=state).observe(max(time.time() - submitted_at, 0))
+        publisher.publish(job.job_id, state, result)
+
+    pipeline.run(
+        (
+            PipelineJob(
+                job["job_id"],
+                job["key"],
+                [Rendition.model_validate(r) for r in job["renditions"]]
+                if job.get("renditions")
+                else DEFAULT_RENDITIONS,
+                job.get("content_hash"),
+            )
+            for job in jobs
+        ),
+        finish,
+    )
+    return {"succeeded": counts[states.SUCCESS], "retried": counts[states.RETRY], "failed": counts[states.FAILURE]}
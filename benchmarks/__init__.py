@@ -0,0 +1,52 @@
+"""Benchmarks and load tests for thumbnail-api-server"""
+import resource
+
+from loguru import logger
+
+
+def quiet_logging() -> None:
+    """Drop the default loguru sink so log I/O does not skew measurements"""
+    logger.remove()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's RSS high-water mark for this process (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _proc_status_bytes(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss() -> int:
+    rss = _proc_status_bytes("VmRSS")
+    return rss if rss is not None else peak_rss()
+
+
+def peak_rss() -> int:
+    """Peak resident set size in bytes"""
+    peak = _proc_status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+    # ru_maxrss is in kilobytes on Linux; it survives exec so prefer VmHWM
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,91 @@
+"""Synthetic image corpus for benchmarks.
+
+Images are a gradient with noise so they do not compress trivially, which keeps
+decode and encode cost close to that of real photos.
+
+Usage:
+    python -m benchmarks.corpus --out /tmp/corpus --formats JPEG PNG --megapixels 0.5 2
+"""
+import argparse
+import io
+import os
+from dataclasses import dataclass
+
+from PIL import Image
+
+ASPECT = (3, 2)
+FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+MEGAPIXELS = (0.5, 2.0, 8.0)
+CONTENT_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+
+
+@dataclass
+class CorpusImage:
+    name: str
+    format: str
+    megapixels: float
+    width: int
+    height: int
+    data: bytes
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.format]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.{self.format.lower()}"
+
+
+def image_size(megapixels: float) -> tuple[int, int]:
+    unit = (megapixels * 1_000_000 / (ASPECT[0] * ASPECT[1])) ** 0.5
+    return round(unit * ASPECT[0]), round(unit * ASPECT[1])
+
+
+def make_image(megapixels: float, img_format: str = "JPEG", quality: int = 90) -> bytes:
+    size = image_size(megapixels)
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 48)
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    if img_format == "GIF":
+        img = img.quantize(256)
+    buffer = io.BytesIO()
+    img.save(buffer, format=img_format, quality=quality)
+    return buffer.getvalue()
+
+
+def build_corpus(formats=FORMATS, megapixels=MEGAPIXELS) -> list[CorpusImage]:
+    corpus = []
+    for mp in megapixels:
+        width, height = image_size(mp)
+        for img_format in formats:
+            corpus.append(
+                CorpusImage(
+                    name=f"{img_format.lower()}-{mp:g}mp",
+                    format=img_format,
+                    megapixels=mp,
+                    width=width,
+                    height=height,
+                    data=make_image(mp, img_format),
+                )
+            )
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="directory to write images to")
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), type=str.upper, choices=FORMATS)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=list(MEGAPIXELS))
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for image in build_corpus(args.formats, args.megapixels):
+        path = os.path.join(args.out, image.filename)
+        with open(path, "wb") as f:
+            f.write(image.data)
+        print(f"{path} {image.width}x{image.height} {len(image.data)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: decode + resize time and peak RSS per source megapixel.
+
+Each measurement runs in a fresh process so that peak RSS reflects a single
+render of a single source rather than the high-water mark of earlier runs.
+
+Usage:
+    python -m benchmarks.decode --megapixels 2 12 24 --repeat 3
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from app.internal.services.image import ImageService, Rendition
+from benchmarks import current_rss, peak_rss, quiet_logging, reset_peak_rss
+from benchmarks.corpus import make_image
+
+
+def _measure(image_bytes: bytes, decode_mode: str, renditions: list[dict]) -> tuple[float, int]:
+    quiet_logging()
+    requested = [Rendition.model_validate(r) for r in renditions]
+    service = ImageService(decode_mode)
+    reset_peak_rss()
+    baseline = current_rss()
+    start = time.perf_counter()
+    service.render(image_bytes, requested)
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss() - baseline
+
+
+def measure(image_bytes: bytes, decode_mode: str, renditions: list[dict]) -> tuple[float, int]:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(_measure, image_bytes, decode_mode, renditions).result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[2, 12, 24])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--width", type=int, default=100, help="thumbnail width")
+    parser.add_argument("--height", type=int, default=100, help="thumbnail height")
+    args = parser.parse_args()
+    quiet_logging()
+
+    renditions = [{"width": args.width, "height": args.height}]
+    print(f"{'MP':>6} {'mode':<6} {'ms':>9} {'ms/MP':>8} {'peak MB':>9} {'MB/MP':>7}")
+    for megapixels in args.megapixels:
+        image_bytes = make_image(megapixels, "JPEG")
+        for decode_mode in ("exact", "fast"):
+            samples = [measure(image_bytes, decode_mode, renditions) for _ in range(args.repeat)]
+            elapsed = statistics.median(s[0] for s in samples)
+            peak = statistics.median(s[1] for s in samples) / 1024 / 1024
+            print(
+                f"{megapixels:>6.1f} {decode_mode:<6} {elapsed * 1000:>9.1f} "
+                f"{elapsed * 1000 / megapixels:>8.2f} {peak:>9.1f} {peak / megapixels:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
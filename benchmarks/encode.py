@@ -0,0 +1,82 @@
+"""Benchmark: encode time vs. output bytes per format and encoder setting.
+
+Each source is resized to the thumbnail size once, then encoded repeatedly with
+every configuration below. Use it to pick OUTPUT_FORMAT, rendition variants
+and the per-format encoder settings in Settings.
+
+Usage:
+    python -m benchmarks.encode --size 400 300 --quality 80 --repeat 5
+"""
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+from app.internal.services.image import ImageService, Rendition
+from benchmarks import quiet_logging
+from benchmarks.corpus import make_image
+
+CONFIGS = [
+    ("JPEG", "baseline", {"JPEG": {"progressive": False, "optimize": False}}),
+    ("JPEG", "progressive+optimize", {"JPEG": {"progressive": True, "optimize": True}}),
+    ("JPEG", "progressive 4:4:4", {"JPEG": {"progressive": True, "optimize": True, "subsampling": "4:4:4"}}),
+    ("PNG", "compress_level=6", {"PNG": {"compress_level": 6}}),
+    ("PNG", "compress_level=9 optimize", {"PNG": {"compress_level": 9, "optimize": True}}),
+    ("WEBP", "method=0", {"WEBP": {"method": 0}}),
+    ("WEBP", "method=4", {"WEBP": {"method": 4}}),
+    ("WEBP", "method=6", {"WEBP": {"method": 6}}),
+    ("AVIF", "speed=9", {"AVIF": {"speed": 9}}),
+    ("AVIF", "speed=6", {"AVIF": {"speed": 6}}),
+]
+
+
+def make_screenshot(size: tuple[int, int] = (1920, 1080)) -> bytes:
+    """Flat UI-like PNG: solid panels and lines of 'text', the case lossless PNG handles worst"""
+    img = Image.new("RGB", size, (245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, size[0], 60), fill=(40, 90, 160))
+    draw.rectangle((0, 60, 280, size[1]), fill=(230, 232, 236))
+    for y in range(100, size[1] - 40, 28):
+        draw.text((320, y), "The quick brown fox jumps over the lazy dog 0123456789 " * 2, fill=(30, 30, 30))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def resized(image_bytes: bytes, width: int, height: int) -> Image.Image:
+    """The decoded and fitted thumbnail, before encoding"""
+    service = ImageService()
+    rendition = Rendition(width=width, height=height, format="PNG")
+    with Image.open(io.BytesIO(service.render(image_bytes, [rendition])[0].data)) as img:
+        return img.convert("RGB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, nargs=2, default=[400, 300], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    quiet_logging()
+
+    sources = {"photo": make_image(2, "JPEG"), "screenshot": make_screenshot()}
+    print(f"{'source':<11} {'format':<5} {'settings':<27} {'ms':>8} {'KB':>8}")
+    for source_name, image_bytes in sources.items():
+        thumbnail = resized(image_bytes, *args.size)
+        for img_format, label, options in CONFIGS:
+            service = ImageService(encoder_options=options)
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                data = service._encode(thumbnail, img_format, args.quality)
+                samples.append(time.perf_counter() - start)
+            print(
+                f"{source_name:<11} {img_format:<5} {label:<27} "
+                f"{statistics.median(samples) * 1000:>8.2f} {len(data) / 1024:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
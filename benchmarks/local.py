@@ -0,0 +1,29 @@
+"""Local stand-ins for S3, the Celery broker and the database.
+
+Lets benchmarks drive the real API and task code in a single process with no
+external services: objects live in the memory (or local) storage backend,
+Celery runs tasks eagerly and results and job rows go to a SQLite file.
+"""
+import os
+
+
+def local_environment(workdir: str, storage_backend: str = "memory") -> dict[str, str]:
+    """Settings pointing storage, the broker, result backend and database at local stand-ins"""
+    database = os.path.join(workdir, "benchmark.db")
+    return {
+        "STORAGE_BACKEND": storage_backend,
+        "STORAGE_LOCAL_ROOT": os.path.join(workdir, "storage"),
+        "S3_BUCKET_NAME": "benchmark",
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_BACKEND_URL": f"db+sqlite:///{database}",
+        "DATABASE_URL": f"sqlite:///{database}",
+        "DEBUG": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def install_local_services() -> None:
+    """Run Celery tasks in-process; call after setting the environment"""
+    from app.internal.tasks.celery import celery_app
+
+    celery_app.conf.update(task_always_eager=True, task_store_eager_result=True)
@@ -0,0 +1,88 @@
+"""Benchmark: logging cost per request under each AppLogger configuration.
+
+Replays the records one upload and its thumbnail task emit (the HTTP request
+log, storage reads and writes, rendering, and botocore's debug records routed
+through the standard logging intercept) against a sink writing to /dev/null.
+Reports microseconds spent in the calling thread per request, which is what
+logging adds to request latency, the time until every record is written, and
+the records the bounded production queue dropped rather than block on.
+
+Usage:
+    python -m benchmarks.log_overhead --requests 20000
+"""
+import argparse
+import logging
+import sys
+import time
+
+from loguru import logger
+from prometheus_client import REGISTRY
+
+from app.internal.configuration.settings import Settings
+from app.internal.log.logger import AppLogger, get_sampled_logger
+
+# Debug records botocore emits per S3 call
+BOTOCORE_RECORDS = 8
+
+CONFIGURATIONS = {
+    "development": dict(ENVIRONMENT="development", LOG_LEVEL="DEBUG", LOG_LEVEL_OVERRIDES=""),
+    "production": dict(ENVIRONMENT="production", LOG_LEVEL="INFO"),
+    "prod-sampled": dict(ENVIRONMENT="production", LOG_LEVEL="INFO", LOG_SAMPLE_RATE=0.1),
+}
+
+
+def emit_request(i: int) -> None:
+    sampled_logger = get_sampled_logger()
+    botocore = logging.getLogger("botocore.endpoint")
+    key = f"images/original/{i}.jpg"
+    sampled_logger.info("Image uploaded to: {key}", key=key, job_id=str(i), size=48_213)
+    sampled_logger.info("Task submitted", job_id=str(i))
+    if sampled_logger.keep():
+        logger.info("HTTP Request", method="POST", url="http://api/v1/thumbnails/", status_code=200)
+    for operation in ("GetObject", "PutObject"):
+        for _ in range(BOTOCORE_RECORDS):
+            botocore.debug("Making request for %s with params: %r", operation, {"Bucket": "b", "Key": key})
+    sampled_logger.info("File loaded from S3", bucket="b", key=key, size=48_213)
+    logger.debug("Decoding at {} instead of {}", (750, 500), (3000, 2000))
+    sampled_logger.info("Image rendered", renditions=["100x100"], source_size=(750, 500))
+    sampled_logger.info("File saved to S3", bucket="b", key=key, size=3_015)
+
+
+def measure(name: str, overrides: dict, requests: int) -> None:
+    settings = Settings(S3_BUCKET_NAME="benchmark", **overrides)
+    dropped = REGISTRY.get_sample_value("thumbnail_log_records_dropped_total") or 0
+    stdout = sys.stdout
+    with open("/dev/null", "w") as devnull:
+        sys.stdout = devnull
+        try:
+            AppLogger().configure(settings, force=True)
+        finally:
+            sys.stdout = stdout
+        for i in range(100):
+            emit_request(i)
+        logger.complete()
+
+        start = time.perf_counter()
+        for i in range(requests):
+            emit_request(i)
+        caller = time.perf_counter() - start
+        # Wait for queued records to be written: complete() drains enqueue=True, remove() the production sink
+        logger.complete()
+        logger.remove()
+        total = time.perf_counter() - start
+    dropped = (REGISTRY.get_sample_value("thumbnail_log_records_dropped_total") or 0) - dropped
+    print(f"{name:<13} {caller / requests * 1e6:>10.1f} {total / requests * 1e6:>10.1f} {dropped:>8.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'mode':<13} {'caller µs':>10} {'total µs':>10} {'dropped':>8}")
+    for name, overrides in CONFIGURATIONS.items():
+        measure(name, overrides, args.requests)
+
+
+if __name__ == "__main__":
+    main()
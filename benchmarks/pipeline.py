@@ -0,0 +1,162 @@
+"""Benchmark: the full upload -> generate_thumbnail -> thumbnail URL pipeline.
+
+Drives the real API through FastAPI's TestClient against local stand-ins
+(memory or local storage backend, eager Celery, SQLite), one corpus image at a time, and reports
+images/sec, latency percentiles and peak RSS per image. Results can be saved as
+a baseline and later runs compared against it; the exit status is 1 when any
+case is slower than the baseline by more than the tolerance.
+
+Usage:
+    python -m benchmarks.pipeline --repeat 20 --save-baseline baseline.json
+    python -m benchmarks.pipeline --repeat 20 --baseline baseline.json --tolerance 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import PIL
+
+from benchmarks import peak_rss, percentile, quiet_logging, reset_peak_rss
+from benchmarks.corpus import FORMATS, MEGAPIXELS, CorpusImage, build_corpus
+from benchmarks.local import install_local_services, local_environment
+
+
+def create_client(workdir: str, storage_backend: str, inline: bool):
+    quiet_logging()
+    os.environ.update(local_environment(workdir, storage_backend))
+    # Every repetition uploads the same bytes; deduplication would skip the work
+    os.environ["DEDUP_ENABLED"] = "false"
+    if not inline:
+        os.environ["INLINE_MAX_BYTES"] = "0"
+
+    from fastapi.testclient import TestClient
+
+    from app.internal.api.server import create_app
+    from app.internal.configuration.settings import reload_settings
+    from app.internal.database import create_db_and_tables
+
+    install_local_services()
+    settings = reload_settings()
+    create_db_and_tables(settings)
+    return TestClient(create_app(settings))
+
+
+def run_pipeline(client, image: CorpusImage, renditions: str | None) -> tuple[float, float]:
+    """Upload one image and fetch its thumbnail URL; returns (upload, fetch) seconds"""
+    data = {"renditions": renditions} if renditions else None
+    start = time.perf_counter()
+    response = client.post(
+        "/api/v1/thumbnails/",
+        files={"image": (image.filename, image.data, image.content_type)},
+        data=data,
+    )
+    response.raise_for_status()
+    uploaded = time.perf_counter()
+    job_id = response.json()["job_id"]
+    response = client.get(f"/api/v1/jobs/{job_id}/thumbnail")
+    response.raise_for_status()
+    return uploaded - start, time.perf_counter() - uploaded
+
+
+def measure(client, image: CorpusImage, repeat: int, renditions: str | None) -> dict:
+    run_pipeline(client, image, renditions)  # warm up caches and connections
+    reset_peak_rss()
+    totals, uploads, fetches = [], [], []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        upload, fetch = run_pipeline(client, image, renditions)
+        uploads.append(upload)
+        fetches.append(fetch)
+        totals.append(upload + fetch)
+    elapsed = time.perf_counter() - start
+    return {
+        "format": image.format,
+        "megapixels": image.megapixels,
+        "bytes": len(image.data),
+        "images_per_sec": repeat / elapsed,
+        "p50_ms": percentile(totals, 50) * 1000,
+        "p95_ms": percentile(totals, 95) * 1000,
+        "p99_ms": percentile(totals, 99) * 1000,
+        "upload_p50_ms": percentile(uploads, 50) * 1000,
+        "fetch_p50_ms": percentile(fetches, 50) * 1000,
+        "peak_rss_mb": peak_rss() / 1024 / 1024,
+    }
+
+
+def compare(cases: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print throughput and p95 against the baseline; returns the regressed case names"""
+    regressed = []
+    print()
+    print(f"{'case':<14} {'img/s':>8} {'base':>8} {'change':>8} {'p95 ms':>8} {'base':>8} {'change':>8}")
+    for name, case in cases.items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            print(f"{name:<14} not in baseline")
+            continue
+        throughput = case["images_per_sec"] / base["images_per_sec"] - 1
+        p95 = case["p95_ms"] / base["p95_ms"] - 1
+        flag = ""
+        if throughput < -tolerance:
+            regressed.append(name)
+            flag = "  REGRESSED"
+        print(
+            f"{name:<14} {case['images_per_sec']:>8.1f} {base['images_per_sec']:>8.1f} {throughput:>+8.1%} "
+            f"{case['p95_ms']:>8.1f} {base['p95_ms']:>8.1f} {p95:>+8.1%}{flag}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), type=str.upper, choices=FORMATS)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=list(MEGAPIXELS))
+    parser.add_argument("--repeat", type=int, default=10, help="pipeline runs per image")
+    parser.add_argument("--renditions", default=None, help="renditions JSON sent with every upload")
+    parser.add_argument("--storage", default="memory", choices=["memory", "local"], help="storage backend")
+    parser.add_argument("--inline", action="store_true", help="allow small uploads to render inline")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results to PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare results with PATH")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed throughput drop, 0.1 = 10%%")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        client = create_client(workdir, args.storage, args.inline)
+        corpus = build_corpus(args.formats, args.megapixels)
+        cases = {}
+        print(f"{'case':<14} {'KB':>7} {'img/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak MB':>8}")
+        for image in corpus:
+            case = measure(client, image, args.repeat, args.renditions)
+            cases[image.name] = case
+            print(
+                f"{image.name:<14} {case['bytes'] / 1024:>7.0f} {case['images_per_sec']:>8.1f} "
+                f"{case['p50_ms']:>8.1f} {case['p95_ms']:>8.1f} {case['p99_ms']:>8.1f} {case['peak_rss_mb']:>8.1f}"
+            )
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "renditions": args.renditions,
+            "storage": args.storage,
+        },
+        "cases": cases,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(cases, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
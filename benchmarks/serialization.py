@@ -0,0 +1,117 @@
+"""Benchmark: broker and backend bytes and serialization time per job, by CELERY_SERIALIZER.
+
+Serializes the task messages the API publishes (a single job, and a pipelined
+batch) and the results workers record (one rendition, and four renditions with
+WebP and AVIF variants, in the current schema and with the ``endpoint_url`` and
+``bucket`` fields results used to repeat), through the same kombu registry
+Celery uses. Results are produced by rendering a synthetic image and storing
+it with ``save_renditions`` in memory storage, so they match what workers write.
+
+Usage:
+    python -m benchmarks.serialization --repeat 2000
+"""
+import argparse
+import time
+import uuid
+
+from kombu.serialization import dumps, loads
+
+from app.internal.configuration.settings import Settings
+from app.internal.services.image import DEFAULT_RENDITIONS, ImageService, Rendition
+from app.internal.services.storage import MemoryStorageService
+from app.internal.tasks.serialization import MSGPACK_ZLIB, register_msgpack_zlib
+from benchmarks import quiet_logging
+from benchmarks.corpus import make_image
+
+SERIALIZERS = ["json", "msgpack", MSGPACK_ZLIB]
+RENDITIONS = [
+    Rendition(width=100, height=100, variants=["WEBP", "AVIF"]),
+    Rendition(width=320, height=240, fit="contain", variants=["WEBP", "AVIF"]),
+    Rendition(width=640, height=480, fit="contain", variants=["WEBP", "AVIF"]),
+    Rendition(name="square", width=200, height=200, format="WEBP", variants=["AVIF"]),
+]
+
+
+def task_message(renditions: list[Rendition]) -> tuple:
+    """Body of a thumbnail.generate message in Celery's task protocol 2: (args, kwargs, embed)"""
+    return (
+        [f"images/original/{uuid.uuid4()}.jpg", [r.model_dump() for r in renditions]],
+        {"content_hash": uuid.uuid4().hex * 2},
+        {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+    )
+
+
+def batch_message(jobs: int) -> tuple:
+    """Body of a thumbnail.generate_batch message"""
+    return (
+        [
+            [
+                {
+                    "job_id": str(uuid.uuid4()),
+                    "key": f"images/original/{uuid.uuid4()}.jpg",
+                    "renditions": [r.model_dump() for r in DEFAULT_RENDITIONS],
+                    "content_hash": uuid.uuid4().hex * 2,
+                }
+                for _ in range(jobs)
+            ]
+        ],
+        {"queue": "thumbnail.small"},
+        {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+    )
+
+
+def job_result(storage_service: MemoryStorageService, image_service: ImageService, renditions: list[Rendition]) -> dict:
+    from app.internal.tasks.thumbnail import save_renditions
+
+    rendered = image_service.render(make_image(2.0), renditions)
+    return save_renditions(storage_service, str(uuid.uuid4()), rendered)
+
+
+def measure(payload, serializer: str, repeat: int) -> tuple[int, float, float]:
+    """Encoded size, and microseconds to encode and to decode"""
+    content_type, encoding, data = dumps(payload, serializer=serializer)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dumps(payload, serializer=serializer)
+    encode = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        loads(data, content_type, encoding, accept=[content_type])
+    decode = (time.perf_counter() - start) / repeat
+    return len(data), encode * 1e6, decode * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--threshold", type=int, default=1024, help="CELERY_COMPRESSION_THRESHOLD")
+    args = parser.parse_args()
+    quiet_logging()
+    register_msgpack_zlib(args.threshold)
+
+    settings = Settings(S3_BUCKET_NAME="thumbnail-api-server-benchmark", STORAGE_BACKEND="memory")
+    storage_service = MemoryStorageService(settings)
+    image_service = ImageService.from_settings(settings)
+    legacy_fields = {"endpoint_url": "http://minio:9000", "bucket": settings.S3_BUCKET_NAME}
+    single = job_result(storage_service, image_service, DEFAULT_RENDITIONS)
+    multi = job_result(storage_service, image_service, RENDITIONS)
+    payloads = [
+        ("task, 1 rendition", task_message(DEFAULT_RENDITIONS), 1),
+        ("task, 4 renditions", task_message(RENDITIONS), 1),
+        (f"batch task, {args.batch_size} jobs", batch_message(args.batch_size), args.batch_size),
+        ("result, 1 rendition", single, 1),
+        ("  with endpoint/bucket", single | legacy_fields, 1),
+        ("result, 4 renditions", multi, 1),
+        ("  with endpoint/bucket", multi | legacy_fields, 1),
+    ]
+
+    print(f"{'payload':<24} {'serializer':<13} {'bytes/job':>10} {'encode µs':>10} {'decode µs':>10}")
+    for name, payload, jobs in payloads:
+        for serializer in SERIALIZERS:
+            size, encode, decode = measure(payload, serializer, args.repeat)
+            print(f"{name:<24} {serializer:<13} {size / jobs:>10.0f} {encode / jobs:>10.2f} {decode / jobs:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark: cold start of API and worker processes, with and without warm-up.
+
+Starts fresh interpreters against local stand-ins (memory storage, in-memory
+broker, SQLite) and reports the median time each phase takes:
+- import: importing the server, or the task modules
+- create: building the app and its tables, or finalizing the Celery app
+- warm-up: until /ready answers 200, or until the worker_init and
+  worker_process_init warm-up is done
+- first and second: one upload, or one generate_thumbnail run
+- process: the whole child process, interpreter start and exit included
+
+With WARM_UP=false, the cost of codecs and connections shows up in the first
+request instead. The time get_settings() takes per call is reported last.
+
+Usage:
+    python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import quiet_logging
+from benchmarks.local import local_environment
+
+PHASES = ["import", "create", "warm_up", "first", "second"]
+
+
+def run_api(data: bytes) -> dict[str, float]:
+    timings = {}
+    start = time.perf_counter()
+    from app.internal.api.server import create_app
+    from app.internal.configuration.settings import get_settings
+    from app.internal.database import create_db_and_tables
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    settings = get_settings()
+    create_db_and_tables(settings)
+    application = create_app(settings)
+    timings["create"] = time.perf_counter() - start
+
+    from fastapi.testclient import TestClient
+
+    # Entering the client runs the lifespan, which starts warm-up
+    with TestClient(application) as client:
+        start = time.perf_counter()
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.001)
+        timings["warm_up"] = time.perf_counter() - start
+        for phase in ("first", "second"):
+            start = time.perf_counter()
+            response = client.post("/api/v1/thumbnails/", files={"image": ("startup.jpg", data, "image/jpeg")})
+            response.raise_for_status()
+            timings[phase] = time.perf_counter() - start
+    return timings
+
+
+def run_worker(data: bytes) -> dict[str, float]:
+    timings = {}
+    start = time.perf_counter()
+    from app.internal.configuration.settings import get_settings
+    from app.internal.tasks import signals
+    from app.internal.tasks.celery import celery_app
+    from app.internal.tasks.thumbnail import generate_thumbnail
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    celery_app.finalize(auto=True)
+    timings["create"] = time.perf_counter() - start
+
+    from app.internal.database import create_db_and_tables
+    from app.internal.services.image import DEFAULT_RENDITIONS
+    from app.internal.services.storage import create_storage_service
+    from app.internal.services.warmup import warm_up_worker
+
+    settings = get_settings()
+    create_db_and_tables(settings)
+    create_storage_service(settings).save("images/original/startup.jpg", data, "image/jpeg")
+
+    start = time.perf_counter()
+    # What the worker_init and worker_process_init handlers do, the latter in the foreground
+    signals.preload_image_codecs()
+    if settings.WARM_UP:
+        warm_up_worker(settings)
+    timings["warm_up"] = time.perf_counter() - start
+    renditions = [r.model_dump() for r in DEFAULT_RENDITIONS]
+    for phase in ("first", "second"):
+        start = time.perf_counter()
+        generate_thumbnail.apply(args=["images/original/startup.jpg", renditions]).get()
+        timings[phase] = time.perf_counter() - start
+    return timings
+
+
+def run_child(kind: str, warm_up: bool, image_path: str) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as workdir:
+        env = os.environ | local_environment(workdir) | {
+            "WARM_UP": str(warm_up).lower(),
+            # The second upload would reuse the first one's result
+            "DEDUP_ENABLED": "false",
+            "WORKER_METRICS_PORT": "0",
+        }
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child", kind, "--image", image_path],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings = json.loads(output.stdout.splitlines()[-1])
+        timings["process"] = time.perf_counter() - start
+    return timings
+
+
+def measure_settings(repeat: int) -> None:
+    from app.internal.configuration.settings import Settings, get_settings
+
+    get_settings()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Settings()
+    parse = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        get_settings()
+    cached = (time.perf_counter() - start) / repeat
+    print(f"\nSettings() {parse * 1e6:.1f} µs per call, get_settings() {cached * 1e6:.2f} µs per call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", choices=["api", "worker"], help=argparse.SUPPRESS)
+    parser.add_argument("--image", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    quiet_logging()
+
+    if args.child:
+        with open(args.image, "rb") as f:
+            data = f.read()
+        timings = run_api(data) if args.child == "api" else run_worker(data)
+        print(json.dumps(timings))
+        return
+
+    # Imported here, so child processes do not load Pillow before they are measured
+    from benchmarks.corpus import make_image
+
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as image:
+        image.write(make_image(2.0))
+        image.flush()
+        print(
+            f"{'process':<8} {'warm-up':<8} {'import s':>9} {'create s':>9} {'warm-up s':>10}"
+            f" {'first ms':>9} {'second ms':>10} {'process s':>10}"
+        )
+        for kind in ("api", "worker"):
+            for warm_up in (True, False):
+                runs = [run_child(kind, warm_up, image.name) for _ in range(args.repeat)]
+                median = {phase: statistics.median(run[phase] for run in runs) for phase in [*PHASES, "process"]}
+                print(
+                    f"{kind:<8} {'on' if warm_up else 'off':<8} {median['import']:>9.3f} {median['create']:>9.3f}"
+                    f" {median['warm_up']:>10.3f} {median['first'] * 1e3:>9.1f} {median['second'] * 1e3:>10.1f}"
+                    f" {median['process']:>10.3f}"
+                )
+    measure_settings(args.repeat * 20)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Load test: latency of light endpoints while uploads are in flight.
+
+Runs a fixed number of concurrent uploaders against ``POST /api/v1/thumbnails/``
+and, at the same time, probes ``/health`` and ``/api/v1/jobs/{job_id}``. When
+the upload path blocks the event loop, probe latency tracks the S3 round-trip
+instead of staying flat.
+
+Usage:
+    python -m benchmarks.upload_load --base-url http://localhost:8080 \\
+        --uploaders 16 --upload-size 5242880 --duration 30
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from benchmarks import percentile
+
+
+def summarize(name: str, samples: list[float]) -> str:
+    if not samples:
+        return f"{name:<10} no samples"
+    return (
+        f"{name:<10} n={len(samples):<6} "
+        f"mean={statistics.fmean(samples) * 1000:8.2f}ms "
+        f"p50={percentile(samples, 50) * 1000:8.2f}ms "
+        f"p95={percentile(samples, 95) * 1000:8.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.2f}ms"
+    )
+
+
+async def uploader(client: httpx.AsyncClient, payload: bytes, deadline: float, job_ids: list[str], latencies: list[float]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/thumbnails/", files={"image": ("load.jpg", payload, "image/jpeg")}
+        )
+        latencies.append(time.perf_counter() - start)
+        if response.status_code == 200:
+            job_ids.append(response.json()["job_id"])
+
+
+async def prober(client: httpx.AsyncClient, path_fn, deadline: float, interval: float, latencies: list[float]):
+    while time.perf_counter() < deadline:
+        path = path_fn()
+        if path is not None:
+            start = time.perf_counter()
+            await client.get(path)
+            latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace) -> None:
+    payload = os.urandom(args.upload_size)
+    job_ids: list[str] = []
+    upload_latencies: list[float] = []
+    health_latencies: list[float] = []
+    job_latencies: list[float] = []
+
+    limits = httpx.Limits(max_connections=args.uploaders + 2 * args.probers)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(uploader(client, payload, deadline, job_ids, upload_latencies) for _ in range(args.uploaders)),
+            *(prober(client, lambda: "/health", deadline, args.interval, health_latencies) for _ in range(args.probers)),
+            *(
+                prober(
+                    client,
+                    lambda: f"/api/v1/jobs/{job_ids[-1]}" if job_ids else None,
+                    deadline,
+                    args.interval,
+                    job_latencies,
+                )
+                for _ in range(args.probers)
+            ),
+        )
+
+    print(f"uploaders={args.uploaders} upload_size={args.upload_size} duration={args.duration}s")
+    print(summarize("upload", upload_latencies))
+    print(summarize("health", health_latencies))
+    print(summarize("job", job_latencies))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--uploaders", type=int, default=16, help="concurrent upload loops")
+    parser.add_argument("--probers", type=int, default=2, help="concurrent probe loops per endpoint")
+    parser.add_argument("--upload-size", type=int, default=5 * 1024 * 1024, help="bytes per upload")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between probes")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
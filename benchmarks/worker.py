@@ -0,0 +1,107 @@
+"""Benchmark: sequential generate_thumbnail vs. the pipelined batch task, per core.
+
+Renders the same jobs twice in one process against memory storage that sleeps
+to simulate S3: once the way ``thumbnail.generate`` does (load, render, save
+one job after another) and once through ThumbnailPipeline as
+``thumbnail.generate_batch`` does. Reports images/sec and CPU time over wall
+time; pin the process to one core, as a prefork worker child effectively is,
+to read them per core.
+
+Usage:
+    taskset -c 0 python -m benchmarks.worker --jobs 40 --megapixels 2 --latency-ms 30 --bandwidth-mbps 400
+"""
+import argparse
+import time
+
+from app.internal.configuration.settings import Settings
+from app.internal.services.image import DEFAULT_RENDITIONS, ImageService
+from app.internal.services.pipeline import PipelineJob, ThumbnailPipeline
+from app.internal.services.storage import MemoryStorageService, StorageService
+from benchmarks import quiet_logging
+from benchmarks.corpus import make_image
+
+
+class SlowStorageService(MemoryStorageService):
+    """Memory storage with a fixed round-trip latency and limited bandwidth per request"""
+
+    def __init__(self, settings: Settings, latency: float, bandwidth: float):
+        super().__init__(settings)
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def _wait(self, size: int) -> None:
+        time.sleep(self.latency + size / self.bandwidth)
+
+    def save(self, key: str, data: bytes, content_type: str = "") -> None:
+        self._wait(len(data))
+        super().save(key, data, content_type)
+
+    def load(self, key: str) -> bytes:
+        data = super().load(key)
+        self._wait(len(data))
+        return data
+
+
+def run_sequential(storage_service: StorageService, image_service: ImageService, jobs: list[PipelineJob]) -> None:
+    from app.internal.tasks.thumbnail import save_renditions
+
+    for job in jobs:
+        with storage_service.open(job.key) as source:
+            rendered = image_service.render(source, job.renditions)
+        save_renditions(storage_service, job.job_id, rendered)
+
+
+def run_pipelined(
+    storage_service: StorageService, image_service: ImageService, jobs: list[PipelineJob], io_threads: int, prefetch: int
+) -> None:
+    from app.internal.tasks.thumbnail import save_renditions
+
+    def check(job, result, error):
+        if error is not None:
+            raise error
+
+    ThumbnailPipeline(storage_service, image_service, save_renditions, io_threads, prefetch).run(jobs, check)
+
+
+def measure(name: str, run, count: int) -> None:
+    wall, cpu = time.perf_counter(), time.process_time()
+    run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{name:<11} {count / wall:>8.1f} {cpu / wall:>9.0%} {wall:>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--megapixels", type=float, default=2.0)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="simulated time to first byte per request")
+    parser.add_argument("--bandwidth-mbps", type=float, default=400.0, help="simulated transfer rate per request")
+    parser.add_argument("--io-threads", type=int, default=4)
+    parser.add_argument("--prefetch", type=int, default=2)
+    args = parser.parse_args()
+    quiet_logging()
+
+    settings = Settings(S3_BUCKET_NAME="benchmark")
+    storage_service = SlowStorageService(settings, args.latency_ms / 1000, args.bandwidth_mbps * 1_000_000 / 8)
+    image_service = ImageService.from_settings(settings)
+    source = make_image(args.megapixels)
+    MemoryStorageService.save(storage_service, "images/original/benchmark.jpg", source)
+    jobs = [
+        PipelineJob(f"benchmark-{i}", "images/original/benchmark.jpg", DEFAULT_RENDITIONS)
+        for i in range(args.jobs)
+    ]
+    # Warm up decoders and the encoder before timing
+    image_service.render(source, DEFAULT_RENDITIONS)
+
+    print(f"{len(source) / 1024:.0f} KB source, {args.latency_ms:.0f} ms latency, {args.bandwidth_mbps:.0f} Mbit/s")
+    print(f"{'mode':<11} {'img/s':>8} {'core busy':>9} {'seconds':>8}")
+    measure("sequential", lambda: run_sequential(storage_service, image_service, jobs), len(jobs))
+    measure(
+        "pipelined",
+        lambda: run_pipelined(storage_service, image_service, jobs, args.io_threads, args.prefetch),
+        len(jobs),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read once per process, so point them at local stand-ins before the app is imported
+_workdir = tempfile.mkdtemp(prefix="thumbnail-api-server-tests-")
+os.environ.update(
+    STORAGE_BACKEND="memory",
+    S3_BUCKET_NAME="tests",
+    CELERY_BROKER_URL="memory://",
+    CELERY_BACKEND_URL=f"db+sqlite:///{_workdir}/tests.db",
+    DATABASE_URL=f"sqlite:///{_workdir}/tests.db",
+    WARM_UP="false",
+    WORKER_METRICS_PORT="0",
+)
+
+
+@pytest.fixture(scope="session")
+def settings():
+    from app.internal.configuration.settings import get_settings
+    from app.internal.database import create_db_and_tables
+
+    settings = get_settings()
+    create_db_and_tables(settings)
+    return settings
+
+
+@pytest.fixture
+def client(settings):
+    from fastapi.testclient import TestClient
+
+    from app.internal.api.server import create_app
+
+    with TestClient(create_app(settings)) as client:
+        yield client
@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from app.internal.configuration.settings import Settings
+from app.internal.services import admission
+from app.internal.services.admission import RateLimiter, TokenBucket
+
+
+def test_token_bucket_allows_a_burst_up_to_capacity():
+    bucket = TokenBucket(rate=1, capacity=3, now=0)
+
+    assert [bucket.take(1, now=0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(1, now=0) == pytest.approx(1)
+    assert bucket.take(4, now=0) == math.inf
+
+
+def test_token_bucket_refills_at_rate_up_to_capacity():
+    bucket = TokenBucket(rate=2, capacity=4, now=0)
+    assert bucket.take(4, now=0) == 0
+
+    assert bucket.take(2, now=0.5) == pytest.approx(0.5)
+    assert bucket.take(2, now=1) == 0
+    # Idle time does not bank more than the capacity
+    assert bucket.take(4, now=100) == 0
+    assert bucket.take(1, now=100) == pytest.approx(0.5)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_rate_limiter_limits_each_client_separately(clock):
+    limiter = RateLimiter(Settings(RATE_LIMIT_PER_MINUTE=60, RATE_LIMIT_BURST=2))
+
+    assert limiter.acquire("a", 2) == 0
+    assert limiter.acquire("a") == pytest.approx(1)
+    assert limiter.acquire("b", 2) == 0
+    clock[0] = 1
+    assert limiter.acquire("a") == 0
+
+
+def test_rate_limiter_drops_least_recently_seen_clients(clock, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_TRACKED_CLIENTS", 2)
+    limiter = RateLimiter(Settings(RATE_LIMIT_PER_MINUTE=60, RATE_LIMIT_BURST=1))
+    limiter.acquire("a")
+    limiter.acquire("b")
+    # Seeing "a" again makes "b" the least recently seen
+    assert limiter.acquire("a") > 0
+
+    limiter.acquire("c")
+
+    assert list(limiter._buckets) == ["a", "c"]
+    # "a" kept its bucket, "b" starts over with a full one
+    assert limiter.acquire("a") > 0
+    assert limiter.acquire("b") == 0
+
+
+def test_rate_limiter_is_disabled_without_a_rate():
+    limiter = RateLimiter(Settings(RATE_LIMIT_PER_MINUTE=0, RATE_LIMIT_BURST=1))
+
+    assert [limiter.acquire("a", 5) for _ in range(3)] == [0, 0, 0]
@@ -0,0 +1,34 @@
+import pytest
+
+from app.internal.configuration.settings import Settings
+from app.internal.services.content_index import renditions_hash
+from app.internal.services.image import Rendition
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"OUTPUT_FORMAT": "webp"},
+        {"IMAGE_DECODE_MODE": "exact"},
+        {"JPEG_PROGRESSIVE": False},
+        {"WEBP_METHOD": 6},
+    ],
+)
+def test_renditions_hash_changes_with_settings(changed):
+    renditions = [Rendition(width=100, height=100)]
+
+    assert renditions_hash(renditions, Settings()) != renditions_hash(renditions, Settings(**changed))
+
+
+def test_renditions_hash_ignores_options_of_formats_not_written():
+    renditions = [Rendition(width=100, height=100, format="png")]
+
+    assert renditions_hash(renditions, Settings()) == renditions_hash(renditions, Settings(WEBP_METHOD=6))
+
+
+def test_renditions_hash_resolves_the_output_format():
+    settings = Settings(OUTPUT_FORMAT="webp")
+
+    assert renditions_hash([Rendition(width=100, height=100)], settings) == renditions_hash(
+        [Rendition(width=100, height=100, format="webp")], settings
+    )
@@ -0,0 +1,36 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.internal.configuration.settings import Settings
+from app.internal.services.image import ImageService, Rendition
+
+
+def test_unsupported_output_format_is_rejected_by_the_image_service():
+    with pytest.raises(ValueError, match="NOPE"):
+        ImageService.from_settings(Settings(OUTPUT_FORMAT="nope"))
+
+
+def test_supported_output_format_is_used():
+    assert ImageService.from_settings(Settings(OUTPUT_FORMAT="png")).output_format == "PNG"
+
+
+@pytest.mark.parametrize("decode_mode, sources", [("fast", [(400, 300), (200, 150)]), ("exact", [(400, 300)] * 2)])
+def test_renditions_are_resampled_from_the_source_in_exact_mode(monkeypatch, decode_mode, sources):
+    image = io.BytesIO()
+    Image.new("RGB", (400, 300)).save(image, "PNG")
+    reduced = []
+    reduce = ImageService._reduce
+
+    def recording_reduce(self, img, rendition):
+        reduced.append(img.size)
+        return reduce(self, img, rendition)
+
+    monkeypatch.setattr(ImageService, "_reduce", recording_reduce)
+    renditions = [Rendition(width=40, height=30), Rendition(width=200, height=150)]
+
+    rendered = ImageService(decode_mode).render(image.getvalue(), renditions)
+
+    assert reduced == sources
+    assert [(r.width, r.height) for r in rendered] == [(40, 30), (200, 150)]
@@ -0,0 +1,150 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.internal.api.v1.jobs import JobResponse, negotiate_output, parse_range
+from app.internal.database import get_engine
+from app.internal.models import Job
+from app.internal.services.events import job_event
+from app.internal.services.storage import MemoryStorageService
+
+
+@pytest.fixture
+def job(settings):
+    job = Job(
+        job_id=str(uuid.uuid4()),
+        status="SUCCESS",
+        source_key="images/original/test.jpg",
+        updated_at=datetime(2026, 1, 1, 12, tzinfo=timezone.utc),
+    )
+    with Session(get_engine(settings)) as session:
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+    return job
+
+
+def listed(client, **params) -> list[str]:
+    response = client.get("/api/v1/jobs/", params=params)
+    assert response.status_code == 200
+    return [item["job_id"] for item in response.json()["items"]]
+
+
+def test_list_jobs_reads_naive_since_and_until_as_utc(client, job):
+    assert job.job_id in listed(client, since="2026-01-01T11:59:00", until="2026-01-01T12:01:00")
+    assert job.job_id not in listed(client, since="2026-01-01T12:01:00")
+
+
+def test_list_jobs_honours_offsets_of_since_and_until(client, job):
+    # 12:00 UTC is 21:00 in Tokyo
+    assert job.job_id in listed(client, since="2026-01-01T20:59:00+09:00", until="2026-01-01T21:01:00+09:00")
+    assert job.job_id not in listed(client, since="2026-01-01T12:01:00Z")
+
+
+def test_job_event_date_done_is_utc(client, job):
+    stored = client.get(f"/api/v1/jobs/{job.job_id}").json()["date_done"]
+    published = json.loads(JobResponse.model_validate(job_event(job.job_id, "SUCCESS")).model_dump_json())["date_done"]
+
+    assert stored.endswith("Z")
+    assert published.endswith("Z")
+
+
+@pytest.mark.parametrize(
+    "header, byte_range",
+    [
+        ("bytes=0-99", (0, 100)),
+        ("bytes=100-", (100, 900)),
+        ("bytes=-100", (900, 100)),
+        ("bytes=-5000", (0, 1000)),
+        ("bytes=900-5000", (900, 100)),
+        ("bytes=0-9,20-29", None),
+        ("items=0-9", None),
+        ("bytes=abc", None),
+        ("bytes=x-9", None),
+    ],
+)
+def test_parse_range(header, byte_range):
+    assert parse_range(header, 1000) == byte_range
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1100", "bytes=10-5"])
+def test_parse_range_rejects_unsatisfiable_ranges(header):
+    with pytest.raises(HTTPException) as raised:
+        parse_range(header, 1000)
+
+    assert raised.value.status_code == 416
+    assert raised.value.headers == {"Content-Range": "bytes */1000"}
+
+
+OUTPUTS = [{"format": "JPEG", "size": 300}, {"format": "WEBP", "size": 200}, {"format": "AVIF", "size": 100}]
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, "JPEG"),
+        ("*/*", "JPEG"),
+        ("image/*", "JPEG"),
+        ("image/webp,image/avif", "AVIF"),
+        ("image/avif;q=0.5,image/webp", "WEBP"),
+        ("image/webp;q=0.9,image/jpeg", "JPEG"),
+        ("image/jpeg;q=0,image/png", "JPEG"),
+        ("image/avif;q=0,image/webp;q=0.8,*/*;q=0.1", "WEBP"),
+        ("image/avif;q=oops,image/webp;q=0.1", "WEBP"),
+    ],
+)
+def test_negotiate_output_follows_accept_quality_values(accept, expected):
+    assert negotiate_output(accept, OUTPUTS)["format"] == expected
+
+
+@pytest.fixture
+def thumbnail(settings):
+    data = bytes(range(256)) * 4
+    key = f"images/thumbnail/{uuid.uuid4()}/100x100.jpg"
+    MemoryStorageService(settings).save(key, data, "image/jpeg")
+    output = {"name": "100x100", "key": key, "format": "JPEG", "size": len(data)}
+    job_id = str(uuid.uuid4())
+    with Session(get_engine(settings)) as session:
+        session.add(Job(job_id=job_id, status="SUCCESS", source_key=key, result={"key": key, "renditions": [output]}))
+        session.commit()
+    return job_id, data
+
+
+def test_thumbnail_content_answers_if_none_match_with_304(client, thumbnail):
+    job_id, _ = thumbnail
+    url = f"/api/v1/jobs/{job_id}/thumbnail/content?redirect=false"
+    etag = client.get(url).headers["ETag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(url, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_thumbnail_content_serves_byte_ranges(client, thumbnail):
+    job_id, data = thumbnail
+    url = f"/api/v1/jobs/{job_id}/thumbnail/content?redirect=false"
+
+    suffix = client.get(url, headers={"Range": "bytes=-24"})
+    assert suffix.status_code == 206
+    assert suffix.headers["Content-Range"] == f"bytes 1000-1023/{len(data)}"
+    assert suffix.content == data[-24:]
+
+    open_ended = client.get(url, headers={"Range": "bytes=1000-"})
+    assert open_ended.status_code == 206
+    assert open_ended.content == data[1000:]
+
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(data)}"
+
+    # A stale If-Range gets the whole object
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert stale.content == data
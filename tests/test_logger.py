@@ -0,0 +1,29 @@
+import logging
+
+import pytest
+from loguru import logger
+
+from app.internal.log.logger import InterceptHandler
+
+
+@pytest.fixture
+def records():
+    records = []
+    handler_id = logger.add(records.append, format="{message}")
+    yield records
+    logger.remove(handler_id)
+
+
+@pytest.mark.parametrize("find_caller", [True, False])
+def test_intercepted_message_with_braces_is_logged_verbatim(records, find_caller):
+    stdlib_logger = logging.getLogger("tests.intercept")
+    stdlib_logger.addHandler(InterceptHandler(find_caller=find_caller))
+    stdlib_logger.propagate = False
+    try:
+        stdlib_logger.warning("Invalid HTTP request %s", {"a": 1})
+    finally:
+        stdlib_logger.handlers.clear()
+
+    assert [record.record["message"] for record in records] == ["Invalid HTTP request {'a': 1}"]
+    if not find_caller:
+        assert records[0].record["extra"]["logger_name"] == "tests.intercept"
@@ -0,0 +1,113 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import Session
+
+from app.internal.configuration.settings import Settings
+from app.internal.database import get_engine
+from app.internal.models import Job, OriginalImage, ThumbnailResult, utcnow
+from app.internal.services import storage
+from app.internal.services.content_index import ContentIndexService
+from app.internal.services.jobs import JobService
+from app.internal.services.retention import RetentionSweeper
+from app.internal.services.storage import MemoryStorageService
+
+
+@pytest.fixture
+def retention_settings(settings):
+    return Settings(
+        S3_BUCKET_NAME=f"retention-{uuid.uuid4()}",
+        RETENTION_ORIGINALS_DAYS=1,
+        RETENTION_THUMBNAILS_DAYS=1,
+        SWEEP_MAX_DELETES_PER_SECOND=0,
+    )
+
+
+@pytest.fixture
+def storage_service(retention_settings):
+    return MemoryStorageService(retention_settings)
+
+
+def save_expired(storage_service: MemoryStorageService, key: str) -> None:
+    storage_service.save(key, b"data")
+    storage._memory_modified[(storage_service.bucket_name, key)] = utcnow() - timedelta(days=2)
+
+
+def index_expired(session: Session, row: OriginalImage | ThumbnailResult) -> None:
+    row.last_used_at = utcnow() - timedelta(days=2)
+    session.add(row)
+    session.commit()
+
+
+def sweep(settings: Settings, storage_service: MemoryStorageService) -> None:
+    with Session(get_engine(settings)) as session:
+        RetentionSweeper(settings, storage_service, session).sweep()
+
+
+def test_claimed_original_is_kept_before_its_job_exists(settings, retention_settings, storage_service):
+    content_hash, key = uuid.uuid4().hex, f"images/original/{uuid.uuid4()}.jpg"
+    save_expired(storage_service, key)
+    with Session(get_engine(settings)) as session:
+        index_expired(session, OriginalImage(content_hash=content_hash, key=key, size=4))
+        assert ContentIndexService(session).find_original(content_hash).key == key
+
+    sweep(retention_settings, storage_service)
+
+    assert storage_service.exists(key)
+
+
+def test_original_swept_after_lookup_is_not_reused(settings, retention_settings, storage_service):
+    content_hash, key = uuid.uuid4().hex, f"images/original/{uuid.uuid4()}.jpg"
+    save_expired(storage_service, key)
+    with Session(get_engine(settings)) as session:
+        index_expired(session, OriginalImage(content_hash=content_hash, key=key, size=4))
+        # An upload read the entry just before the sweep removed it
+        session.get(OriginalImage, content_hash)
+
+        sweep(retention_settings, storage_service)
+
+        assert not storage_service.exists(key)
+        assert ContentIndexService(session).find_original(content_hash) is None
+
+
+def test_claimed_result_keeps_its_thumbnails(settings, retention_settings, storage_service):
+    job_id, content_hash, params_hash = str(uuid.uuid4()), uuid.uuid4().hex, uuid.uuid4().hex
+    key = f"images/thumbnail/{job_id}/100x100.jpeg"
+    save_expired(storage_service, key)
+    with Session(get_engine(settings)) as session:
+        row = ThumbnailResult(content_hash=content_hash, params_hash=params_hash, job_id=job_id, result={"key": key})
+        index_expired(session, row)
+        assert ContentIndexService(session).find_result(content_hash, params_hash).job_id == job_id
+
+    sweep(retention_settings, storage_service)
+
+    assert storage_service.exists(key)
+
+
+def test_thumbnails_reused_by_a_live_job_are_kept(settings, retention_settings, storage_service):
+    owner, expired = str(uuid.uuid4()), str(uuid.uuid4())
+    kept_key, swept_key = f"images/thumbnail/{owner}/100x100.jpeg", f"images/thumbnail/{expired}/100x100.jpeg"
+    save_expired(storage_service, kept_key)
+    save_expired(storage_service, swept_key)
+    with Session(get_engine(settings)) as session:
+        job = Job(job_id=str(uuid.uuid4()), status="PENDING", source_key="images/original/reused.jpg")
+        JobService(session).create([job])
+        JobService(session).mark_succeeded(job.job_id, {"job_id": job.job_id, "key": kept_key, "renditions": []})
+        assert session.get(Job, job.id).result_job_id == owner
+
+    sweep(retention_settings, storage_service)
+
+    assert storage_service.exists(kept_key)
+    assert not storage_service.exists(swept_key)
+
+
+@pytest.mark.parametrize(
+    "table, column",
+    [("jobs", "source_key"), ("jobs", "result_job_id"), ("original_images", "key"), ("thumbnail_results", "job_id")],
+)
+def test_sweep_lookups_are_indexed(settings, table, column):
+    indexes = inspect(get_engine(settings)).get_indexes(table)
+
+    assert any(index["column_names"][0] == column for index in indexes)
@@ -0,0 +1,47 @@
+import pytest
+from kombu.serialization import dumps, loads
+
+from app.internal.tasks.serialization import MSGPACK_ZLIB, RAW, ZLIB, register_msgpack_zlib
+
+THRESHOLD = 256
+
+
+@pytest.fixture(autouse=True)
+def msgpack_zlib(settings):
+    register_msgpack_zlib(THRESHOLD)
+    yield
+    register_msgpack_zlib(settings.CELERY_COMPRESSION_THRESHOLD)
+
+
+def round_trip(obj) -> tuple[bytes, object]:
+    content_type, encoding, payload = dumps(obj, serializer=MSGPACK_ZLIB)
+    return payload, loads(payload, content_type, encoding, accept=[content_type])
+
+
+def test_small_payloads_are_not_compressed():
+    job = {"job_id": "1", "key": "images/original/a.jpg", "renditions": None}
+
+    payload, loaded = round_trip(job)
+
+    assert payload[:1] == RAW
+    assert loaded == job
+
+
+def test_large_payloads_are_compressed():
+    jobs = [{"job_id": str(i), "key": f"images/original/{i}.jpg", "pixels": i * 1000} for i in range(50)]
+
+    payload, loaded = round_trip({"jobs": jobs, "data": b"\x00\xff"})
+
+    assert payload[:1] == ZLIB
+    assert len(payload) < sum(len(job["key"]) for job in jobs)
+    assert loaded == {"jobs": jobs, "data": b"\x00\xff"}
+
+
+def test_payloads_are_read_whatever_the_threshold():
+    jobs = [{"job_id": str(i), "key": f"images/original/{i}.jpg"} for i in range(50)]
+    content_type, encoding, payload = dumps(jobs, serializer=MSGPACK_ZLIB)
+
+    # Processes may be configured with different thresholds
+    register_msgpack_zlib(0)
+
+    assert loads(payload, content_type, encoding, accept=[content_type]) == jobs
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+from app.internal.configuration.settings import Settings
+
+
+def test_loading_settings_does_not_load_pillow():
+    code = (
+        "import sys; from app.internal.configuration.settings import Settings; "
+        "Settings(OUTPUT_FORMAT='webp'); print('PIL' in sys.modules)"
+    )
+
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == "False"
+
+
+def test_output_format_is_normalized():
+    assert Settings(OUTPUT_FORMAT="jpg").OUTPUT_FORMAT == "JPEG"
+    assert Settings(OUTPUT_FORMAT="webp").OUTPUT_FORMAT == "WEBP"
+    assert Settings().OUTPUT_FORMAT == ""
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from app.internal.services.image import RenderedImage, Rendition
+from app.internal.services.source_cache import SourceCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SourceCache(tmp_path / "cache", 1024 * 1024)
+
+
+def rendered() -> list[RenderedImage]:
+    return [
+        RenderedImage(Rendition(width=10, height=10), b"jpeg", "JPEG", 10, 10, {"WEBP": b"webp"}),
+        RenderedImage(Rendition(name="large", width=20, height=20, format="PNG"), b"png", "PNG", 20, 20),
+    ]
+
+
+def test_rendered_round_trip_without_pickle(cache):
+    cache.put_rendered("job-1", rendered())
+
+    assert not list(cache.root.glob("*.pickle"))
+    assert cache.take_rendered("job-1") == rendered()
+    # Taken once: a later retry renders again
+    assert cache.take_rendered("job-1") is None
+    assert not list(cache.root.glob("rendered-job-1.*"))
+
+
+def test_tampered_rendered_output_is_not_used(cache):
+    cache.put_rendered("job-1", rendered())
+    (cache.root / "rendered-job-1.0.jpeg").write_bytes(b"other")
+
+    assert cache.take_rendered("job-1") is None
+
+
+def test_job_ids_outside_file_names_are_not_kept(cache):
+    cache.put_rendered("../job", rendered())
+
+    assert cache.take_rendered("../job") is None
+    assert list(cache.root.iterdir()) == []
+
+
+def test_directory_is_created_private(cache):
+    assert cache.enabled
+    assert os.stat(cache.root).st_mode & 0o777 == 0o700
+
+
+def test_directory_writable_by_others_disables_cache(tmp_path):
+    root = tmp_path / "shared"
+    root.mkdir()
+    root.chmod(0o777)
+    cache = SourceCache(root, 1024 * 1024)
+
+    cache.put_rendered("job-1", rendered())
+
+    assert not cache.enabled
+    assert list(root.iterdir()) == []
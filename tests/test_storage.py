@@ -0,0 +1,176 @@
+import hashlib
+import uuid
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.internal.services.storage import (
+    LocalStorageService,
+    MultipartUpload,
+    StorageService,
+    create_storage_service,
+)
+
+PART_SIZE = 10
+
+
+class FakeS3Client:
+    """Records the calls a MultipartUpload makes; upload_part fails for ``fail_part``"""
+
+    def __init__(self, fail_part: int | None = None):
+        self.fail_part = fail_part
+        self.calls: list[str] = []
+        self.parts: dict[int, bytes] = {}
+        self.completed: dict | None = None
+        self.put: bytes | None = None
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.calls.append("put_object")
+        self.put = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append("create_multipart_upload")
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        if PartNumber == self.fail_part:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+        self.parts[PartNumber] = Body
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        self.completed = MultipartUpload
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        assert UploadId == "upload-1"
+        self.calls.append("abort_multipart_upload")
+
+
+def upload(client: FakeS3Client, *chunks: bytes) -> MultipartUpload:
+    multipart = MultipartUpload(client, "tests", "images/original/a.jpg", "image/jpeg", PART_SIZE)
+    for chunk in chunks:
+        multipart.write(chunk)
+    return multipart
+
+
+def test_objects_smaller_than_a_part_are_put_whole():
+    client = FakeS3Client()
+
+    upload(client, b"abc", b"def").complete()
+
+    assert client.calls == ["put_object"]
+    assert client.put == b"abcdef"
+
+
+@pytest.mark.parametrize(
+    "chunks, part_sizes",
+    [
+        ([b"x" * 25], [10, 10, 5]),
+        ([b"x" * 3] * 7, [10, 10, 1]),
+        ([b"x" * 9, b"x" * 2, b"x" * 9], [10, 10]),
+        ([b"x" * 10, b"x" * 10], [10, 10]),
+    ],
+)
+def test_parts_are_cut_at_part_size(chunks, part_sizes):
+    client = FakeS3Client()
+    multipart = upload(client, *chunks)
+
+    multipart.complete()
+
+    assert [len(client.parts[n]) for n in sorted(client.parts)] == part_sizes
+    assert client.completed == {
+        "Parts": [{"ETag": f'"{n}"', "PartNumber": n} for n in range(1, len(part_sizes) + 1)]
+    }
+    assert multipart.size == sum(part_sizes)
+
+
+def test_failed_part_aborts_the_multipart_upload():
+    client = FakeS3Client(fail_part=2)
+    multipart = upload(client, b"x" * 10)
+
+    with pytest.raises(ClientError):
+        multipart.write(b"x" * 10)
+    multipart.abort()
+    multipart.abort()
+
+    assert client.calls == ["create_multipart_upload", "upload_part", "upload_part", "abort_multipart_upload"]
+    assert client.completed is None
+
+
+def test_abort_before_the_first_part_makes_no_request():
+    client = FakeS3Client()
+
+    upload(client, b"abc").abort()
+
+    assert client.calls == []
+
+
+@pytest.fixture(params=["local", "memory"])
+def storage(request, settings, tmp_path) -> StorageService:
+    # A bucket of its own keeps memory objects of other tests out of listings
+    return create_storage_service(
+        settings.model_copy(
+            update={
+                "STORAGE_BACKEND": request.param,
+                "STORAGE_LOCAL_ROOT": str(tmp_path),
+                "S3_BUCKET_NAME": str(uuid.uuid4()),
+            }
+        )
+    )
+
+
+def test_backends_store_read_list_and_delete_objects(storage):
+    storage.save("images/original/a.jpg", b"first")
+    storage.save("images/original/a.jpg", b"second")
+    storage.save("images/thumbnail/b.jpg", b"other")
+
+    assert storage.load("images/original/a.jpg") == b"second"
+    with storage.open("images/original/a.jpg") as f:
+        assert f.read() == b"second"
+    assert b"".join(storage.iter_bytes("images/original/a.jpg", 1, 3, chunk_size=2)) == b"eco"
+    assert [(o.key, o.size) for o in storage.list_objects("images/original/")] == [("images/original/a.jpg", 6)]
+    assert storage.exists("images/original/a.jpg")
+
+    assert storage.delete_many(["images/original/a.jpg"]) == ["images/original/a.jpg"]
+    assert not storage.exists("images/original/a.jpg")
+    with pytest.raises(FileNotFoundError):
+        storage.load("images/original/a.jpg")
+
+
+def test_backend_uploads_are_only_visible_once_complete(storage):
+    storage.save("images/original/a.jpg", b"old")
+    completed, aborted = storage.open_upload("images/original/a.jpg"), storage.open_upload("images/original/b.jpg")
+    for upload in (completed, aborted):
+        upload.write(b"new ")
+        upload.write(b"data")
+
+    assert storage.load("images/original/a.jpg") == b"old"
+    aborted.abort()
+    completed.complete()
+
+    assert storage.load("images/original/a.jpg") == b"new data"
+    assert completed.content_hash == hashlib.sha256(b"new data").hexdigest()
+    assert not storage.exists("images/original/b.jpg")
+    assert [o.key for o in storage.list_objects("images/")] == ["images/original/a.jpg"]
+
+
+def test_local_writes_leave_no_temporary_files(settings, tmp_path):
+    storage = LocalStorageService(settings.model_copy(update={"STORAGE_LOCAL_ROOT": str(tmp_path)}))
+    storage.save("images/original/a.jpg", b"data")
+    storage.open_upload("images/original/b.jpg").abort()
+
+    assert [p.name for p in (tmp_path / "images/original").iterdir()] == ["a.jpg"]
+
+
+@pytest.mark.parametrize("key", ["../outside.jpg", "images/../../outside.jpg", "/etc/passwd"])
+def test_local_keys_cannot_escape_the_root(settings, tmp_path, key):
+    storage = LocalStorageService(settings.model_copy(update={"STORAGE_LOCAL_ROOT": str(tmp_path / "root")}))
+
+    with pytest.raises(ValueError, match="Invalid key"):
+        storage.save(key, b"data")
+    with pytest.raises(ValueError, match="Invalid key"):
+        storage.load(key)
+    assert not storage.exists(key)
+    assert list(tmp_path.iterdir()) == []
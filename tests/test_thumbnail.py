@@ -0,0 +1,126 @@
+import io
+import uuid
+
+import pytest
+from botocore.exceptions import ClientError
+from celery import states
+from PIL import Image, UnidentifiedImageError
+
+from app.internal.services.storage import MemoryStorageService
+from app.internal.tasks.thumbnail import generate_thumbnail, generate_thumbnail_batch, is_retryable
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code}}, "GetObject")
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Keys read from storage, in order"""
+    keys = []
+    load = MemoryStorageService.load
+
+    def counting_load(self, key):
+        keys.append(key)
+        return load(self, key)
+
+    monkeypatch.setattr(MemoryStorageService, "load", counting_load)
+    return keys
+
+
+def run(key: str):
+    return generate_thumbnail.apply(args=[key], task_id=str(uuid.uuid4()))
+
+
+@pytest.mark.parametrize(
+    "stage, error, retryable",
+    [
+        ("download", client_error("SlowDown"), True),
+        ("download", ConnectionResetError(), True),
+        ("upload", client_error("InternalError"), True),
+        ("download", client_error("NoSuchKey"), False),
+        ("download", client_error("404"), False),
+        ("download", FileNotFoundError(), False),
+        ("render", UnidentifiedImageError(), False),
+        ("render", OSError("image file is truncated"), False),
+        ("render", ValueError(), False),
+    ],
+)
+def test_is_retryable(stage, error, retryable):
+    assert is_retryable(stage, error) is retryable
+
+
+def test_corrupt_source_fails_without_retry(settings, loads):
+    key = f"images/original/{uuid.uuid4()}.jpg"
+    MemoryStorageService(settings).save(key, b"not an image", "image/jpeg")
+
+    result = run(key)
+
+    assert result.state == states.FAILURE
+    assert isinstance(result.result, UnidentifiedImageError)
+    assert loads == [key]
+
+
+def test_missing_source_fails_without_retry(settings, loads):
+    key = f"images/original/{uuid.uuid4()}.jpg"
+
+    result = run(key)
+
+    assert result.state == states.FAILURE
+    assert isinstance(result.result, FileNotFoundError)
+    assert loads == [key]
+
+
+def test_transient_download_error_is_retried(settings, monkeypatch):
+    key = f"images/original/{uuid.uuid4()}.jpg"
+    image = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(image, "JPEG")
+    MemoryStorageService(settings).save(key, image.getvalue(), "image/jpeg")
+    load = MemoryStorageService.load
+    failures = [client_error("SlowDown")]
+
+    def flaky_load(self, key):
+        if failures:
+            raise failures.pop()
+        return load(self, key)
+
+    monkeypatch.setattr(MemoryStorageService, "load", flaky_load)
+
+    result = run(key)
+
+    assert result.state == states.SUCCESS
+    assert not failures
+
+
+def test_batch_fails_corrupt_and_missing_sources_without_resubmitting(settings, monkeypatch):
+    corrupt, missing = f"images/original/{uuid.uuid4()}.jpg", f"images/original/{uuid.uuid4()}.jpg"
+    MemoryStorageService(settings).save(corrupt, b"not an image", "image/jpeg")
+    resubmitted = []
+    monkeypatch.setattr(generate_thumbnail, "apply_async", lambda *args, **kwargs: resubmitted.append(kwargs))
+    jobs = [{"job_id": str(uuid.uuid4()), "key": key, "renditions": None} for key in (corrupt, missing)]
+
+    result = generate_thumbnail_batch.apply(args=[jobs])
+
+    assert result.get() == {"succeeded": 0, "retried": 0, "failed": 2}
+    assert resubmitted == []
+
+
+def test_failed_upload_retries_with_rendered_thumbnails(settings, loads, monkeypatch):
+    key = f"images/original/{uuid.uuid4()}.jpg"
+    image = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(image, "JPEG")
+    MemoryStorageService(settings).save(key, image.getvalue(), "image/jpeg")
+    save = MemoryStorageService.save
+    failures = [client_error("SlowDown")]
+
+    def flaky_save(self, key, data, content_type=""):
+        if failures and key.startswith("images/thumbnail/"):
+            raise failures.pop()
+        save(self, key, data, content_type)
+
+    monkeypatch.setattr(MemoryStorageService, "save", flaky_save)
+
+    result = run(key)
+
+    assert result.state == states.SUCCESS
+    assert loads == [key]
@@ -0,0 +1,94 @@
+import io
+import uuid
+
+from botocore.exceptions import EndpointConnectionError
+from fastapi import HTTPException
+from PIL import Image
+
+from app.internal.api.v1 import thumbnails
+from app.internal.api.v1.thumbnails import probe_upload
+from app.internal.services.inline import InlineRenderer
+from app.internal.services.storage import MemoryStorageService
+
+
+def jpeg(width: int = 64, height: int = 64) -> bytes:
+    image = io.BytesIO()
+    Image.new("RGB", (width, height)).save(image, "JPEG")
+    return image.getvalue()
+
+
+def test_batch_storage_failure_is_a_logged_503(client, monkeypatch):
+    def unreachable(self, key):
+        raise EndpointConnectionError(endpoint_url="https://s3.invalid")
+
+    monkeypatch.setattr(MemoryStorageService, "exists", unreachable)
+
+    response = client.post(
+        "/api/v1/thumbnails/batch",
+        data={"keys": [f"images/original/{uuid.uuid4()}.jpg"]},
+        files={"images": ("a.jpg", jpeg(), "image/jpeg")},
+    )
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Failed to store batch"}
+
+
+def test_batch_missing_key_is_a_404(client):
+    key = f"images/original/{uuid.uuid4()}.jpg"
+
+    response = client.post("/api/v1/thumbnails/batch", data={"keys": [key]})
+
+    assert response.status_code == 404
+    assert key in response.json()["detail"]
+
+
+def probe_status(settings, header: bytes, complete: bool = True) -> int | None:
+    try:
+        probe_upload(header, complete, settings)
+    except HTTPException as e:
+        return e.status_code
+    return None
+
+
+def test_probe_accepts_images_within_the_limits(settings):
+    assert probe_upload(jpeg(), True, settings).pixels == 64 * 64
+
+
+def test_probe_rejects_unsupported_data_and_oversized_images(settings):
+    assert probe_status(settings, b"not an image") == 415
+    assert probe_status(settings.model_copy(update={"MAX_IMAGE_PIXELS": 64 * 64 - 1}), jpeg()) == 413
+
+
+def test_probe_leaves_a_truncated_header_to_the_worker(settings):
+    assert probe_upload(b"\xff\xd8\xff", False, settings) is None
+
+
+def test_probe_rejects_decompression_bombs_and_probe_failures(settings, monkeypatch):
+    def bomb(header):
+        raise Image.DecompressionBombError("bomb")
+
+    monkeypatch.setattr(thumbnails, "probe_image", bomb)
+    assert probe_status(settings, jpeg(), complete=False) == 413
+
+    def crash(header):
+        raise RuntimeError("plugin bug")
+
+    monkeypatch.setattr(thumbnails, "probe_image", crash)
+    assert probe_status(settings, jpeg(), complete=False) == 415
+
+
+def test_inline_render_uses_the_probed_dimensions(settings):
+    renderer = InlineRenderer(settings)
+
+    assert renderer.accepts(1024, settings.INLINE_MAX_PIXELS)
+    assert not renderer.accepts(1024, settings.INLINE_MAX_PIXELS + 1)
+    assert not renderer.accepts(settings.INLINE_MAX_BYTES + 1, 1)
+    # Not probed: left to the worker
+    assert not renderer.accepts(1024, None)
+
+
+def test_small_upload_is_rendered_inline(client):
+    response = client.post("/api/v1/thumbnails/", files={"image": ("a.jpg", jpeg(), "image/jpeg")})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "SUCCESS"